@@ -0,0 +1,105 @@
+"""
+Admission Control
+Per-user token buckets and a global concurrency limit for the NLU-bound
+chat routes, so overload is shed up front instead of queueing everyone
+"""
+
+import math
+import threading
+import time
+from typing import Dict, List, Tuple
+
+STRIPES = 16
+
+
+class TokenBucketLimiter:
+    """Token bucket per key (user id): ``rate`` tokens/second up to ``burst``
+
+    Buckets live in lock-striped dicts so concurrent users rarely contend,
+    and each check is O(1). A bucket that has been idle long enough to
+    refill completely is indistinguishable from a new one, so compaction
+    simply drops those; it runs at most once per ``compact_interval``.
+    """
+
+    def __init__(self, rate: float, burst: float, compact_interval: float = 60.0):
+        self.rate = rate
+        self.burst = burst
+        self.compact_interval = compact_interval
+        self._stripes: List[Tuple[threading.Lock, Dict[str, List[float]]]] = [
+            (threading.Lock(), {}) for _ in range(STRIPES)
+        ]
+        self._next_compaction = time.monotonic() + compact_interval
+        self._compaction_lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take `cost` tokens; returns (admitted, seconds until enough tokens)"""
+        now = time.monotonic()
+        lock, buckets = self._stripes[hash(key) % STRIPES]
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [self.burst, now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                admitted, retry_after = True, 0.0
+            else:
+                bucket[0] = tokens
+                admitted, retry_after = False, (cost - tokens) / self.rate
+        if now >= self._next_compaction:
+            self.compact(now)
+        return admitted, retry_after
+
+    def compact(self, now: float = None) -> int:
+        """Drop buckets idle long enough to be full again; returns how many"""
+        if not self._compaction_lock.acquire(blocking=False):
+            return 0
+        try:
+            now = time.monotonic() if now is None else now
+            self._next_compaction = now + self.compact_interval
+            refill_time = self.burst / self.rate
+            removed = 0
+            for lock, buckets in self._stripes:
+                with lock:
+                    idle = [key for key, (_, last) in buckets.items() if now - last >= refill_time]
+                    for key in idle:
+                        del buckets[key]
+                    removed += len(idle)
+            return removed
+        finally:
+            self._compaction_lock.release()
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for _, buckets in self._stripes)
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests; waits at most ``queue_timeout`` for a slot"""
+
+    def __init__(self, limit: int, queue_timeout: float = 0.05):
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.shed = 0
+
+    def acquire(self) -> bool:
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.shed += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After value: whole seconds, at least 1"""
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,449 @@
+"""
+Session-Affinity Router for multi-worker chat
+Consistently hashes chat session ids to a fixed backend worker so that
+CHAT_SESSIONS and the NLU conversation context stay local and cache-hot.
+
+Run from the backend directory:
+    python affinity_router.py --spawn 4 --port 3000
+    SECUREBANK_ROUTER_SECRET=... python affinity_router.py --backend 127.0.0.1:3001 --backend 127.0.0.1:3002
+
+Spawned workers are single-process gunicorn servers (gunicorn.conf.py) and
+share a generated router secret; workers given with --backend must be
+started with the same SECUREBANK_ROUTER_SECRET, or they ignore the session
+ids the router assigns.
+
+Only chat sessions are pinned: registration, login, FAQ and admin requests
+go to the least-loaded worker, so with more than one worker every worker
+must use the same shared store. Spawned workers get the SQLite store and
+context store on one database each (SECUREBANK_DB_PATH and
+SECUREBANK_CONTEXT_DB_PATH); the router refuses to start them on the
+memory store. Start --backend workers the same way.
+"""
+
+import argparse
+import bisect
+import collections
+import hashlib
+import http.client
+import itertools
+import json
+import os
+import re
+import secrets
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+SESSION_PATH = re.compile(r'^/api/session/messages/([^/]+)')
+SESSION_HEADER = 'X-Session-Id'
+SECRET_HEADER = 'X-Router-Secret'
+
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade', 'content-length',
+}
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class ConsistentHashRing:
+    """Hash ring with virtual nodes
+
+    Adding or removing a worker only moves the sessions that hashed to that
+    worker's points, roughly 1/N of them, instead of reshuffling everything.
+    """
+
+    def __init__(self, nodes: List[str] = None, replicas: int = 128):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self._lock = threading.Lock()
+        for node in nodes or []:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(set(self._owners))
+
+    def add(self, node: str) -> None:
+        with self._lock:
+            if node in self._owners:
+                return
+            points = list(zip(self._points, self._owners))
+            points.extend((_hash(f"{node}#{i}"), node) for i in range(self.replicas))
+            points.sort()
+            self._points = [point for point, _ in points]
+            self._owners = [owner for _, owner in points]
+
+    def remove(self, node: str) -> None:
+        with self._lock:
+            points = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+            self._points = [point for point, _ in points]
+            self._owners = [owner for _, owner in points]
+
+    def get(self, key: str) -> Optional[str]:
+        points, owners = self._points, self._owners
+        if not points:
+            return None
+        index = bisect.bisect(points, _hash(key)) % len(points)
+        return owners[index]
+
+    def snapshot(self) -> "ConsistentHashRing":
+        """A frozen copy of the current membership (add/remove replace the lists, never mutate them)"""
+        ring = ConsistentHashRing(replicas=self.replicas)
+        with self._lock:
+            ring._points, ring._owners = self._points, self._owners
+        return ring
+
+
+class WorkerStats:
+    """Per-worker load counters"""
+
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.ewma_latency = 0.0
+        self.sessions_created = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'in_flight': self.in_flight,
+            'errors': self.errors,
+            'sessions_created': self.sessions_created,
+            'avg_latency_ms': round(self.total_latency / self.requests * 1000, 3) if self.requests else 0,
+            'ewma_latency_ms': round(self.ewma_latency * 1000, 3),
+        }
+
+
+class AffinityRouter:
+    """WSGI front that pins chat sessions to backend workers
+
+    Requests carrying a session id (/api/chat/message bodies and
+    /api/session/* paths) go to the ring owner of that id. Session creation
+    picks the id up front and passes it in X-Session-Id, together with the
+    shared X-Router-Secret that tells the worker the id comes from the
+    router, so the new session lives on the worker that will receive its
+    messages. Everything else is sent to the least busy worker.
+
+    Adding or removing a worker moves about 1/N of the sessions to a new
+    ring owner that does not hold them. When that owner answers 404, the
+    request is replayed to the session's owners under the previous
+    ``history`` memberships, and a hit is remembered in ``relocated`` so
+    later requests go straight there. A removed worker therefore keeps
+    serving its existing sessions (draining) for as long as it runs; only
+    new sessions avoid it.
+    """
+
+    def __init__(self, backends: List[str], replicas: int = 128, timeout: float = 30.0,
+                 secret: Optional[str] = None, history: int = 4, max_relocated: int = 100000):
+        self.ring = ConsistentHashRing(backends, replicas)
+        self.timeout = timeout
+        self.secret = secret
+        self.history = history
+        self.max_relocated = max_relocated
+        self.stats: Dict[str, WorkerStats] = {backend: WorkerStats() for backend in backends}
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+        self._round_robin = itertools.count()
+        self._previous_rings: List[ConsistentHashRing] = []
+        self._relocated: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+        self._relocated_lock = threading.Lock()
+
+    # Worker membership
+    def add_worker(self, backend: str) -> None:
+        with self._stats_lock:
+            self.stats.setdefault(backend, WorkerStats())
+        self._remember_ring()
+        self.ring.add(backend)
+
+    def remove_worker(self, backend: str) -> None:
+        self._remember_ring()
+        self.ring.remove(backend)
+
+    def _remember_ring(self) -> None:
+        with self._relocated_lock:
+            self._previous_rings = ([self.ring.snapshot()] + self._previous_rings)[:self.history]
+
+    def previous_owners(self, session_id: str, current: Optional[str]) -> List[str]:
+        """Owners of a session under earlier memberships, newest first, excluding ``current``"""
+        owners = []
+        for ring in list(self._previous_rings):
+            owner = ring.get(session_id)
+            if owner and owner != current and owner not in owners:
+                owners.append(owner)
+        return owners
+
+    def _relocate(self, session_id: str, backend: str) -> None:
+        with self._relocated_lock:
+            self._relocated[session_id] = backend
+            self._relocated.move_to_end(session_id)
+            while len(self._relocated) > self.max_relocated:
+                self._relocated.popitem(last=False)
+
+    def metrics(self) -> Dict:
+        with self._stats_lock:
+            workers = {backend: stats.to_dict() for backend, stats in self.stats.items()}
+        for backend, data in workers.items():
+            data['in_ring'] = backend in self.ring.nodes
+        return {'workers': workers, 'ring_size': len(self.ring.nodes), 'relocated_sessions': len(self._relocated)}
+
+    # Routing
+    def _least_loaded(self) -> Optional[str]:
+        nodes = self.ring.nodes
+        if not nodes:
+            return None
+        start = next(self._round_robin)
+        with self._stats_lock:
+            rotated = nodes[start % len(nodes):] + nodes[:start % len(nodes)]
+            return min(rotated, key=lambda node: self.stats[node].in_flight)
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[Optional[str], Dict[str, str], Optional[str]]:
+        """Pick a backend, any extra headers and the session id (if any) for the request"""
+        extra_headers = {}
+        session_id = None
+
+        match = SESSION_PATH.match(path)
+        if match:
+            session_id = match.group(1)
+        elif path in ('/api/chat/message', '/api/chat/message/stream') and body:
+            try:
+                session_id = json.loads(body).get('sessionId')
+            except (ValueError, AttributeError):
+                session_id = None
+        elif path == '/api/session/create' and method == 'POST':
+            extra_headers[SESSION_HEADER] = str(uuid.uuid4())
+            if self.secret:
+                extra_headers[SECRET_HEADER] = self.secret
+            return self.ring.get(extra_headers[SESSION_HEADER]), extra_headers, None
+
+        if session_id:
+            relocated = self._relocated.get(session_id)
+            return relocated or self.ring.get(session_id), extra_headers, session_id
+        return self._least_loaded(), extra_headers, None
+
+    def _connection(self, backend: str) -> http.client.HTTPConnection:
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        if backend not in connections:
+            host, port = backend.rsplit(':', 1)
+            connections[backend] = http.client.HTTPConnection(host, int(port), timeout=self.timeout)
+        return connections[backend]
+
+    def _drop_connection(self, backend: str) -> None:
+        connection = getattr(self._local, 'connections', {}).pop(backend, None)
+        if connection:
+            connection.close()
+
+    def _forward(self, backend, method, target, headers, body):
+        for attempt in range(2):
+            connection = self._connection(backend)
+            try:
+                connection.request(method, target, body=body, headers=headers)
+                return connection.getresponse()
+            except (ConnectionError, http.client.HTTPException, OSError):
+                # Stale keep-alive connection; retry once on a fresh socket
+                self._drop_connection(backend)
+                if attempt:
+                    raise
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        path = environ.get('PATH_INFO', '')
+
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(length) if length else b''
+
+        if path.startswith('/_router/'):
+            return self._admin(environ, path, body, start_response)
+        backend, extra_headers, session_id = self.route(method, path, body)
+        if backend is None:
+            start_response('503 Service Unavailable', [('Content-Type', 'application/json')])
+            return [b'{"message": "No backend workers available"}']
+
+        headers = {
+            key[5:].replace('_', '-').title(): value
+            for key, value in environ.items()
+            if key.startswith('HTTP_') and key[5:].replace('_', '-').lower() not in HOP_BY_HOP_HEADERS
+        }
+        headers.pop(SESSION_HEADER.title(), None)  # only the router may pick session ids
+        headers.pop(SECRET_HEADER.title(), None)
+        if environ.get('CONTENT_TYPE'):
+            headers['Content-Type'] = environ['CONTENT_TYPE']
+        headers.update(extra_headers)
+        target = path + ('?' + environ['QUERY_STRING'] if environ.get('QUERY_STRING') else '')
+
+        stats = self.stats[backend]
+        with self._stats_lock:
+            stats.requests += 1
+            stats.in_flight += 1
+            if SESSION_HEADER in extra_headers:
+                stats.sessions_created += 1
+        started = time.perf_counter()
+        try:
+            response = self._forward(backend, method, target, headers, body)
+        except (OSError, http.client.HTTPException):
+            response = None
+        if session_id and (response is None or response.status == 404):
+            response, backend, stats = self._fall_back(session_id, backend, stats, response,
+                                                       method, target, headers, body)
+        if response is None:
+            with self._stats_lock:
+                stats.in_flight -= 1
+                stats.errors += 1
+            start_response('502 Bad Gateway', [('Content-Type', 'application/json')])
+            return [b'{"message": "Backend worker unavailable"}']
+
+        response_headers = [(key, value) for key, value in response.getheaders()
+                            if key.lower() not in HOP_BY_HOP_HEADERS]
+        start_response(f"{response.status} {response.reason}", response_headers)
+        return self._stream(response, backend, stats, started)
+
+    def _fall_back(self, session_id, backend, stats, response, method, target, headers, body):
+        """Replay a session request that missed to the session's earlier owners
+
+        Session routes answer 404 before touching any state, so a replay
+        cannot apply a message twice. Returns the response to relay with the
+        backend and stats it belongs to; the first miss is kept when no
+        earlier owner has the session either.
+        """
+        with self._relocated_lock:
+            self._relocated.pop(session_id, None)
+        owner = self.ring.get(session_id)
+        candidates = ([owner] if owner and owner != backend else []) + self.previous_owners(session_id, backend)
+        for candidate in dict.fromkeys(candidates):
+            try:
+                retry = self._forward(candidate, method, target, headers, body)
+            except (OSError, http.client.HTTPException):
+                continue
+            if retry.status == 404:
+                retry.read()
+                continue
+            if response is not None:
+                response.read()
+            with self._stats_lock:
+                stats.in_flight -= 1
+                stats = self.stats.setdefault(candidate, WorkerStats())
+                stats.requests += 1
+                stats.in_flight += 1
+            self._relocate(session_id, candidate)
+            return retry, candidate, stats
+        return response, backend, stats
+
+    def _admin(self, environ, path, body, start_response):
+        """Router metrics and worker membership (add/remove rebalances the ring; removed workers drain)"""
+        method = environ['REQUEST_METHOD']
+        if path == '/_router/workers' and method in ('POST', 'DELETE'):
+            if environ.get('REMOTE_ADDR') not in ('127.0.0.1', '::1'):
+                start_response('403 Forbidden', [('Content-Type', 'application/json')])
+                return [b'{"message": "Worker membership can only be changed locally"}']
+            try:
+                backend = json.loads(body)['backend']
+            except (ValueError, KeyError, TypeError):
+                start_response('400 Bad Request', [('Content-Type', 'application/json')])
+                return [b'{"message": "backend is required"}']
+            if method == 'POST':
+                self.add_worker(backend)
+            else:
+                self.remove_worker(backend)
+        elif path not in ('/_router/metrics', '/_router/workers'):
+            start_response('404 Not Found', [('Content-Type', 'application/json')])
+            return [b'{"message": "Not found"}']
+
+        payload = json.dumps(self.metrics()).encode('utf-8')
+        start_response('200 OK', [('Content-Type', 'application/json'), ('Content-Length', str(len(payload)))])
+        return [payload]
+
+    def _stream(self, response, backend, stats, started):
+        """Relay the backend body chunk by chunk (keeps SSE responses live)"""
+        try:
+            while True:
+                chunk = response.read1(65536)
+                if not chunk:
+                    break
+                yield chunk
+        except OSError:
+            self._drop_connection(backend)
+            with self._stats_lock:
+                stats.errors += 1
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                stats.in_flight -= 1
+                stats.total_latency += elapsed
+                stats.ewma_latency = elapsed if stats.requests == 1 else 0.8 * stats.ewma_latency + 0.2 * elapsed
+                if response.status >= 500:
+                    stats.errors += 1
+            if response.will_close:
+                self._drop_connection(backend)
+
+
+def run_worker(port: int, secret: str, shared_store: bool = False) -> subprocess.Popen:
+    """Start one backend worker: a single-process gunicorn server on a local port
+
+    With ``shared_store`` the worker uses the SQLite store and context store
+    at the paths every spawned worker shares.
+    """
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, 'SECUREBANK_BIND': f'127.0.0.1:{port}', 'SECUREBANK_WORKERS': '1',
+           'SECUREBANK_ROUTER_SECRET': secret}
+    if shared_store:
+        env['SECUREBANK_STORE'] = env['SECUREBANK_CONTEXT_STORE'] = 'sqlite'
+        env.setdefault('SECUREBANK_DB_PATH', os.path.join(backend_dir, 'securebank.db'))
+        env.setdefault('SECUREBANK_CONTEXT_DB_PATH', os.path.join(backend_dir, 'nlu_context.db'))
+    # A chat log directory has a single writer, so each worker keeps its own
+    log_dir = os.environ.get('SECUREBANK_CHAT_LOG_DIR', os.path.join(backend_dir, 'logs', 'chat'))
+    if log_dir:
+        env['SECUREBANK_CHAT_LOG_DIR'] = os.path.join(log_dir, f'worker-{port}')
+    return subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application'],
+                            cwd=backend_dir, env=env)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SecureBank session-affinity router')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--backend', action='append', default=[], help='existing worker host:port')
+    parser.add_argument('--spawn', type=int, default=0, help='number of local workers to start')
+    parser.add_argument('--base-port', type=int, default=3101)
+    args = parser.parse_args()
+
+    backends = list(args.backend)
+    if backends and not os.environ.get('SECUREBANK_ROUTER_SECRET'):
+        print("⚠️ SECUREBANK_ROUTER_SECRET is not set: --backend workers will pick their own session ids")
+    shared_store = args.spawn + len(backends) > 1
+    for name in ('SECUREBANK_STORE', 'SECUREBANK_CONTEXT_STORE'):
+        if args.spawn and shared_store and os.environ.get(name, 'sqlite') != 'sqlite':
+            parser.error(f"{name}={os.environ[name]} keeps state per worker; "
+                         f"more than one worker needs the shared sqlite store")
+    secret = os.environ.get('SECUREBANK_ROUTER_SECRET') or secrets.token_urlsafe(32)
+    processes = []
+    for i in range(args.spawn):
+        port = args.base_port + i
+        processes.append(run_worker(port, secret, shared_store))
+        backends.append(f"127.0.0.1:{port}")
+
+    if not backends:
+        parser.error('give at least one --backend or --spawn N')
+
+    from werkzeug.serving import run_simple
+    router = AffinityRouter(backends, secret=secret)
+    print(f"🔀 Session-affinity router on http://localhost:{args.port} → {', '.join(backends)}")
+    try:
+        run_simple('0.0.0.0', args.port, router, threaded=True)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Chat Analytics Counters
+Running aggregates behind /api/admin/logs/refresh, updated once per turn
+instead of rescanning the whole log on every dashboard refresh
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+SUCCESS_CONFIDENCE = 0.7
+
+
+class TurnStats:
+    """Incrementally maintained totals over chat turns
+
+    ``add`` and ``snapshot`` share one lock, so a snapshot never sees a turn
+    half-counted (e.g. in queries but not yet in the intent counts).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.successes = 0
+        self.entities = 0
+        self.intent_counts: Dict[str, int] = {}
+        self.last_seq = None
+
+    @staticmethod
+    def deltas(bot_message: Dict) -> tuple:
+        """(success, entity count, intent) contributed by one bot reply"""
+        success = 1 if (bot_message.get('confidence') or 0) > SUCCESS_CONFIDENCE else 0
+        return success, len(bot_message.get('entities') or []), bot_message.get('intent', 'unknown')
+
+    def add(self, record: Dict) -> None:
+        success, entities, intent = self.deltas(record['bot'])
+        with self._lock:
+            self.queries += 1
+            self.successes += success
+            self.entities += entities
+            self.intent_counts[intent] = self.intent_counts.get(intent, 0) + 1
+            self.last_seq = record.get('seq', self.last_seq)
+
+    def rebuild(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            self.add(record)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return build_snapshot(self.queries, self.successes, self.entities, dict(self.intent_counts),
+                                  self.last_seq)
+
+
+def build_snapshot(queries: int, successes: int, entities: int, intent_counts: Dict[str, int],
+                   last_seq: Optional[int] = None) -> Dict:
+    """Dashboard payload in the shape the admin UI expects
+
+    ``successes`` and ``last_seq`` let live dashboards apply turn deltas on
+    top of the snapshot (``last_seq`` is None when the backend can't tell).
+    """
+    return {
+        'queries': queries,
+        'success': (successes / queries) if queries > 0 else 0,
+        'successes': successes,
+        'intents': len(intent_counts),
+        'entity': entities,
+        'intent_counts': intent_counts,
+        'last_seq': last_seq,
+    }
@@ -1,28 +1,42 @@
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, Response, g, request, jsonify, make_response
 from flask_cors import CORS
 from datetime import datetime, timedelta, timezone
 from functools import wraps
 import jwt
+import hmac
+import json
 import bcrypt
 import random
 import uuid
-import csv
-import io
 import re
-from flask import send_from_directory
+import threading
+import time
 import os
+from storage import create_store
+from log_index import CONFIDENCE_BANDS
+from rollups import RollupEngine
+from event_hub import EventHub
+from admission import ConcurrencyLimiter, TokenBucketLimiter, retry_after_header
+from metrics import MetricsRegistry
+from http_cache import JSONCache, StaticManifest, accepts_gzip, compress_response
+from analytics import TurnStats
+from log_export import (ExportLengths, export_etag, gzip_chunks, iter_csv_chunks, parse_range, slice_chunks,
+                        stream_length)
 
 # Import ML NLU service
 try:
-    from nlu_service_enhanced import analyze_query
+    from nlu_service_enhanced import analyze_query, forget_sessions, nlu_status, prune_contexts
     print("✅ Enhanced ML NLU Service imported successfully")
 except ImportError:
     try:
-        from nlu_service import analyze_query
+        from nlu_service import analyze_query, forget_sessions, nlu_status, prune_contexts
         print("✅ ML NLU Service imported successfully")
     except ImportError:
         print("⚠️ ML NLU Service not available, using fallback")
         analyze_query = None
+        forget_sessions = None
+        nlu_status = None
+        prune_contexts = None
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'securebank_jwt_secret_key_2024'
@@ -88,8 +102,74 @@ FAQS_DB = [
     {"_id": "faq_004", "question": "How secure is this chatbot?", "answer": "Bank-grade security with enhanced ML-powered understanding and conversation flows.", "created_at": datetime.now(timezone.utc).isoformat()}
 ]
 
-USER_MESSAGES = []
-BOT_MESSAGES = []
+# Storage backend: in-memory dicts by default, SQLite (WAL) when shared across workers
+STORE = create_store(
+    os.environ.get('SECUREBANK_STORE', 'memory'),
+    users=USERS_DB,
+    sessions=CHAT_SESSIONS,
+    faqs=FAQS_DB,
+    path=os.environ.get('SECUREBANK_DB_PATH', os.path.join(os.path.dirname(__file__), 'securebank.db')),
+    log_dir=os.environ.get('SECUREBANK_CHAT_LOG_DIR', os.path.join(os.path.dirname(__file__), 'logs', 'chat')) or None,
+    max_session_messages=int(os.environ.get('SECUREBANK_SESSION_MAX_MESSAGES', 200)),
+    archive_sessions=os.environ.get('SECUREBANK_SESSION_ARCHIVE', '1') != '0'
+)
+
+# Sessions idle longer than this leave memory (archived sessions resume from the chat log)
+SESSION_IDLE_TTL = float(os.environ.get('SECUREBANK_SESSION_TTL', 1800))
+SESSION_SWEEP_INTERVAL = 60
+_session_sweep = {'last': time.monotonic()}
+_session_sweep_lock = threading.Lock()
+
+def sweep_idle_sessions():
+    """Evict idle sessions at most once per sweep interval (cheap no-op otherwise)"""
+    with _session_sweep_lock:
+        now = time.monotonic()
+        if now - _session_sweep['last'] < SESSION_SWEEP_INTERVAL:
+            return
+        _session_sweep['last'] = now
+    evicted = STORE.evict_idle_sessions(SESSION_IDLE_TTL)
+    if evicted and forget_sessions is not None:
+        forget_sessions(evicted)
+    # Contexts whose session was evicted by a worker that died before forgetting them
+    if prune_contexts is not None:
+        prune_contexts(SESSION_IDLE_TTL)
+
+# Per-minute / per-hour chat rollups for the analytics timeseries (per process)
+ROLLUPS = RollupEngine()
+
+# Live admin dashboard push channel (per process)
+ADMIN_EVENTS = EventHub(
+    max_subscribers=int(os.environ.get('SECUREBANK_ADMIN_STREAMS', 100)),
+    max_buffer=int(os.environ.get('SECUREBANK_ADMIN_STREAM_BUFFER', 256))
+)
+ADMIN_EVENTS_HEARTBEAT = 15
+
+# Request metrics; SECUREBANK_METRICS_DIR merges them across gunicorn workers
+METRICS = MetricsRegistry(os.environ.get('SECUREBANK_METRICS_DIR') or None)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count and time every request by route pattern and status (runs after the other hooks)"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        METRICS.observe(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
+# Cached JSON bodies for read-mostly endpoints and the built frontend manifest
+JSON_CACHE = JSONCache()
+EXPORT_LENGTHS = ExportLengths()
+STATIC_ASSETS = StaticManifest(os.environ.get(
+    'SECUREBANK_STATIC_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend', 'dist')))
+
+@app.after_request
+def compress_large_json(response):
+    """Negotiated gzip for large JSON responses"""
+    return compress_response(request, response)
 
 def create_token(user_data):
     """Create JWT token for user"""
@@ -126,11 +206,11 @@ def token_required(f):
                 return jsonify({'message': 'Token is invalid'}), 401
 
             # Find user data
-            user_email = payload['email']
-            if user_email not in USERS_DB:
+            user = STORE.get_user(payload['email'])
+            if not user:
                 return jsonify({'message': 'User not found'}), 401
 
-            request.current_user = USERS_DB[user_email]
+            request.current_user = user
         except Exception:
             return jsonify({'message': 'Token is invalid'}), 401
 
@@ -146,6 +226,48 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated
 
+# Admission control for NLU-bound routes: per-user rate, then a global in-flight cap
+USER_RATE_LIMITER = TokenBucketLimiter(
+    rate=float(os.environ.get('SECUREBANK_USER_RATE', 2)),
+    burst=float(os.environ.get('SECUREBANK_USER_BURST', 10))
+)
+NLU_CONCURRENCY = ConcurrencyLimiter(
+    limit=int(os.environ.get('SECUREBANK_NLU_CONCURRENCY', 8)),
+    queue_timeout=float(os.environ.get('SECUREBANK_NLU_QUEUE_TIMEOUT', 0.05))
+)
+
+def admission_controlled(f):
+    """Decorator that sheds NLU work under overload (use below token_required)
+
+    Over the user's rate: 429. No free NLU slot: 503. Both carry Retry-After.
+    The slot is held until the response body is finished, so streamed
+    replies count for as long as they run.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        admitted, retry_after = USER_RATE_LIMITER.acquire(request.current_user['id'])
+        if not admitted:
+            response = jsonify({'message': 'Too many requests, please slow down', 'retry_after': retry_after})
+            response.headers['Retry-After'] = retry_after_header(retry_after)
+            return response, 429
+
+        if not NLU_CONCURRENCY.acquire():
+            response = jsonify({'message': 'Service busy, please retry shortly'})
+            response.headers['Retry-After'] = retry_after_header(1)
+            return response, 503
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            NLU_CONCURRENCY.release()
+            raise
+        if response.is_streamed:
+            response.call_on_close(NLU_CONCURRENCY.release)
+        else:
+            NLU_CONCURRENCY.release()
+        return response
+    return decorated
+
 # Authentication Routes
 @app.route('/api/auth/register', methods=['POST'])
 def register():
@@ -161,17 +283,17 @@ def register():
         if not all([name, email, password]):
             return jsonify({'message': 'All fields are required'}), 400
 
-        if email in USERS_DB:
+        if STORE.get_user(email):
             return jsonify({'message': 'User already exists'}), 400
 
         if len(password) < 6:
             return jsonify({'message': 'Password must be at least 6 characters'}), 400
 
         # Create new user
-        user_id = f"user_{len(USERS_DB)+1:03d}"
+        user_id = f"user_{STORE.count_users()+1:03d}"
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
 
-        USERS_DB[email] = {
+        new_user = {
             "id": user_id,
             "name": name,
             "email": email,
@@ -184,13 +306,15 @@ def register():
         # If user role, create banking details
         if role == 'user':
             account_number = str(random.randint(1000000000, 9999999999))
-            USERS_DB[email].update({
+            new_user.update({
                 "account_number": account_number,
                 "balance": random.randint(10000, 100000),
                 "account_type": random.choice(["Savings", "Current"]),
                 "phone": f"{random.randint(6000000000, 9999999999)}"
             })
 
+        STORE.add_user(new_user)
+
         return jsonify({'message': 'User registered successfully'}), 201
 
     except Exception as e:
@@ -208,10 +332,10 @@ def login():
             email = data.get('email', '').strip().lower()
             password = data.get('password', '')
 
-            if email not in USERS_DB:
+            user = STORE.get_user(email)
+            if not user:
                 return jsonify({'message': 'Invalid credentials'}), 401
 
-            user = USERS_DB[email]
             if not bcrypt.checkpw(password.encode('utf-8'), user['password']):
                 return jsonify({'message': 'Invalid credentials'}), 401
 
@@ -221,13 +345,12 @@ def login():
             pin = data.get('pin', '')
 
             # Find user by account number
-            for email, user_data in USERS_DB.items():
-                if user_data.get('account_number') == account_number:
-                    # For demo purposes, PIN is stored in a simple format
-                    if (user_data.get('account_number') == '1234567890' and pin == '1234') or \
-                       (user_data.get('account_number') == '2345678901' and pin == '5678'):
-                        user = user_data
-                        break
+            user_data = STORE.get_user_by_account(account_number)
+            if user_data:
+                # For demo purposes, PIN is stored in a simple format
+                if (user_data.get('account_number') == '1234567890' and pin == '1234') or \
+                   (user_data.get('account_number') == '2345678901' and pin == '5678'):
+                    user = user_data
 
             if not user:
                 return jsonify({'message': 'Invalid account number or PIN'}), 401
@@ -254,15 +377,28 @@ def login():
     except Exception as e:
         return jsonify({'message': f'Login failed: {str(e)}'}), 500
 
+# Shared with affinity_router.py; unset means no request counts as coming from the router
+ROUTER_SECRET = os.environ.get('SECUREBANK_ROUTER_SECRET')
+
+def from_router():
+    """Whether the request carries the affinity router's shared secret"""
+    supplied = request.headers.get('X-Router-Secret')
+    return bool(ROUTER_SECRET and supplied and hmac.compare_digest(supplied, ROUTER_SECRET))
+
 # Session Management Routes
 @app.route('/api/session/create', methods=['POST'])
 @token_required
 def create_session():
     """Create new chat session"""
-    session_id = str(uuid.uuid4())
+    sweep_idle_sessions()
+    # The affinity router pre-assigns ids so the session lands on the worker that owns it;
+    # clients may not choose their own, so the id counts only with the router's secret
+    session_id = request.headers.get('X-Session-Id') if from_router() else None
+    if not session_id or STORE.has_session(session_id):
+        session_id = str(uuid.uuid4())
     greeting_message = f"Hello {request.current_user['name']}! I'm your enhanced AI banking assistant with advanced conversation capabilities. How can I help you today?"
 
-    CHAT_SESSIONS[session_id] = {
+    STORE.create_session({
         'id': session_id,
         'user_id': request.current_user['id'],
         'messages': [{
@@ -273,7 +409,7 @@ def create_session():
             'confidence': 1.0
         }],
         'created_at': datetime.now(timezone.utc).isoformat()
-    }
+    })
 
     return jsonify({
         'sessionId': session_id,
@@ -283,21 +419,73 @@ def create_session():
 @app.route('/api/session/messages/<session_id>', methods=['GET'])
 @token_required
 def get_session_messages(session_id):
-    """Get messages for a session"""
-    if session_id not in CHAT_SESSIONS:
+    """Get messages for a session (cursor-paginated when limit or cursor is given)"""
+    session = STORE.get_session(session_id)
+    if not session:
         return jsonify({'message': 'Session not found'}), 404
 
-    session = CHAT_SESSIONS[session_id]
     if session['user_id'] != request.current_user['id'] and request.current_user['role'] != 'admin':
         return jsonify({'message': 'Access denied'}), 403
 
-    return jsonify(session['messages']), 200
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        messages, _ = STORE.session_messages(session_id)
+        return jsonify(messages), 200
+
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        cursor = int(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        return jsonify({'message': 'Invalid query parameters'}), 400
+
+    messages, next_cursor = STORE.session_messages(session_id, limit=limit, cursor=cursor)
+    return jsonify({'items': messages, 'next_cursor': next_cursor}), 200
 
 # Enhanced Chat Routes
+def build_user_message(message_text, session_id):
+    """User chat message as stored in the session and the chat log"""
+    return {
+        'sender': 'user',
+        'text': message_text,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'user_id': request.current_user['id'],
+        'session_id': session_id
+    }
+
+def build_bot_message(bot_response):
+    """Bot chat message from a generated response"""
+    return {
+        'sender': 'bot',
+        'text': bot_response['text'],
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'intent': bot_response.get('intent', 'general'),
+        'confidence': bot_response.get('confidence', 0.8),
+        'entities': bot_response.get('entities', []),
+        'method': bot_response.get('method', 'ml'),
+        'needs_slot_filling': bot_response.get('needs_slot_filling', False),
+        'pending_slots': bot_response.get('pending_slots', {}),
+        'filled_slots': bot_response.get('filled_slots', {})
+    }
+
+def record_bot_message(session_id, user_message, bot_message, latency_ms):
+    """Persist the bot reply and feed the admin log, counters and rollups"""
+    STORE.append_session_message(session_id, bot_message)
+    seq = STORE.append_turn(user_message, bot_message)
+    ROLLUPS.record(bot_message, latency_ms)
+    if len(ADMIN_EVENTS):
+        success, entities, intent = TurnStats.deltas(bot_message)
+        ADMIN_EVENTS.publish({
+            'seq': seq if seq >= 0 else None,
+            'user': user_message,
+            'bot': bot_message,
+            'delta': {'queries': 1, 'successes': success, 'entities': entities, 'intent': intent}
+        })
+
 @app.route('/api/chat/message', methods=['POST'])
 @token_required
+@admission_controlled
 def send_message():
     """Send chat message and get enhanced bot response"""
+    sweep_idle_sessions()
     try:
         data = request.get_json()
         session_id = data.get('sessionId')
@@ -306,66 +494,126 @@ def send_message():
         if not message_text:
             return jsonify({'message': 'Message text is required'}), 400
 
-        if session_id not in CHAT_SESSIONS:
+        if not STORE.has_session(session_id):
             return jsonify({'message': 'Session not found'}), 404
 
         # Log user message
-        user_message = {
-            'sender': 'user',
-            'text': message_text,
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'user_id': request.current_user['id'],
-            'session_id': session_id
-        }
-
-        CHAT_SESSIONS[session_id]['messages'].append(user_message)
-        USER_MESSAGES.append(user_message)
+        user_message = build_user_message(message_text, session_id)
+        STORE.append_session_message(session_id, user_message)
 
         # Generate enhanced bot response using ML with session context
+        started = time.perf_counter()
         bot_response = generate_enhanced_banking_response(message_text, request.current_user, session_id)
+        latency_ms = (time.perf_counter() - started) * 1000
 
-        bot_message = {
-            'sender': 'bot',
-            'text': bot_response['text'],
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'intent': bot_response.get('intent', 'general'),
-            'confidence': bot_response.get('confidence', 0.8),
-            'entities': bot_response.get('entities', []),
-            'method': bot_response.get('method', 'ml'),
-            'needs_slot_filling': bot_response.get('needs_slot_filling', False),
-            'pending_slots': bot_response.get('pending_slots', {}),
-            'filled_slots': bot_response.get('filled_slots', {})
-        }
-
-        CHAT_SESSIONS[session_id]['messages'].append(bot_message)
-        BOT_MESSAGES.append(bot_message)
+        bot_message = build_bot_message(bot_response)
+        record_bot_message(session_id, user_message, bot_message, latency_ms)
 
         return jsonify({'bot': bot_message}), 200
 
     except Exception as e:
         return jsonify({'message': f'Error processing message: {str(e)}'}), 500
 
-def generate_enhanced_banking_response(message, user, session_id=None):
+def sse_event(event, data):
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def split_paragraphs(text):
+    """Split reply text into paragraph chunks that concatenate back to the original"""
+    parts = text.split('\n\n')
+    return [part + '\n\n' for part in parts[:-1]] + [parts[-1]]
+
+@app.route('/api/chat/message/stream', methods=['POST'])
+@token_required
+@admission_controlled
+def stream_message():
+    """Send chat message and stream the bot reply as server-sent events
+
+    Events: 'analysis' (intent, entities, slots) as soon as the NLU is done,
+    'delta' chunks of the reply text, then 'done' with the stored bot message.
+    A client that disconnects stops the work at the next event boundary.
+    """
+    sweep_idle_sessions()
+    data = request.get_json(silent=True) or {}
+    session_id = data.get('sessionId')
+    message_text = data.get('messageText', '').strip()
+
+    if not message_text:
+        return jsonify({'message': 'Message text is required'}), 400
+
+    if not STORE.has_session(session_id):
+        return jsonify({'message': 'Session not found'}), 404
+
+    user = request.current_user
+    user_message = build_user_message(message_text, session_id)
+    STORE.append_session_message(session_id, user_message)
+
+    def events():
+        # Writing the first bytes surfaces a client that has already gone
+        yield ": stream open\n\n"
+        started = time.perf_counter()
+        try:
+            analysis = run_analysis(message_text, session_id)
+        except Exception as e:
+            print(f"Error in enhanced response generation: {e}")
+            analysis = None
+        if analysis is not None:
+            yield sse_event('analysis', {
+                'intent': analysis['intent'],
+                'confidence': analysis['confidence'],
+                'entities': analysis['entities'],
+                'method': analysis.get('method', 'ml'),
+                'needs_slot_filling': analysis.get('needs_slot_filling', False),
+                'pending_slots': analysis.get('pending_slots', {}),
+                'filled_slots': analysis.get('filled_slots', {})
+            })
+            bot_response = generate_enhanced_banking_response(message_text, user, session_id, analysis)
+        else:
+            bot_response = fallback_banking_response(message_text, user)
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        bot_message = build_bot_message(bot_response)
+        record_bot_message(session_id, user_message, bot_message, latency_ms)
+
+        for chunk in split_paragraphs(bot_message['text']):
+            yield sse_event('delta', {'text': chunk})
+        yield sse_event('done', {'bot': bot_message})
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def run_analysis(message, session_id=None):
+    """NLU analysis of one chat message (intent, entities and slot state)"""
+    if analyze_query:
+        return analyze_query(message, session_id)
+    intent, confidence, entities, method = fallback_analysis(message)
+    return {
+        'intent': intent,
+        'confidence': confidence,
+        'entities': entities,
+        'method': method,
+        'needs_slot_filling': False,
+        'pending_slots': {},
+        'filled_slots': {},
+        'response': ''
+    }
+
+def generate_enhanced_banking_response(message, user, session_id=None, analysis=None):
     """Enhanced ML-powered banking response generator with conversation flows"""
     try:
-        # Use enhanced ML model for intent detection
-        if analyze_query:
-            analysis = analyze_query(message, session_id)
-            intent = analysis['intent']
-            confidence = analysis['confidence']
-            entities = analysis['entities']
-            method = analysis.get('method', 'ml')
-            needs_slot_filling = analysis.get('needs_slot_filling', False)
-            pending_slots = analysis.get('pending_slots', {})
-            filled_slots = analysis.get('filled_slots', {})
-            chitchat_response = analysis.get('response', '')
-        else:
-            # Fallback to basic analysis
-            intent, confidence, entities, method = fallback_analysis(message)
-            needs_slot_filling = False
-            pending_slots = {}
-            filled_slots = {}
-            chitchat_response = ''
+        # Use enhanced ML model for intent detection (unless the caller already ran it)
+        if analysis is None:
+            analysis = run_analysis(message, session_id)
+        intent = analysis['intent']
+        confidence = analysis['confidence']
+        entities = analysis['entities']
+        method = analysis.get('method', 'ml')
+        needs_slot_filling = analysis.get('needs_slot_filling', False)
+        pending_slots = analysis.get('pending_slots', {})
+        filled_slots = analysis.get('filled_slots', {})
+        chitchat_response = analysis.get('response', '')
 
         # Handle chitchat responses
         if intent == 'chitchat' and chitchat_response:
@@ -584,6 +832,7 @@ def fallback_banking_response(message, user):
 
 @app.route('/api/chat/analyze', methods=['POST'])
 @token_required
+@admission_controlled
 def analyze_query_api():
     """Analyze query for NLU using enhanced trained model"""
     try:
@@ -614,73 +863,206 @@ def analyze_query_api():
 @token_required
 def get_user_faqs():
     """Get FAQs for regular users"""
-    return jsonify(FAQS_DB), 200
+    return JSON_CACHE.respond(request, 'faqs', STORE.faq_version(), STORE.list_faqs)
 
 # Admin Routes
 @app.route('/api/admin/logs', methods=['GET'])
 @token_required
 @admin_required
 def get_admin_logs():
-    """Get user messages and bot messages for admin"""
+    """One page of user and bot messages for admin, oldest first within the page
+
+    Pages run newest to oldest: pass the returned next_cursor as ?cursor=
+    for the page before (see /api/admin/logs/query for filters).
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 500)
+        cursor = int(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        return jsonify({'message': 'Invalid query parameters'}), 400
+
+    turns, next_cursor = STORE.query_turns(limit=limit, cursor=cursor)
+    turns.reverse()
     return jsonify({
-        'UserMessages': USER_MESSAGES,
-        'BotMessages': BOT_MESSAGES
+        'UserMessages': [turn['user'] for turn in turns],
+        'BotMessages': [turn['bot'] for turn in turns],
+        'next_cursor': next_cursor
     }), 200
 
+def parse_time_param(value):
+    """Parse an ISO-8601 or epoch-seconds query parameter (naive times are UTC)"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+@app.route('/api/admin/logs/query', methods=['GET'])
+@token_required
+@admin_required
+def query_admin_logs():
+    """Cursor-paginated, filtered chat turns for admin (newest first)"""
+    try:
+        args = request.args
+        limit = min(max(int(args.get('limit', 50)), 1), 500)
+        cursor = int(args['cursor']) if args.get('cursor') else None
+        start = parse_time_param(args.get('start'))
+        end = parse_time_param(args.get('end'))
+        band = args.get('confidence') or None
+        if band and band not in CONFIDENCE_BANDS:
+            return jsonify({'message': f"confidence must be one of {', '.join(CONFIDENCE_BANDS)}"}), 400
+    except ValueError:
+        return jsonify({'message': 'Invalid query parameters'}), 400
+
+    turns, next_cursor = STORE.query_turns(
+        limit=limit,
+        cursor=cursor,
+        start=start,
+        end=end,
+        user_id=args.get('user_id') or None,
+        session_id=args.get('session_id') or None,
+        intent=args.get('intent') or None,
+        method=args.get('method') or None,
+        confidence_band=band
+    )
+    return jsonify({'items': turns, 'next_cursor': next_cursor}), 200
+
 @app.route('/api/admin/logs/refresh', methods=['GET'])
 @token_required
 @admin_required
 def refresh_analytics():
     """Refresh analytics data"""
-    total_queries = len(USER_MESSAGES)
-    success_queries = len([msg for msg in BOT_MESSAGES if msg.get('confidence', 0) > 0.7])
-    success_rate = (success_queries / total_queries) if total_queries > 0 else 0
+    return jsonify(STORE.turn_stats()), 200
 
-    intents = list(set([msg.get('intent', 'unknown') for msg in BOT_MESSAGES]))
-    entities = sum(len(msg.get('entities', [])) for msg in BOT_MESSAGES)
+@app.route('/api/admin/events', methods=['GET'])
+@token_required
+@admin_required
+def admin_events():
+    """Server-sent events for the live dashboard
+
+    Starts with a 'snapshot' of the analytics counters, then one 'turn'
+    event (message pair plus counter deltas) per chat turn. A subscriber
+    that falls too far behind gets a fresh 'snapshot' instead of the
+    dropped turns.
+    """
+    subscriber = ADMIN_EVENTS.subscribe()
+    if subscriber is None:
+        response = jsonify({'message': 'Too many live dashboard connections'})
+        response.headers['Retry-After'] = str(ADMIN_EVENTS_HEARTBEAT)
+        return response, 503
+
+    def events():
+        try:
+            # Subscribed before the snapshot, so turns it already counts are skipped by seq
+            snapshot = STORE.turn_stats()
+            last_seq = snapshot.get('last_seq')
+            yield sse_event('snapshot', snapshot)
+            while True:
+                batch = subscriber.drain(ADMIN_EVENTS_HEARTBEAT)
+                if batch is None:
+                    snapshot = STORE.turn_stats()
+                    last_seq = snapshot.get('last_seq')
+                    yield sse_event('snapshot', snapshot)
+                elif not batch:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield ''.join(sse_event('turn', event) for event in batch
+                                  if last_seq is None or event['seq'] is None or event['seq'] > last_seq)
+        finally:
+            ADMIN_EVENTS.unsubscribe(subscriber)
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/admin/analytics/timeseries', methods=['GET'])
+@token_required
+@admin_required
+def analytics_timeseries():
+    """Bucketed query volume, intents, methods, confidence and latency over a time range"""
+    resolution = request.args.get('resolution', 'minute')
+    if resolution not in RollupEngine.RESOLUTIONS:
+        return jsonify({'message': f"resolution must be one of {', '.join(RollupEngine.RESOLUTIONS)}"}), 400
+    try:
+        end = parse_time_param(request.args.get('end')) or time.time()
+        default_span = 3600 if resolution == 'minute' else 24 * 3600
+        start = parse_time_param(request.args.get('start')) or end - default_span
+        step = min(max(int(request.args.get('step', 1)), 1), 1440)
+    except ValueError:
+        return jsonify({'message': 'Invalid query parameters'}), 400
+    if start > end:
+        return jsonify({'message': 'start must be before end'}), 400
 
-    return jsonify({
-        'queries': total_queries,
-        'success': success_rate,
-        'intents': len(intents),
-        'entity': entities
-    }), 200
+    return jsonify(ROLLUPS.timeseries(resolution, start, end, step)), 200
 
 @app.route('/api/admin/logs/download', methods=['GET'])
 @token_required
 @admin_required
 def download_logs():
-    """Download logs as CSV"""
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Write header
-    writer.writerow(['Timestamp', 'User', 'Message', 'Intent', 'Confidence', 'Method'])
-
-    # Write data
-    for i, user_msg in enumerate(USER_MESSAGES):
-        bot_msg = BOT_MESSAGES[i] if i < len(BOT_MESSAGES) else {}
-        writer.writerow([
-            user_msg.get('timestamp', ''),
-            user_msg.get('user_id', ''),
-            user_msg.get('text', ''),
-            bot_msg.get('intent', ''),
-            bot_msg.get('confidence', ''),
-            bot_msg.get('method', '')
-        ])
-
-    output.seek(0)
-    response = make_response(output.getvalue())
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = 'attachment; filename=enhanced_chat_logs.csv'
-    return response
+    """Download logs as CSV, streamed with optional gzip, filters and resumable ranges"""
+    try:
+        start = parse_time_param(request.args.get('start'))
+        end = parse_time_param(request.args.get('end'))
+    except ValueError:
+        return jsonify({'message': 'Invalid date range'}), 400
+    intent = request.args.get('intent') or None
+
+    # ?format=gz downloads a .csv.gz file; otherwise gzip is negotiated transparently
+    as_file = request.args.get('format') == 'gz'
+    gzip_encoded = not as_file and accepts_gzip(request)
+    compressed = as_file or gzip_encoded
+
+    last_turn = STORE.recent_turns(1)
+    until_seq = last_turn[0]['seq'] if last_turn else -1
+    etag = export_etag(STORE.count_turns(), until_seq,
+                       {'start': start, 'end': end, 'intent': intent}, 'gzip' if compressed else 'identity')
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': 'private, no-cache',
+        'Content-Disposition': f"attachment; filename=enhanced_chat_logs.csv{'.gz' if as_file else ''}",
+    }
+    if gzip_encoded:
+        headers['Content-Encoding'] = 'gzip'
+    content_type = 'application/gzip' if as_file else 'text/csv'
+
+    if request.if_none_match.contains_weak(etag.strip('"')):
+        return Response(status=304, headers=headers)
+
+    def body():
+        chunks = iter_csv_chunks(STORE.iter_turns(), start, end, intent, until_seq)
+        return gzip_chunks(chunks) if compressed else chunks
+
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and (not if_range or if_range == etag):
+        # Resuming: size the export with a throwaway pass (once per ETag), then stream only the tail
+        total = EXPORT_LENGTHS.get(etag, lambda: stream_length(body()))
+        try:
+            byte_range = parse_range(range_header, total)
+        except ValueError:
+            headers['Content-Range'] = f"bytes */{total}"
+            return Response(status=416, headers=headers)
+        if byte_range:
+            first, last = byte_range
+            headers['Content-Range'] = f"bytes {first}-{last}/{total}"
+            headers['Content-Length'] = str(last - first + 1)
+            return Response(slice_chunks(body(), first, last), status=206, headers=headers, content_type=content_type)
+
+    return Response(body(), headers=headers, content_type=content_type)
 
 @app.route('/api/admin/faq', methods=['GET'])
 @token_required
 @admin_required
 def get_admin_faqs():
     """Get all FAQs for admin management"""
-    return jsonify(FAQS_DB), 200
+    return JSON_CACHE.respond(request, 'faqs', STORE.faq_version(), STORE.list_faqs)
 
 @app.route('/api/admin/faq', methods=['POST'])
 @token_required
@@ -696,13 +1078,13 @@ def create_faq():
             return jsonify({'message': 'Question and answer are required'}), 400
 
         new_faq = {
-            '_id': f"faq_{len(FAQS_DB) + 1:03d}",
+            '_id': f"faq_{STORE.count_faqs() + 1:03d}",
             'question': question,
             'answer': answer,
             'created_at': datetime.now(timezone.utc).isoformat()
         }
 
-        FAQS_DB.append(new_faq)
+        STORE.add_faq(new_faq)
         return jsonify(new_faq), 201
 
     except Exception as e:
@@ -714,8 +1096,7 @@ def create_faq():
 def delete_faq(faq_id):
     """Delete FAQ"""
     try:
-        global FAQS_DB
-        FAQS_DB = [faq for faq in FAQS_DB if faq['_id'] != faq_id]
+        STORE.delete_faq(faq_id)
         return jsonify({'message': 'FAQ deleted successfully'}), 200
     except Exception as e:
         return jsonify({'message': f'Error deleting FAQ: {str(e)}'}), 500
@@ -723,14 +1104,16 @@ def delete_faq(faq_id):
 # Health check
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({
+    """Health check endpoint (never cached: probes need the live timestamp)"""
+    counts = (STORE.count_users(), STORE.count_sessions(), STORE.count_faqs())
+    response = jsonify({
         'status': 'healthy',
         'version': '3.0 - Enhanced ML with Conversation Flows',
         'timestamp': datetime.now(timezone.utc).isoformat(),
-        'users': len(USERS_DB),
-        'sessions': len(CHAT_SESSIONS),
-        'faqs': len(FAQS_DB),
+        'users': counts[0],
+        'sessions': counts[1],
+        'faqs': counts[2],
+        'storage': type(STORE).__name__,
         'ml_enabled': analyze_query is not None,
         'features': [
             'Structured conversation flows',
@@ -739,18 +1122,63 @@ def health_check():
             'Natural chitchat responses',
             'Slot filling for information gathering'
         ]
-    }), 200
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response, 200
+
+def register_gauges():
+    """Scrape-time gauges and counters for /api/metrics"""
+    METRICS.gauge('chat_sessions', 'Chat sessions held by the store',
+                  lambda: [({}, STORE.count_sessions())])
+    METRICS.gauge('chat_turns', 'Chat turns recorded in the admin log',
+                  lambda: [({}, STORE.turn_stats()['queries'])])
+    METRICS.gauge('nlu_in_flight', 'NLU-bound requests currently running',
+                  lambda: [({}, NLU_CONCURRENCY.in_flight)])
+    METRICS.counter('nlu_shed_total', 'NLU-bound requests shed for lack of a slot',
+                  lambda: [({}, NLU_CONCURRENCY.shed)])
+    METRICS.gauge('rate_limit_buckets', 'Per-user token buckets held',
+                  lambda: [({}, len(USER_RATE_LIMITER))])
+    METRICS.gauge('admin_stream_subscribers', 'Open live dashboard streams',
+                  lambda: [({}, len(ADMIN_EVENTS))])
+    if nlu_status is not None:
+        METRICS.gauge('nlu_context_entries', 'Conversation contexts held by the NLU',
+                      lambda: [({}, nlu_status()['contexts'])])
+        METRICS.gauge('model_info', 'Loaded intent model (version label is a content hash)',
+                      lambda: [({'version': str(nlu_status()['model_version'])}, 1)])
+
+register_gauges()
+
+def render_metrics():
+    return Response(METRICS.render(), mimetype='text/plain', headers={'Cache-Control': 'no-store'},
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
+admin_metrics = token_required(admin_required(render_metrics))
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition for admins, or for bearer SECUREBANK_METRICS_TOKEN when set"""
+    token = os.environ.get('SECUREBANK_METRICS_TOKEN')
+    supplied = request.headers.get('Authorization', '')
+    if token and hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        return render_metrics()
+    return admin_metrics()
+
+def reset_worker_state():
+    """Per-process state a forked gunicorn worker must not inherit (see gunicorn.conf.py)"""
+    METRICS.reset()
+    with _session_sweep_lock:
+        _session_sweep['last'] = time.monotonic()
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_react(path):
     if path.startswith('api'):
         return root()
-    static_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), '../frontend/dist'))
-    if path != "" and os.path.exists(os.path.join(static_folder, path)):
-        return send_from_directory(static_folder, path)
-    else:
-        return send_from_directory(static_folder, 'index.html')
+    if path in STATIC_ASSETS:
+        return STATIC_ASSETS.respond(request, path)
+    if 'index.html' in STATIC_ASSETS:
+        return STATIC_ASSETS.respond(request, 'index.html')
+    return jsonify({'message': 'Frontend build not found'}), 404
 
 if __name__ == '__main__':
     print("🏦 SecureBank Enhanced AI Chatbot API Starting...")
@@ -0,0 +1,93 @@
+"""
+Tiered account store: hit rate, hydration latency and memory
+
+Loads --accounts synthetic customers into a TieredBankingDataService with a
+--budget-mb hot tier, then replays an hour-like workload: --active percent
+of customers make nearly all requests (balance checks, statements and
+transfers), the rest are dormant and only occasionally touched. Reports
+the cache hit rate, hydration latency and resident memory, and checks the
+bank-wide statistics against the headers afterwards. Run from the backend
+directory:
+    python -m benchmarks.account_cache --accounts 200000 --budget-mb 64 --active 5
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import resource
+import time
+from datetime import datetime
+
+from models.account_store import TieredBankingDataService
+from models.population import populate
+
+
+def rss_mb():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+
+
+def workload(service, numbers, requests, active_percent, dormant_share, seed):
+    """Replay `requests` operations; returns requests/sec"""
+    rng = random.Random(seed)
+    active = rng.sample(numbers, max(1, len(numbers) * active_percent // 100))
+
+    def pick():
+        return rng.choice(numbers) if rng.random() < dormant_share else rng.choice(active)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < 0.5:
+            service.get_account(pick()).get_recent_transactions(5)
+        elif roll < 0.8:
+            service.get_account(pick()).get_spending_summary(group_by="category")
+        else:
+            source, target = pick(), pick()
+            if source != target:
+                service.transfer_money(source, target, rng.randint(1, 2000), "bench")
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--accounts', type=int, default=200000)
+    parser.add_argument('--budget-mb', type=int, default=64)
+    parser.add_argument('--active', type=int, default=5, help="percent of customers active this hour")
+    parser.add_argument('--dormant-share', type=float, default=0.02, help="share of requests for dormant customers")
+    parser.add_argument('--requests', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    baseline = rss_mb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = TieredBankingDataService(budget_bytes=args.budget_mb * 1024 * 1024)
+    load = populate(service, args.accounts, args.seed, now=datetime(2026, 1, 1))
+    numbers = list(service.accounts)
+    loaded = service.get_cache_statistics()
+
+    print(f"📊 Tiered accounts ({args.accounts:,} accounts, {args.budget_mb} MB hot tier, "
+          f"{args.active}% active, {args.dormant_share:.0%} dormant traffic)")
+    print("=" * 72)
+    print(f"Load:        {load['accounts_per_second']:>10,.0f} accounts/s, {loaded['write_backs']:,} spilled to disk")
+    print(f"Resident:    {rss_mb() - baseline:>10,.0f} MB for {len(numbers):,} accounts "
+          f"({loaded['hot_accounts']:,} hot)")
+
+    rate = workload(service, numbers, args.requests, args.active, args.dormant_share, args.seed)
+    stats = service.get_cache_statistics()
+    print(f"Workload:    {rate:>10,.0f} requests/s over {args.requests:,} requests")
+    print(f"Hit rate:    {stats['hit_rate']:>10.1%} ({stats['hits']:,} hits, {stats['misses']:,} hydrations)")
+    latency = stats['hydration_ms']
+    print(f"Hydration:   {latency['p50']:>10.3f} ms p50, {latency['p95']:.3f} ms p95, {latency['max']:.3f} ms max")
+    print(f"Hot tier:    {stats['hot_bytes'] / 1024 / 1024:>10.1f} MB in {stats['hot_accounts']:,} accounts, "
+          f"{stats['evictions']:,} evictions, {stats['write_backs']:,} write-backs")
+    print(f"Resident:    {rss_mb() - baseline:>10,.0f} MB after the workload")
+
+    mismatches = service.verify_statistics()
+    assert not mismatches, f"statistics drifted: {mismatches}"
+    print("✅ Bank-wide statistics match the account headers")
+
+
+if __name__ == '__main__':
+    main()
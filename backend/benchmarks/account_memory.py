@@ -0,0 +1,143 @@
+"""
+Bytes per account: dict-based accounts vs slotted records
+
+Builds --accounts synthetic accounts twice, each in a fresh subprocess so
+the resident-memory deltas don't mix: once as the old dict-shaped layout
+(a per-instance __dict__, string status/branch/IFSC/email/phone fields and
+cards as dicts) and once as the slotted BankAccount with Card records and
+interned codes. Both share one empty ledger, so the numbers cover the
+account, its cards and loans, its lock and the accounts dict entry. Run
+from the backend directory:
+    python -m benchmarks.account_memory --accounts 1000000
+"""
+
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from models.account_records import Card
+from models.banking_data import BankAccount
+from models.ledger import TransactionLedger
+from models.population import ACCOUNT_TYPES, FIRST_NAMES, LAST_NAMES, STATUSES, generate_population
+
+SHARED_LEDGER = TransactionLedger(capacity=1)
+
+
+class DictBankAccount:
+    """The account layout before slotting, attribute for attribute"""
+
+    def __init__(self, account_number, customer_name, account_type, balance, status, created_date, phone):
+        self.statistics = None
+        self.account_number = account_number
+        self.customer_name = customer_name
+        self._account_type = account_type
+        self._balance = balance
+        self.created_date = created_date
+        self._status = status
+        self.phone = phone
+        self.email = customer_name.lower().replace(" ", "") + "@example.com"
+        self.branch_code = "SB001"
+        self.ifsc_code = "SBIN0000123"
+        self.transactions = SHARED_LEDGER
+        self.cards = []
+        self.loans = []
+        self.lock = threading.Lock()
+
+
+def build(layout, count, seed):
+    accounts = {}
+    for batch in generate_population(count, seed, now=datetime(2026, 1, 1)):
+        c = batch.columns
+        created = c['created_date'].astype('datetime64[us]').tolist()
+        for i, (number, first, last, account_type, status, balance, phone, debit, credit, limit, digits,
+                expiry_days, issued_days) in enumerate(zip(
+                    c['account_number'].tolist(), c['first_name'].tolist(), c['last_name'].tolist(),
+                    c['account_type'].tolist(), c['status'].tolist(), c['balance'].tolist(), c['phone'].tolist(),
+                    c['debit_card'].tolist(), c['credit_card'].tolist(), c['credit_limit'].tolist(),
+                    c['card_digits'].tolist(), c['card_expiry_days'].tolist(), c['card_issued_days'].tolist())):
+            number, name = str(number), f"{FIRST_NAMES[first]} {LAST_NAMES[last]}"
+            if layout == 'dict':
+                account = DictBankAccount(number, name, ACCOUNT_TYPES[account_type], balance, STATUSES[status],
+                                          created[i], str(phone))
+            else:
+                account = BankAccount(number, name, ACCOUNT_TYPES[account_type], sample_data=False)
+                account.balance = balance
+                account.status = STATUSES[status]
+                account.created_date = created[i]
+                account.phone = str(phone)
+                account.transactions = SHARED_LEDGER
+            for slot, (card_type, issued) in enumerate((("Debit Card", debit), ("Credit Card", credit))):
+                if not issued:
+                    continue
+                expiry = (batch.generated_at + timedelta(days=expiry_days[slot])).strftime("%m/%y")
+                issued_at = batch.generated_at - timedelta(days=issued_days[slot])
+                daily, monthly = (50000, 500000) if slot == 0 else (limit // 10, limit)
+                if layout == 'dict':
+                    account.cards.append({
+                        "card_type": card_type,
+                        "card_number": f"****-****-****-{digits[slot]}",
+                        "card_status": "Active",
+                        "expiry_date": expiry,
+                        "daily_limit": daily,
+                        "monthly_limit": monthly,
+                        "issued_date": issued_at.isoformat()
+                    })
+                else:
+                    account.cards.append(Card(card_type, digits[slot], expiry, daily, monthly, issued_at))
+            accounts[number] = account
+    return accounts
+
+
+def resident_bytes():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+def measure(layout, count, seed):
+    """Resident bytes per account for one layout (run in its own process)"""
+    generate_population(1)  # import and warm NumPy before the baseline
+    gc.collect()
+    baseline = resident_bytes()
+    started = time.perf_counter()
+    accounts = build(layout, count, seed)
+    gc.collect()
+    return {"bytes_per_account": (resident_bytes() - baseline) / len(accounts),
+            "seconds": time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--accounts', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--layout', choices=['dict', 'slotted'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.layout:
+        print(json.dumps(measure(args.layout, args.accounts, args.seed)))
+        return
+
+    print(f"📊 Resident bytes per account ({args.accounts:,} accounts, seed {args.seed})")
+    print("=" * 60)
+    results = {}
+    for layout in ('dict', 'slotted'):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.account_memory', '--layout', layout,
+             '--accounts', str(args.accounts), '--seed', str(args.seed)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results[layout] = json.loads(output.strip().splitlines()[-1])
+        print(f"{layout:<8} {results[layout]['bytes_per_account']:>8,.0f} bytes/account "
+              f"({results[layout]['bytes_per_account'] * args.accounts / 1024 / 1024:,.0f} MB total, "
+              f"built in {results[layout]['seconds']:.1f} s)")
+    saved = 1 - results['slotted']['bytes_per_account'] / results['dict']['bytes_per_account']
+    print(f"✅ Slotted records use {saved:.0%} less memory per account")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Account search latency over a large synthetic customer base
+
+Indexes --accounts synthetic customers and times typical lookups: a full
+name, a surname shared by many customers, an email fragment, an account
+number suffix and one- and two-character queries, then single-account
+renames (each followed by a search, so the appended keys are merged every
+time). Results are checked against a linear scan on a sample of queries.
+Run from the backend directory:
+    python -m benchmarks.account_search --accounts 1000000
+"""
+
+import argparse
+import random
+import time
+
+from models.account_index import AccountIndex
+
+FIRST_NAMES = ["Rajesh", "Priya", "Amit", "Sneha", "Vikram", "Anita", "Suresh", "Kavya",
+               "Arjun", "Meera", "Rohan", "Divya", "Karan", "Pooja", "Nikhil", "Isha"]
+LAST_NAMES = ["Kumar", "Sharma", "Patel", "Reddy", "Singh", "Gupta", "Iyer", "Nair",
+              "Mehta", "Joshi", "Rao", "Das", "Verma", "Bose", "Malhotra", "Kapoor"]
+
+
+def build_accounts(count, seed=11):
+    rng = random.Random(seed)
+    accounts = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f"{first} {last}" if rng.random() < 0.5 else f"{first} {last} {i:x}"
+        accounts.append((f"{1000000000 + i}", name, f"{first}.{last}{i}@email.com".lower()))
+    return accounts
+
+
+def linear_search(accounts, query):
+    query = query.lower()
+    return {number for number, name, email in accounts
+            if query in name.lower() or query in number or query in email}
+
+
+def timed(query, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        query()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--accounts', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    accounts = build_accounts(args.accounts)
+    index = AccountIndex()
+    start = time.perf_counter()
+    index.extend(accounts)
+    build_s = time.perf_counter() - start
+
+    sample_number, sample_name, sample_email = accounts[len(accounts) // 2]
+    queries = {
+        'full name': sample_name,
+        'common surname': 'kumar',
+        'email fragment': sample_email.split('@')[0][-6:],
+        'account suffix': sample_number[-6:],
+        'two characters': 'pr',
+        'one character': '9',
+    }
+
+    for query in (sample_name, sample_email.split('@')[0][-6:], sample_number[-6:], 'ar'):
+        found = set(index.search(query, limit=None))
+        assert found == linear_search(accounts, query), f"index and scan disagree on {query!r}"
+
+    print(f"📊 Account search ({args.accounts:,} accounts, indexed in {build_s:.1f} s, limit {args.limit})")
+    print("=" * 60)
+    for label, query in queries.items():
+        hits = len(index.search(query, args.limit))
+        print(f"{label:<18} {query!r:<22} {timed(lambda: index.search(query, args.limit), args.repeat):>8.3f} ms"
+              f" {hits:>4} hits")
+    scan_ms = timed(lambda: linear_search(accounts, 'kumar'), 1)
+    print(f"{'linear scan':<18} {'kumar':<22} {scan_ms:>8.3f} ms")
+
+    renames = iter(random.Random(7).sample(accounts, min(args.repeat * 10, len(accounts))))
+
+    def rename_and_search():
+        number, name, email = next(renames)
+        index.add(number, name + ' renamed', email)
+        index.search('kumar', args.limit)
+
+    print(f"{'rename + search':<18} {'':<22} {timed(rename_and_search, args.repeat * 10):>8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
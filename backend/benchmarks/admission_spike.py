@@ -0,0 +1,97 @@
+"""
+Latency of admitted NLU requests during a load spike, with and without
+admission control
+
+Each client thread is a distinct user hammering /api/chat/analyze for a
+fixed time. Without limits every request is accepted and latency grows
+with the crowd; with them the excess is shed (429/503) and the admitted
+requests keep a bounded p99. Run from the backend directory:
+    python -m benchmarks.admission_spike --clients 32 --seconds 5
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+import app as api
+from admission import ConcurrencyLimiter, TokenBucketLimiter
+
+QUERIES = ["What's my balance?", "Transfer 5000 to 1234567890", "I lost my debit card", "Apply for home loan"]
+
+
+def make_users(count):
+    """Register synthetic users and return their auth headers"""
+    headers = []
+    for i in range(count):
+        user = {'id': f'bench_{i:04d}', 'name': f'Bench {i}', 'email': f'bench{i}@securebank.com',
+                'password': b'', 'role': 'user', 'account_number': None}
+        api.STORE.add_user(user)
+        headers.append({'Authorization': f"Bearer {api.create_token(user)}"})
+    return headers
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+def spike(headers, seconds):
+    """Run every client until the deadline; returns admitted latencies (ms) and status counts"""
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(auth):
+        test_client = api.app.test_client()
+        local_latencies, local_statuses = [], {}
+        i = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = test_client.post('/api/chat/analyze', headers=auth, json={'query': QUERIES[i % len(QUERIES)]})
+            elapsed = (time.perf_counter() - start) * 1000
+            local_statuses[response.status_code] = local_statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200:
+                local_latencies.append(elapsed)
+            else:
+                time.sleep(min(float(response.headers.get('Retry-After', 1)), 0.05))
+            i += 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=client, args=(auth,)) for auth in headers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=20.0, help="per-user tokens/second")
+    args = parser.parse_args()
+
+    headers = make_users(args.clients)
+    configs = {
+        'unlimited': (TokenBucketLimiter(rate=1e9, burst=1e9), ConcurrencyLimiter(args.clients, queue_timeout=None)),
+        'admission': (TokenBucketLimiter(rate=args.rate, burst=args.rate), ConcurrencyLimiter(args.concurrency)),
+    }
+
+    print(f"📊 /api/chat/analyze spike ({args.clients} clients, {args.seconds:.0f}s each)")
+    print("=" * 72)
+    print(f"{'mode':<10} {'admitted/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}   statuses")
+    for name, (rate_limiter, concurrency) in configs.items():
+        api.USER_RATE_LIMITER, api.NLU_CONCURRENCY = rate_limiter, concurrency
+        latencies, statuses = spike(headers, args.seconds)
+        print(f"{name:<10} {len(latencies) / args.seconds:>10.1f} {statistics.median(latencies):>8.2f} "
+              f"{percentile(latencies, 0.99):>8.2f} {max(latencies):>8.2f}   {dict(sorted(statuses.items()))}")
+
+
+if __name__ == '__main__':
+    main()
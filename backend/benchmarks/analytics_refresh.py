@@ -0,0 +1,62 @@
+"""
+Latency benchmark for /api/admin/logs/refresh as the chat log grows
+
+Compares the incremental counters with the old full scan over every bot
+message. Run from the backend directory:
+    python -m benchmarks.analytics_refresh --max-turns 1000000
+"""
+
+import argparse
+import time
+
+from chat_log import ChatLog
+from storage import MemoryStorage
+
+INTENTS = ['check_balance', 'transfer_money', 'apply_loan', 'lost_card', 'chitchat', 'fallback']
+
+
+def full_scan(bot_messages):
+    """The pre-counter implementation of refresh_analytics"""
+    total_queries = len(bot_messages)
+    success_queries = len([msg for msg in bot_messages if msg.get('confidence', 0) > 0.7])
+    intents = list(set([msg.get('intent', 'unknown') for msg in bot_messages]))
+    entities = sum(len(msg.get('entities', [])) for msg in bot_messages)
+    return total_queries, success_queries, len(intents), entities
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-turns', type=int, default=1000000)
+    args = parser.parse_args()
+
+    store = MemoryStorage(chat_log=ChatLog(tail_size=100))
+    bot_messages = []
+    user_message = {'sender': 'user', 'text': 'hello', 'user_id': 'user_001', 'session_id': 's1'}
+
+    print("📊 Analytics refresh latency")
+    print("=" * 60)
+    print(f"{'turns':>10} {'counters (µs)':>16} {'full scan (µs)':>16}")
+    size = 0
+    checkpoint = 1000
+    while checkpoint <= args.max_turns:
+        while size < checkpoint:
+            bot_message = {'intent': INTENTS[size % len(INTENTS)], 'confidence': (size % 10) / 10,
+                           'entities': [{}] * (size % 3), 'method': 'ml'}
+            store.append_turn(user_message, bot_message)
+            bot_messages.append(bot_message)
+            size += 1
+        counter_us = timed(store.turn_stats, 1000)
+        scan_us = timed(lambda: full_scan(bot_messages), 3 if size < 100000 else 1)
+        print(f"{size:>10} {counter_us:>16.2f} {scan_us:>16.1f}")
+        checkpoint *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Throughput benchmark for /api/chat/message under each storage backend
+
+Run from the backend directory:
+    python -m benchmarks.chat_throughput --messages 500 --threads 4
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import app as api
+from admission import ConcurrencyLimiter, TokenBucketLimiter
+from storage import MemoryStorage, SQLiteStorage
+
+QUERIES = [
+    "What's my balance?",
+    "Transfer 5000 to 1234567890",
+    "I lost my debit card",
+    "Apply for home loan",
+    "Find nearest branch",
+    "Show my account details",
+]
+
+
+def login(client, email="rajesh@securebank.com", password="user123"):
+    """Log in and return auth headers"""
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+
+def run(store, messages, threads):
+    """Send `messages` chat messages spread over `threads` clients and return messages/sec"""
+    api.STORE = store
+    per_thread = messages // threads
+    errors = []
+
+    def worker():
+        client = api.app.test_client()
+        headers = login(client)
+        session_id = client.post('/api/session/create', headers=headers).get_json()['sessionId']
+        for i in range(per_thread):
+            response = client.post('/api/chat/message', headers=headers,
+                                   json={'sessionId': session_id, 'messageText': QUERIES[i % len(QUERIES)]})
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    store.flush()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed, elapsed, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    # Measure raw throughput, not admission control
+    api.USER_RATE_LIMITER = TokenBucketLimiter(rate=1e9, burst=1e9)
+    api.NLU_CONCURRENCY = ConcurrencyLimiter(limit=args.threads, queue_timeout=None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            'memory': MemoryStorage(dict(api.USERS_DB), {}, list(api.FAQS_DB)),
+            'sqlite': SQLiteStorage(os.path.join(tmp, 'bench.db'), seed_users=api.USERS_DB, seed_faqs=api.FAQS_DB),
+        }
+
+        print(f"📊 /api/chat/message throughput ({args.messages} messages, {args.threads} threads)")
+        print("=" * 60)
+        for name, store in backends.items():
+            rate, elapsed, errors = run(store, args.messages, args.threads)
+            print(f"{name:<8} {rate:>10.1f} msg/s   {elapsed:>7.2f}s   errors: {errors}")
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
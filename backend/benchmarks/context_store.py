@@ -0,0 +1,57 @@
+"""
+Latency benchmark for NLU conversation context stores
+
+Run from the backend directory:
+    python -m benchmarks.context_store --ops 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from context_store import MemoryContextStore, SQLiteContextStore
+
+SAMPLE_CONTEXT = {
+    'last_intent': 'transfer_money',
+    'last_update': '2024-01-01T10:00:00',
+    'pending_slots': {'recipient': "To which account or person would you like to transfer?"},
+    'filled_slots': {'amount': '5000'},
+}
+
+
+def measure(store, ops):
+    """Return mean put and get latency in microseconds"""
+    keys = [f"session_{i}" for i in range(1000)]
+
+    start = time.perf_counter()
+    for i in range(ops):
+        store.put(keys[i % len(keys)], SAMPLE_CONTEXT)
+    put_us = (time.perf_counter() - start) / ops * 1e6
+
+    start = time.perf_counter()
+    for i in range(ops):
+        store.get(keys[i % len(keys)])
+    get_us = (time.perf_counter() - start) / ops * 1e6
+    return put_us, get_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ops', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            'memory': MemoryContextStore(),
+            'sqlite': SQLiteContextStore(os.path.join(tmp, 'context.db')),
+        }
+        print(f"📊 Context store latency ({args.ops} ops)")
+        print("=" * 50)
+        for name, store in stores.items():
+            put_us, get_us = measure(store, args.ops)
+            print(f"{name:<8} put {put_us:>8.1f} µs   get {get_us:>8.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Memory and chat throughput of the gunicorn deployment by worker count
+
+Starts gunicorn with gunicorn.conf.py once per worker count, drives
+/api/chat/message over HTTP for a fixed time, then reads the memory of the
+master and its workers from /proc (Linux). RSS counts shared pages once per
+process; PSS splits them between the processes sharing them, so the PSS
+total shows what preloading and gc.freeze actually save. Run from the
+backend directory:
+    python -m benchmarks.gunicorn_workers --workers 1 2 4 --threads 8 --seconds 10
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUERIES = [
+    "What's my balance?",
+    "Transfer 5000 to 1234567890",
+    "I lost my debit card",
+    "Apply for home loan",
+    "Find nearest branch",
+    "Show my account details",
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def request(conn, method, path, body=None, headers=None):
+    """Send one JSON request on a kept-alive connection; returns (status, parsed body)"""
+    headers = {'Content-Type': 'application/json', **(headers or {})}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, json.loads(data) if data else None
+
+
+def wait_until_up(port, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            if request(conn, 'GET', '/api/health')[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"gunicorn did not answer on port {port}")
+
+
+def memory_kb(pid):
+    """Rss and Pss of one process from /proc/<pid>/smaps_rollup"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                values[key] = int(rest.split()[0])
+    return values.get('Rss', 0), values.get('Pss', 0)
+
+
+def process_tree(pid):
+    pids = [pid]
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as f:
+            pids.extend(int(child) for child in f.read().split())
+    return pids
+
+
+def drive(port, clients, seconds):
+    """Chat from `clients` connections until the deadline; returns (ok replies, errors)"""
+    counts = {'ok': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = []
+    ready = threading.Barrier(clients, action=lambda: deadline.append(time.perf_counter() + seconds))
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        _, login = request(conn, 'POST', '/api/auth/login',
+                           {'email': 'rajesh@securebank.com', 'password': 'user123'})
+        auth = {'Authorization': f"Bearer {login['token']}"}
+        _, session = request(conn, 'POST', '/api/session/create', headers=auth)
+        ready.wait()  # logins cost a bcrypt check each; start the clock once everyone is in
+        ok = errors = i = 0
+        while time.perf_counter() < deadline[0]:
+            status, _ = request(conn, 'POST', '/api/chat/message',
+                                {'sessionId': session['sessionId'], 'messageText': QUERIES[i % len(QUERIES)]}, auth)
+            if status == 200:
+                ok += 1
+            else:
+                errors += 1
+            i += 1
+        with lock:
+            counts['ok'] += ok
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts['ok'], counts['errors']
+
+
+def run(workers, threads, clients, seconds):
+    port = free_port()
+    scratch = tempfile.mkdtemp(prefix='securebank-bench-')
+    env = {
+        **os.environ,
+        'SECUREBANK_BIND': f'127.0.0.1:{port}',
+        'SECUREBANK_WORKERS': str(workers),
+        'SECUREBANK_THREADS': str(threads),
+        'SECUREBANK_STORE': 'sqlite',
+        'SECUREBANK_DB_PATH': os.path.join(scratch, 'bench.db'),
+        'SECUREBANK_CONTEXT_STORE': 'sqlite',
+        'SECUREBANK_CONTEXT_DB_PATH': os.path.join(scratch, 'context.db'),
+        'SECUREBANK_METRICS_DIR': os.path.join(scratch, 'metrics'),
+        # Measure capacity, not admission control
+        'SECUREBANK_USER_RATE': '1e9',
+        'SECUREBANK_USER_BURST': '1e9',
+        'SECUREBANK_NLU_CONCURRENCY': str(threads),
+        'SECUREBANK_NLU_QUEUE_TIMEOUT': '30',
+    }
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application'],
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(port)
+        ok, errors = drive(port, clients, seconds)
+        rss = pss = 0
+        for pid in process_tree(server.pid):
+            process_rss, process_pss = memory_kb(pid)
+            rss += process_rss
+            pss += process_pss
+        return ok / seconds, errors, rss / 1024, pss / 1024
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"📊 gunicorn /api/chat/message ({args.clients} clients, {args.threads} threads/worker, "
+          f"{args.seconds:.0f}s, {os.cpu_count()} cores)")
+    print("=" * 72)
+    print(f"{'workers':>7} {'msgs/s':>9} {'errors':>7} {'RSS MB':>9} {'PSS MB':>9} {'PSS/worker':>11}")
+    for workers in args.workers:
+        rate, errors, rss, pss = run(workers, args.threads, args.clients, args.seconds)
+        print(f"{workers:>7} {rate:>9.1f} {errors:>7} {rss:>9.1f} {pss:>9.1f} {pss / workers:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
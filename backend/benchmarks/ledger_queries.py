@@ -0,0 +1,77 @@
+"""
+Transaction history query latency on a large account ledger
+
+Posts a synthetic history (a posting every few minutes) and times the
+queries the chatbot asks: last month's spending, ATM withdrawals since a
+date, large credits, and per-month / per-category groupings. Run from the
+backend directory:
+    python -m benchmarks.ledger_queries --transactions 100000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from models.ledger import TransactionLedger
+
+POSTINGS = [
+    ("credit", "Salary Credit", (25000, 75000)),
+    ("debit", "ATM Withdrawal", (1000, 10000)),
+    ("debit", "Online Purchase", (500, 15000)),
+    ("debit", "Utility Bill Payment", (500, 5000)),
+    ("credit", "Interest Credit", (100, 2000)),
+    ("debit", "Fund Transfer", (1000, 50000)),
+    ("credit", "Refund Credit", (200, 5000)),
+]
+
+
+def build_ledger(count, seed=7):
+    rng = random.Random(seed)
+    ledger = TransactionLedger()
+    date = datetime.now() - timedelta(minutes=8 * count)
+    start = time.perf_counter()
+    for i in range(count):
+        date += timedelta(minutes=rng.randint(1, 15))
+        transaction_type, description, amount_range = rng.choice(POSTINGS)
+        ledger.append(date, transaction_type, description, rng.randint(*amount_range), 0.0, i, rng.randint(100000, 999999))
+    len(ledger.dates)  # flush the queued postings
+    return ledger, (time.perf_counter() - start) / count * 1e6
+
+
+def timed(query, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        query()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    ledger, post_us = build_ledger(args.transactions)
+    last = ledger.dates[-1].astype('datetime64[M]')
+    last_month, this_month = last - 1, last
+    three_months_ago = last - 3
+
+    queries = {
+        'spending last month': lambda: ledger.select(start=last_month, end=this_month, transaction_type='debit').total(),
+        'ATM withdrawals since': lambda: ledger.select(start=three_months_ago, description_contains='atm').count(),
+        'credits over ₹10,000': lambda: ledger.select(transaction_type='credit', min_amount=10000).records(20),
+        'debits by month': lambda: ledger.select(transaction_type='debit').by_month(),
+        'debits by category': lambda: ledger.select(transaction_type='debit').by_description(),
+        '20 most recent': lambda: ledger.recent(20),
+    }
+
+    print(f"📊 Ledger queries ({args.transactions:,} transactions, {ledger.nbytes / 1024 / 1024:.1f} MB, "
+          f"{post_us:.2f} µs/posting)")
+    print("=" * 60)
+    for name, query in queries.items():
+        print(f"{name:<24} {timed(query, args.repeat):>8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,435 @@
+"""
+End-to-end load test for the chat API
+
+Runs N virtual users against a server for a fixed time. Each user logs in
+(by email, or by account number and PIN for the demo accounts), opens a
+chat session, fetches FAQs and then holds multi-turn conversations drawn
+from banking_queries.csv, answering the bot's slot questions the way a
+customer would. A share of the users are admins polling the analytics and
+log endpoints instead. Reports throughput, per-route latency percentiles,
+error and shed (429/503) rates and server RSS over time, and writes the
+whole run as JSON for later comparison. Run from the backend directory:
+    python -m benchmarks.load_test --target testclient --users 20 --seconds 30
+    python -m benchmarks.load_test --target http://127.0.0.1:3000 --server-pid 1234
+    python -m benchmarks.load_test --spawn 4 --users 50 --output run.json --baseline previous.json
+"""
+
+import argparse
+import csv
+import http.client
+import json
+import os
+import random
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.gunicorn_workers import BACKEND_DIR, free_port, process_tree, wait_until_up
+
+QUERIES_CSV = os.path.join(BACKEND_DIR, 'banking_queries.csv')
+DEMO_ACCOUNTS = [('1234567890', '1234'), ('2345678901', '5678')]
+ADMIN_LOGIN = {'email': 'admin@securebank.com', 'password': 'admin123'}
+USER_PASSWORD = 'loadtest123'
+
+# How a customer answers each slot question of the multi-turn intents
+SLOT_ANSWERS = {
+    'amount': ["5000", "₹12,500", "2500", "100000"],
+    'recipient': ["to 1234567890", "account 2345678901", "3456789012"],
+    'loan_type': ["home loan", "personal loan", "car loan", "education loan"],
+    'card_type': ["debit card", "credit card", "atm card"],
+}
+# Relative frequency of conversation topics, roughly what the chat UI sees
+INTENT_WEIGHTS = {
+    'check_balance': 5, 'transfer_money': 4, 'account_info': 2, 'lost_card': 2,
+    'apply_loan': 2, 'get_branch_details': 1, 'chitchat': 1,
+}
+SHED_STATUSES = (429, 503)
+
+
+def load_openers(path=QUERIES_CSV):
+    """Training queries grouped by intent, used as conversation openers"""
+    openers = defaultdict(list)
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            openers[row['intent']].append(row['text'])
+    return openers
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+# Transports
+class HTTPTransport:
+    """One kept-alive connection per virtual user"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        headers = {'Content-Type': 'application/json', **(headers or {})}
+        payload = json.dumps(body) if body is not None else None
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                break
+            except (OSError, http.client.HTTPException):
+                # Usually the server closed an idle keep-alive connection; reconnect once
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+class TestClientTransport:
+    """Flask's test client: no sockets, measures the app alone"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers or {})
+        return response.status_code, response.get_json(silent=True)
+
+    def close(self):
+        pass
+
+
+# Recording
+class Recorder:
+    """Per-route latencies and statuses plus a per-second timeline"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.timeline = defaultdict(lambda: {'requests': 0, 'errors': 0, 'shed': 0})
+        self.rss = []
+
+    def record(self, route, status, seconds):
+        second = int(time.perf_counter() - self.started)
+        with self._lock:
+            self.latencies[route].append(seconds * 1000)
+            self.statuses[route][status] += 1
+            bucket = self.timeline[second]
+            bucket['requests'] += 1
+            if status in SHED_STATUSES:
+                bucket['shed'] += 1
+            elif status == 0 or status >= 400:
+                bucket['errors'] += 1
+
+    def sample_rss(self, pid):
+        total = 0
+        try:
+            for child in process_tree(pid):
+                with open(f'/proc/{child}/status') as f:
+                    for line in f:
+                        if line.startswith('VmRSS:'):
+                            total += int(line.split()[1])
+        except OSError:
+            return
+        with self._lock:
+            self.rss.append({'t': round(time.perf_counter() - self.started, 1), 'rss_mb': round(total / 1024, 1)})
+
+    def summary(self, seconds):
+        routes = {}
+        for route in sorted(self.latencies):
+            latencies = self.latencies[route]
+            statuses = self.statuses[route]
+            count = len(latencies)
+            errors = sum(n for status, n in statuses.items()
+                         if status == 0 or (status >= 400 and status not in SHED_STATUSES))
+            shed = sum(statuses.get(status, 0) for status in SHED_STATUSES)
+            routes[route] = {
+                'requests': count,
+                'rps': round(count / seconds, 2),
+                'p50_ms': round(statistics.median(latencies), 2),
+                'p90_ms': round(percentile(latencies, 0.90), 2),
+                'p99_ms': round(percentile(latencies, 0.99), 2),
+                'max_ms': round(max(latencies), 2),
+                'error_rate': round(errors / count, 4),
+                'shed_rate': round(shed / count, 4),
+                'statuses': {str(status): n for status, n in sorted(statuses.items())},
+            }
+        total = sum(route['requests'] for route in routes.values())
+        return {
+            'requests': total,
+            'rps': round(total / seconds, 2),
+            'routes': routes,
+            'timeline': [{'second': second, **counts} for second, counts in sorted(self.timeline.items())],
+            'rss': self.rss,
+        }
+
+
+# Virtual users
+class VirtualUser:
+    """One simulated customer (or admin) running flows until the deadline"""
+
+    def __init__(self, index, transport, recorder, openers, login, admin=False, think_time=0.5, seed=0):
+        self.index = index
+        self.transport = transport
+        self.recorder = recorder
+        self.openers = openers
+        self.login_body = login
+        self.admin = admin
+        self.think_time = think_time
+        self.rng = random.Random(seed * 100003 + index)
+        self.auth = {}
+
+    def call(self, route, method, path, body=None):
+        started = time.perf_counter()
+        try:
+            status, data = self.transport.request(method, path, body, self.auth)
+        except OSError:
+            status, data = 0, None
+        self.recorder.record(route, status, time.perf_counter() - started)
+        return status, data
+
+    def pause(self):
+        if self.think_time:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.think_time)
+
+    def log_in(self):
+        self.auth = {}
+        status, data = self.call('POST /api/auth/login', 'POST', '/api/auth/login', self.login_body)
+        if status == 200:
+            self.auth = {'Authorization': f"Bearer {data['token']}"}
+        return status == 200
+
+    def run(self, deadline):
+        while time.perf_counter() < deadline:
+            if not self.log_in():
+                self.pause()
+                continue
+            if self.admin:
+                self.poll_admin(deadline)
+            else:
+                self.chat(deadline)
+
+    def chat(self, deadline):
+        status, data = self.call('POST /api/session/create', 'POST', '/api/session/create')
+        if status != 201:
+            self.pause()
+            return
+        session_id = data['sessionId']
+        self.call('GET /api/chat/faqs-for-user', 'GET', '/api/chat/faqs-for-user')
+        intents = list(INTENT_WEIGHTS)
+        weights = [INTENT_WEIGHTS[intent] for intent in intents]
+        for _ in range(self.rng.randint(2, 6)):
+            if time.perf_counter() >= deadline:
+                return
+            intent = self.rng.choices(intents, weights)[0]
+            self.converse(session_id, self.rng.choice(self.openers[intent]), deadline)
+        self.call('GET /api/session/messages/<session_id>', 'GET',
+                  f'/api/session/messages/{session_id}?' + urlencode({'limit': 20}))
+
+    def converse(self, session_id, text, deadline, max_turns=4):
+        """Send an opener, then answer pending slot questions until the bot stops asking"""
+        for _ in range(max_turns):
+            self.pause()
+            status, data = self.call('POST /api/chat/message', 'POST', '/api/chat/message',
+                                     {'sessionId': session_id, 'messageText': text})
+            if status != 200 or time.perf_counter() >= deadline:
+                return
+            pending = data['bot'].get('pending_slots') or {}
+            if not data['bot'].get('needs_slot_filling') or not pending:
+                return
+            text = self.rng.choice(SLOT_ANSWERS.get(next(iter(pending)), ["yes"]))
+
+    def poll_admin(self, deadline):
+        cursor = None
+        for _ in range(20):
+            if time.perf_counter() >= deadline:
+                return
+            self.call('GET /api/admin/logs/refresh', 'GET', '/api/admin/logs/refresh')
+            query = {'limit': 50, **({'cursor': cursor} if cursor is not None else {})}
+            status, data = self.call('GET /api/admin/logs/query', 'GET',
+                                     '/api/admin/logs/query?' + urlencode(query))
+            cursor = data.get('next_cursor') if status == 200 and data else None
+            if self.rng.random() < 0.25:
+                self.call('GET /api/admin/analytics/timeseries', 'GET', '/api/admin/analytics/timeseries')
+            if self.rng.random() < 0.1:
+                self.call('GET /api/admin/faq', 'GET', '/api/admin/faq')
+            self.pause()
+
+
+def register_users(transport, count, run_id):
+    """Create one email account per email-login user so rate limits apply per person"""
+    logins = []
+    for i in range(count):
+        email = f'loadtest-{run_id}-{i:04d}@securebank.com'
+        status, _ = transport.request('POST', '/api/auth/register',
+                                      {'name': f'Load Test {i}', 'email': email, 'password': USER_PASSWORD})
+        if status != 201:
+            raise RuntimeError(f"registering {email} failed with {status}")
+        logins.append({'email': email, 'password': USER_PASSWORD})
+    return logins
+
+
+def run_load(make_transport, users, admins, seconds, ramp, think_time, pin_share, server_pid, seed):
+    openers = load_openers()
+    run_id = f'{int(time.time())}{os.getpid() % 1000:03d}'
+    pin_users = int(users * pin_share)
+    setup = make_transport()
+    email_logins = register_users(setup, users - pin_users, run_id)
+    setup.close()
+
+    recorder = Recorder()
+    vus = []
+    for i in range(users + admins):
+        if i >= users:
+            login, admin = ADMIN_LOGIN, True
+        elif i < pin_users:
+            account, pin = DEMO_ACCOUNTS[i % len(DEMO_ACCOUNTS)]
+            login, admin = {'accountNumber': account, 'pin': pin}, False
+        else:
+            login, admin = email_logins[i - pin_users], False
+        vus.append(VirtualUser(i, make_transport(), recorder, openers, login, admin, think_time, seed))
+
+    deadline = time.perf_counter() + seconds
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            recorder.sample_rss(server_pid)
+            done.wait(1.0)
+
+    sampler = threading.Thread(target=sample, daemon=True) if server_pid else None
+    if sampler:
+        sampler.start()
+
+    threads = []
+    for vu in vus:
+        thread = threading.Thread(target=vu.run, args=(deadline,), daemon=True)
+        threads.append(thread)
+        thread.start()
+        if ramp:
+            time.sleep(ramp / len(vus))
+    for thread in threads:
+        thread.join()
+    done.set()
+    if server_pid:
+        recorder.sample_rss(server_pid)
+    for vu in vus:
+        vu.transport.close()
+    return recorder.summary(seconds)
+
+
+def spawn_server(workers):
+    """Start gunicorn from gunicorn.conf.py on a free port; returns (process, base url, scratch dir)"""
+    port = free_port()
+    scratch = tempfile.mkdtemp(prefix='securebank-load-')
+    env = {
+        **os.environ,
+        'SECUREBANK_BIND': f'127.0.0.1:{port}',
+        'SECUREBANK_WORKERS': str(workers),
+        'SECUREBANK_DB_PATH': os.environ.get('SECUREBANK_DB_PATH', os.path.join(scratch, 'load.db')),
+        'SECUREBANK_CONTEXT_DB_PATH': os.environ.get('SECUREBANK_CONTEXT_DB_PATH', os.path.join(scratch, 'context.db')),
+        'SECUREBANK_CHAT_LOG_DIR': os.environ.get('SECUREBANK_CHAT_LOG_DIR', os.path.join(scratch, 'chat')),
+    }
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application'],
+                               cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_up(port)
+    return process, f'http://127.0.0.1:{port}', scratch
+
+
+def print_report(result, baseline=None):
+    base_routes = (baseline or {}).get('summary', {}).get('routes', {})
+    print(f"{'route':<42} {'req/s':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'err%':>6} {'shed%':>6}")
+    for route, stats in result['routes'].items():
+        line = (f"{route:<42} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} {stats['p90_ms']:>8.1f} "
+                f"{stats['p99_ms']:>8.1f} {stats['error_rate'] * 100:>6.2f} {stats['shed_rate'] * 100:>6.2f}")
+        before = base_routes.get(route)
+        if before:
+            line += f"   Δp99 {stats['p99_ms'] - before['p99_ms']:+.1f}ms Δreq/s {stats['rps'] - before['rps']:+.1f}"
+        print(line)
+    print(f"{'total':<42} {result['rps']:>8.1f}")
+    if result['rss']:
+        peak = max(sample['rss_mb'] for sample in result['rss'])
+        print(f"💾 server RSS {result['rss'][0]['rss_mb']:.1f} MB → {result['rss'][-1]['rss_mb']:.1f} MB "
+              f"(peak {peak:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', default='testclient', help="'testclient' or a base URL")
+    parser.add_argument('--spawn', type=int, metavar='WORKERS', help="start gunicorn with this many workers")
+    parser.add_argument('--server-pid', type=int, help="pid to sample RSS from when targeting a URL")
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--admins', type=int, default=1)
+    parser.add_argument('--seconds', type=float, default=30.0)
+    parser.add_argument('--ramp', type=float, default=5.0, help="seconds over which users start")
+    parser.add_argument('--think-time', type=float, default=0.5, help="mean pause between actions")
+    parser.add_argument('--pin-share', type=float, default=0.2, help="share of users logging in by account/PIN")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='load_test_results.json')
+    parser.add_argument('--baseline', help="earlier --output file to compare against")
+    args = parser.parse_args()
+
+    server = scratch = None
+    if args.spawn:
+        server, target, scratch = spawn_server(args.spawn)
+        server_pid = server.pid
+    else:
+        target, server_pid = args.target, args.server_pid
+
+    if target == 'testclient':
+        import app as api
+        make_transport = lambda: TestClientTransport(api.app)  # noqa: E731
+        server_pid = os.getpid()
+    else:
+        make_transport = lambda: HTTPTransport(target)  # noqa: E731
+
+    print(f"📊 Load test against {target} ({args.users} users, {args.admins} admins, {args.seconds:.0f}s)")
+    print("=" * 96)
+    try:
+        result = run_load(make_transport, args.users, args.admins, args.seconds, args.ramp,
+                          args.think_time, args.pin_share, server_pid, args.seed)
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    report = {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'target': target if not args.spawn else f'gunicorn x{args.spawn}',
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'summary': result,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Synthetic bank population generation rate
+
+Generates --accounts seeded synthetic customers (balances, cards and
+transaction histories) and reports accounts and postings per second for
+three stages: sampling the columns alone, writing them to .npz batches
+(--out) and loading them into a BankingDataService with search index and
+statistics. Run from the backend directory:
+    python -m benchmarks.population --accounts 1000000 --stages generate write
+    python -m benchmarks.population --accounts 200000 --stages service
+"""
+
+import argparse
+import resource
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.transfer_contention import build_service
+from models.population import generate_population, populate, write_population
+
+
+def print_rate(stage, report):
+    print(f"{stage:<10} {report['accounts']:>11,} {report['postings']:>13,} {report['seconds']:>8.1f} s"
+          f" {report['accounts_per_second']:>12,.0f} {report['postings_per_second']:>14,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--accounts', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--stages', nargs='+', default=['generate', 'write', 'service'],
+                        choices=['generate', 'write', 'service'])
+    parser.add_argument('--out', help="directory for the .npz batches (default: a temporary directory)")
+    args = parser.parse_args()
+    now = datetime(2026, 1, 1)  # fixed, so every run produces the same population
+
+    print(f"📊 Synthetic population ({args.accounts:,} accounts, seed {args.seed}, batches of {args.batch_size:,})")
+    print("=" * 76)
+    print(f"{'stage':<10} {'accounts':>11} {'postings':>13} {'time':>10} {'accounts/s':>12} {'postings/s':>14}")
+
+    if 'generate' in args.stages:
+        started = time.perf_counter()
+        accounts = postings = 0
+        for batch in generate_population(args.accounts, args.seed, args.batch_size, now):
+            accounts, postings = accounts + len(batch), postings + batch.postings
+        seconds = time.perf_counter() - started
+        print_rate('generate', {"accounts": accounts, "postings": postings, "seconds": seconds,
+                                "accounts_per_second": accounts / seconds, "postings_per_second": postings / seconds})
+
+    if 'write' in args.stages:
+        with tempfile.TemporaryDirectory(prefix='securebank-population-') as scratch:
+            print_rate('write', write_population(args.out or scratch, args.accounts, args.seed, args.batch_size, now))
+
+    if 'service' in args.stages:
+        service = build_service(0, args.seed)
+        print_rate('service', populate(service, args.accounts, args.seed, args.batch_size, now))
+        assert not service.verify_statistics(), "statistics drifted from the generated accounts"
+        stats = service.get_banking_statistics()
+        print()
+        print(f"💰 Total balance ₹{stats['total_balance']:,.0f}, {stats['total_cards']:,} cards, "
+              f"{stats['active_accounts']:,} active, types {stats['account_types']}")
+        print(f"🧠 Peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Throughput of BankingDataService.transfer_batch against a transfer_money loop
+
+Builds a pool of accounts, then posts payroll-style batches (a few payer
+accounts paying many payees) of increasing size and reports legs/sec. The
+loop baseline is only run up to --loop-max legs. Run from the backend
+directory:
+    python -m benchmarks.transfer_batch --legs 10000 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.transfer_contention import build_service
+
+
+def make_batch(numbers, legs, payers, seed):
+    rng = np.random.default_rng(seed)
+    numbers = np.asarray(numbers)
+    sources = numbers[rng.integers(0, payers, size=legs)]
+    targets = numbers[rng.integers(payers, len(numbers), size=legs)]
+    amounts = rng.integers(1, 100, size=legs).astype(np.float64)
+    return sources, targets, amounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--accounts', type=int, default=5000)
+    parser.add_argument('--payers', type=int, default=10)
+    parser.add_argument('--legs', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--loop-max', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    service = build_service(args.accounts, args.seed)
+    numbers = list(service.accounts)
+    for number in numbers[:args.payers]:
+        service.accounts[number].balance = 10 ** 12  # payroll accounts can fund every batch
+    for account in service.accounts.values():
+        len(account.transactions.dates)  # flush queued sample history outside the timings
+
+    print(f"📊 Batch transfers ({args.accounts:,} accounts, {args.payers} payers)")
+    print("=" * 60)
+    print(f"{'legs':>10} {'batch legs/s':>14} {'batch s':>9} {'loop legs/s':>13}")
+    for legs in args.legs:
+        sources, targets, amounts = make_batch(numbers, legs, args.payers, args.seed + legs)
+        total_before = sum(account.balance for account in service.accounts.values())
+
+        start = time.perf_counter()
+        result = service.transfer_batch(sources, targets, amounts, "Payroll")
+        elapsed = time.perf_counter() - start
+        assert result['success'], result['message']
+        assert sum(account.balance for account in service.accounts.values()) == total_before
+
+        loop_rate = ''
+        if legs <= args.loop_max:
+            pairs = list(zip(sources.tolist(), targets.tolist(), amounts.tolist()))
+            start = time.perf_counter()
+            for source, target, amount in pairs:
+                service.transfer_money(source, target, amount, "Payroll")
+            loop_rate = f"{legs / (time.perf_counter() - start):>13,.0f}"
+        print(f"{legs:>10,} {legs / elapsed:>14,.0f} {elapsed:>9.3f} {loop_rate}")
+
+
+if __name__ == '__main__':
+    main()
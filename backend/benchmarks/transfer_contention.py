@@ -0,0 +1,110 @@
+"""
+Concurrent transfer stress test and throughput under account contention
+
+Threads fire random transfers between a pool of accounts. Account choice
+follows a Zipf-like law with exponent --skew: 0 spreads transfers evenly,
+larger values concentrate them on a few hot accounts. After every run the
+script checks that the total balance is unchanged, that no account went
+negative, that every successful transfer posted exactly one debit and one
+credit, and that the running bank-wide statistics match a full recount.
+Per-account locking is compared with a single global lock
+around transfer_money. Run from the backend directory:
+    python -m benchmarks.transfer_contention --threads 1 2 4 8 --skew 0 1 2
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import threading
+import time
+
+from models.account_index import AccountIndex
+from models.banking_data import BankAccount, BankingDataService, BankStatistics
+
+
+def build_service(accounts, seed):
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = BankingDataService()
+    service.accounts = {}
+    service.index = AccountIndex()
+    service.statistics = BankStatistics()
+    for i in range(accounts):
+        service.add_account(BankAccount(f"{9000000000 + i}", f"Bench Customer {i}"))
+    return service
+
+
+def zipf_weights(count, skew):
+    return [1.0 / (rank ** skew) for rank in range(1, count + 1)]
+
+
+def run(service, threads, transfers, skew, global_lock, seed):
+    """Post `transfers` random transfers from `threads` threads; returns (transfers/sec, successes)"""
+    numbers = list(service.accounts)
+    weights = zipf_weights(len(numbers), skew)
+    per_thread = transfers // threads
+    successes = [0] * threads
+    lock = threading.Lock()
+    transfer = service.transfer_money
+    if global_lock:
+        def transfer(*args):
+            with lock:
+                return service.transfer_money(*args)
+
+    def worker(index):
+        rng = random.Random(seed * 7919 + index)
+        sources = rng.choices(numbers, weights, k=per_thread)
+        targets = rng.choices(numbers, weights, k=per_thread)
+        ok = 0
+        for source, target in zip(sources, targets):
+            if source != target and transfer(source, target, rng.randint(1, 5000), "bench")["success"]:
+                ok += 1
+        successes[index] = ok
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed, sum(successes)
+
+
+def check_invariants(service, total_before, postings_before, successes):
+    total_after = sum(account.balance for account in service.accounts.values())
+    postings_after = sum(len(account.transactions) for account in service.accounts.values())
+    assert total_after == total_before, f"balance not conserved: {total_before} -> {total_after}"
+    assert all(account.balance >= 0 for account in service.accounts.values()), "an account was overdrawn"
+    assert postings_after - postings_before == 2 * successes, "postings do not match successful transfers"
+    assert not service.verify_statistics(), "bank-wide statistics drifted from the accounts"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--transfers', type=int, default=40000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--skew', type=float, nargs='+', default=[0.0, 1.0, 2.0])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"📊 transfer_money ({args.transfers:,} transfers over {args.accounts:,} accounts)")
+    print("=" * 64)
+    print(f"{'skew':>5} {'threads':>8} {'per-account/s':>15} {'global lock/s':>15}   invariants")
+    for skew in args.skew:
+        for threads in args.threads:
+            rates = []
+            for global_lock in (False, True):
+                service = build_service(args.accounts, args.seed)
+                total_before = sum(account.balance for account in service.accounts.values())
+                postings_before = sum(len(account.transactions) for account in service.accounts.values())
+                rate, successes = run(service, threads, args.transfers, skew, global_lock, args.seed)
+                check_invariants(service, total_before, postings_before, successes)
+                rates.append(rate)
+            print(f"{skew:>5.1f} {threads:>8} {rates[0]:>15,.0f} {rates[1]:>15,.0f}   ✅ conserved")
+
+
+if __name__ == '__main__':
+    main()
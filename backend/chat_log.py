@@ -0,0 +1,336 @@
+"""
+Append-only Chat Log
+Paired user/bot turns written to rotated JSONL segment files by a
+background writer, with a bounded in-memory tail for recent reads
+"""
+
+import atexit
+import bisect
+import collections
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, one process per directory is on the operator
+    fcntl = None
+
+
+class ChatLog:
+    """Segmented append-only log of chat turns
+
+    ``append`` only assigns a sequence number and queues the record, so
+    request handlers never touch the disk. A daemon thread drains the queue
+    into ``chat-<first seq>.jsonl`` segments, rotating when a segment reaches
+    ``max_segment_bytes`` or ``max_segment_age`` seconds. Only one process
+    may write to a given directory: the first to append locks it, and
+    opening or appending from another process raises RuntimeError. A
+    failed write is retried with the batch still pending; only written
+    records count as flushed. Byte offsets of every written record are kept
+    per segment so ``get_many`` can seek straight to a turn.
+
+    With ``directory=None`` nothing is persisted and only the tail is kept.
+    """
+
+    SEGMENT_PREFIX = 'chat-'
+    SEGMENT_SUFFIX = '.jsonl'
+    LOCK_FILE = '.lock'
+    MAX_RETRY_INTERVAL = 5.0
+
+    def __init__(self, directory: Optional[str] = None, tail_size: int = 1000,
+                 max_segment_bytes: int = 16 * 1024 * 1024, max_segment_age: float = 3600.0,
+                 max_segments: Optional[int] = None, flush_interval: float = 0.2):
+        self.directory = directory
+        self.tail_size = tail_size
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.max_segments = max_segments
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._drained = threading.Condition(self._lock)
+        self._tail: Deque[Dict] = collections.deque(maxlen=tail_size)
+        self._pending: List[Dict] = []
+        self._inflight: List[Dict] = []
+        self._segments: List[tuple] = []  # (first_seq, path, offsets), oldest first
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._file = None
+        self._file_opened = 0.0
+        self._next_seq = 0
+        self._written_seq = -1
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid = None
+        self._start_lock = threading.Lock()
+        self._lock_file = None
+        self.write_errors = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._acquire_directory(hold=False)
+            self._recover()
+            atexit.register(self.close)
+
+    # Setup
+    def _acquire_directory(self, hold: bool = True) -> None:
+        """Take an exclusive lock on the directory (and release it again unless ``hold``)
+
+        Two writers would number records independently and interleave them
+        in the same segment. The constructor only checks that no other
+        process holds the lock, so a reloader parent or a preloading master
+        that never writes does not keep it; the process that writes first
+        takes it for good.
+        """
+        if fcntl is None:
+            return
+        lock_file = open(os.path.join(self.directory, self.LOCK_FILE), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(f"Chat log directory {self.directory} is in use by another process; "
+                               f"give each process its own SECUREBANK_CHAT_LOG_DIR")
+        if hold:
+            self._lock_file = lock_file
+        else:
+            lock_file.close()
+
+    def _recover(self) -> None:
+        """Pick up existing segments and continue numbering after the last record"""
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith(self.SEGMENT_PREFIX) and name.endswith(self.SEGMENT_SUFFIX):
+                first_seq = int(name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)])
+                path = os.path.join(self.directory, name)
+                offsets = array('Q')
+                position = 0
+                with open(path, 'rb') as f:
+                    for line in f:
+                        if not line.endswith(b'\n'):
+                            break  # torn write at the end of the last segment
+                        offsets.append(position)
+                        position += len(line)
+                self._segments.append((first_seq, path, offsets))
+        self._segments.sort(key=lambda segment: segment[0])
+        if self._segments:
+            first_seq, _, offsets = self._segments[-1]
+            self._next_seq = first_seq + len(offsets)
+            self._written_seq = self._next_seq - 1
+
+    def _ensure_writer(self) -> None:
+        # A forked worker inherits the object but not the thread (nor the right to write)
+        if self._writer_pid != os.getpid():
+            with self._start_lock:
+                if self._writer_pid == os.getpid():
+                    return
+                self._acquire_directory()
+                self._writer_pid = os.getpid()
+                self._file = None
+                self._writer = threading.Thread(target=self._run_writer, name='chat-log-writer', daemon=True)
+                self._writer.start()
+
+    def add_listener(self, listener: Callable[[Dict], None]) -> None:
+        """Call listener(record) for every new turn, in sequence order
+
+        Listeners run under the log lock, so they must be quick and must not
+        call back into the log.
+        """
+        self._listeners.append(listener)
+
+    # Writing
+    def append(self, user_message: Dict, bot_message: Dict) -> int:
+        """Queue one paired turn and return its sequence number"""
+        if self.directory:
+            self._ensure_writer()
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            record = {'seq': seq, 'ts': time.time(), 'user': user_message, 'bot': bot_message}
+            self._tail.append(record)
+            for listener in self._listeners:
+                listener(record)
+            if self.directory:
+                self._pending.append(record)
+                self._wakeup.notify()
+            else:
+                self._written_seq = seq
+        return seq
+
+    def _run_writer(self) -> None:
+        retry_interval = self.flush_interval
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._wakeup.wait(self.flush_interval)
+                if not self._pending and self._closed:
+                    return
+                batch, self._pending = self._pending, []
+                self._inflight = batch
+            try:
+                self._write_batch(batch)
+            except OSError as e:
+                # Nothing of the batch counts as written: put it back and retry
+                print(f"❌ Chat log write failed, retrying {len(batch)} turns: {e}")
+                with self._lock:
+                    self.write_errors += 1
+                    self._pending = batch + self._pending
+                    self._inflight = []
+                    if self._closed:
+                        return
+                    self._wakeup.wait(retry_interval)
+                retry_interval = min(retry_interval * 2, self.MAX_RETRY_INTERVAL)
+                continue
+            retry_interval = self.flush_interval
+            with self._lock:
+                self._written_seq = batch[-1]['seq']
+                self._inflight = []
+                self._drained.notify_all()
+
+    def _write_batch(self, batch: List[Dict]) -> None:
+        lines = [(json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8') for record in batch]
+        if self._file is None or self._should_rotate():
+            self._rotate(batch[0]['seq'])
+        position = self._file.tell()
+        try:
+            self._file.write(b''.join(lines))
+            self._file.flush()
+        except OSError:
+            # Cut off any partial write so the retry starts on a clean line
+            try:
+                self._file.seek(position)
+                self._file.truncate(position)
+            except (OSError, ValueError):
+                self._file = None
+            raise
+        offsets = self._segments[-1][2]
+        for line in lines:
+            offsets.append(position)
+            position += len(line)
+
+    def _should_rotate(self) -> bool:
+        return (self._file.tell() >= self.max_segment_bytes or
+                time.monotonic() - self._file_opened >= self.max_segment_age)
+
+    def _rotate(self, first_seq: int) -> None:
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, f"{self.SEGMENT_PREFIX}{first_seq:012d}{self.SEGMENT_SUFFIX}")
+        self._file = open(path, 'ab')
+        self._file_opened = time.monotonic()
+        with self._lock:
+            if not self._segments or self._segments[-1][1] != path:
+                self._segments.append((first_seq, path, array('Q')))
+            expired = []
+            if self.max_segments and len(self._segments) > self.max_segments:
+                expired = self._segments[:-self.max_segments]
+                self._segments = self._segments[-self.max_segments:]
+        for _, old_path, _ in expired:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything appended so far is on disk (tests, shutdown)"""
+        if not self.directory:
+            return
+        with self._lock:
+            target = self._next_seq - 1
+            deadline = time.monotonic() + timeout
+            while self._written_seq < target and time.monotonic() < deadline:
+                self._wakeup.notify()
+                self._drained.wait(self.flush_interval)
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+        if self._writer is not None and self._writer_pid == os.getpid():
+            self._writer.join(timeout=5.0)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    # Reading
+    @staticmethod
+    def _read_segment(path: str) -> Iterator[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.endswith('\n'):
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def get_many(self, seqs: List[int]) -> List[Dict]:
+        """Fetch turns by sequence number; expired or unknown ones are skipped"""
+        with self._lock:
+            tail = list(self._tail)
+            unwritten = {record['seq']: record for record in self._inflight + self._pending}
+            segments = list(self._segments)
+        tail_start = tail[0]['seq'] if tail else self._next_seq
+        first_seqs = [segment[0] for segment in segments]
+
+        records = []
+        handles = {}
+        try:
+            for seq in seqs:
+                if seq >= tail_start and seq - tail_start < len(tail):
+                    records.append(tail[seq - tail_start])
+                elif seq in unwritten:
+                    records.append(unwritten[seq])
+                else:
+                    index = bisect.bisect_right(first_seqs, seq) - 1
+                    if index < 0:
+                        continue
+                    first_seq, path, offsets = segments[index]
+                    if seq - first_seq >= len(offsets):
+                        continue
+                    if path not in handles:
+                        try:
+                            handles[path] = open(path, 'rb')
+                        except FileNotFoundError:
+                            continue
+                    handles[path].seek(offsets[seq - first_seq])
+                    records.append(json.loads(handles[path].readline()))
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return records
+
+    def recent(self, limit: int = 100) -> List[Dict]:
+        """Newest turns from the in-memory tail, oldest first"""
+        with self._lock:
+            tail = list(self._tail)
+        return tail[-limit:] if limit else []
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Every retained turn in sequence order: segments on disk, then unwritten turns"""
+        with self._lock:
+            written_seq = self._written_seq
+            segments = list(self._segments)
+            unwritten = (list(self._inflight) + list(self._pending)) if self.directory else list(self._tail)
+
+        for _, path, _ in segments:
+            for record in self._read_segment(path):
+                if record['seq'] > written_seq:
+                    break
+                yield record
+        for record in unwritten:
+            if record['seq'] > written_seq or not self.directory:
+                yield record
+
+    def __len__(self) -> int:
+        with self._lock:
+            if not self.directory:
+                return len(self._tail)
+            first_seq = self._segments[0][0] if self._segments else self._written_seq + 1
+            return self._next_seq - first_seq
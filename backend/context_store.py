@@ -0,0 +1,113 @@
+"""
+Conversation Context Stores for the NLU service
+Keeps per-session slot filling state, optionally shared between worker processes
+"""
+
+import json
+import time
+from typing import Dict, Iterator, Optional
+
+from storage import ConnectionPool
+
+
+class MemoryContextStore:
+    """Process-local context store (default, single worker)"""
+
+    def __init__(self):
+        self._contexts: Dict[str, Dict] = {}
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        return self._contexts.get(session_id)
+
+    def put(self, session_id: str, context: Dict) -> None:
+        self._contexts[session_id] = context
+
+    def delete(self, session_id: str) -> None:
+        self._contexts.pop(session_id, None)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._contexts
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._contexts))
+
+
+class SQLiteContextStore:
+    """Cross-process context store on a WAL-mode SQLite table
+
+    Every worker reads and writes the same file, so a follow-up message can
+    land on any worker and still see the pending slots. Records are compact
+    JSON blobs keyed by session id in a WITHOUT ROWID table, which keeps a
+    get or put to a single B-tree lookup.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS nlu_context (
+            session_id TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            updated REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_nlu_context_updated ON nlu_context(updated);
+    """
+
+    SQL_GET = "SELECT data FROM nlu_context WHERE session_id = ?"
+    SQL_PUT = "INSERT OR REPLACE INTO nlu_context (session_id, data, updated) VALUES (?, ?, ?)"
+    SQL_DELETE = "DELETE FROM nlu_context WHERE session_id = ?"
+    SQL_COUNT = "SELECT COUNT(*) FROM nlu_context"
+    SQL_KEYS = "SELECT session_id FROM nlu_context"
+    SQL_PRUNE = "DELETE FROM nlu_context WHERE updated < ?"
+
+    def __init__(self, path: str, pool_size: int = 8):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _dumps(context: Dict) -> bytes:
+        return json.dumps(context, separators=(',', ':')).encode('utf-8')
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self.pool.connection() as conn:
+            row = conn.execute(self.SQL_GET, (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, session_id: str, context: Dict) -> None:
+        with self.pool.connection() as conn, conn:
+            conn.execute(self.SQL_PUT, (session_id, self._dumps(context), time.time()))
+
+    def delete(self, session_id: str) -> None:
+        with self.pool.connection() as conn, conn:
+            conn.execute(self.SQL_DELETE, (session_id,))
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Drop contexts idle for longer than max_age_seconds"""
+        with self.pool.connection() as conn, conn:
+            return conn.execute(self.SQL_PRUNE, (time.time() - max_age_seconds,)).rowcount
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute(self.SQL_COUNT).fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        with self.pool.connection() as conn:
+            keys = [row[0] for row in conn.execute(self.SQL_KEYS)]
+        return iter(keys)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+def create_context_store(backend: str = 'memory', path: str = 'nlu_context.db'):
+    """Build the context store selected by name ('memory' or 'sqlite')"""
+    if backend == 'memory':
+        return MemoryContextStore()
+    if backend == 'sqlite':
+        return SQLiteContextStore(path)
+    raise ValueError(f"Unknown context store: {backend}")
@@ -0,0 +1,94 @@
+"""
+Admin Event Hub
+Fans chat events out to live admin dashboards over server-sent events,
+with a bounded buffer per subscriber so a slow client never blocks chat
+"""
+
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class Subscriber:
+    """One dashboard connection's queue of pending events
+
+    When the buffer is full the backlog is discarded and ``overflowed`` is
+    set; the stream then sends a fresh snapshot instead of the lost deltas.
+    """
+
+    def __init__(self, max_buffer: int):
+        self.events = deque()
+        self.max_buffer = max_buffer
+        self.overflowed = False
+        self.closed = False
+        self._ready = threading.Condition()
+
+    def push(self, event: Dict) -> None:
+        with self._ready:
+            if len(self.events) >= self.max_buffer:
+                self.events.clear()
+                self.overflowed = True
+            else:
+                self.events.append(event)
+            self._ready.notify()
+
+    def drain(self, timeout: float) -> Optional[List[Dict]]:
+        """Wait up to `timeout` for events; returns them, or None if the buffer overflowed"""
+        with self._ready:
+            if not self.events and not self.overflowed and not self.closed:
+                self._ready.wait(timeout)
+            if self.overflowed:
+                self.overflowed = False
+                return None
+            events = list(self.events)
+            self.events.clear()
+            return events
+
+    def close(self) -> None:
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+
+
+class EventHub:
+    """Process-local publish/subscribe for dashboard deltas
+
+    ``publish`` costs one append per subscriber and never blocks on a
+    reader. Each gunicorn worker has its own hub and only sees the turns it
+    handled itself.
+    """
+
+    def __init__(self, max_subscribers: int = 100, max_buffer: int = 256):
+        self.max_subscribers = max_subscribers
+        self.max_buffer = max_buffer
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self) -> Optional[Subscriber]:
+        """Register a subscriber, or return None when the hub is full"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscriber = Subscriber(self.max_buffer)
+            self._subscribers = self._subscribers + [subscriber]
+            return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        with self._lock:
+            self._subscribers = [other for other in self._subscribers if other is not subscriber]
+
+    def publish(self, event: Dict) -> None:
+        # Copy-on-write list: publishers iterate without holding the hub lock
+        subscribers = self._subscribers
+        self.published += 1
+        for subscriber in subscribers:
+            overflowed = subscriber.overflowed
+            subscriber.push(event)
+            if subscriber.overflowed and not overflowed:
+                self.overflows += 1
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
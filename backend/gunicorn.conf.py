@@ -0,0 +1,118 @@
+"""
+Gunicorn Configuration for SecureBank API
+Preloads the app in the master so the NLU model and its vectorizer are built
+once and shared copy-on-write by every worker
+
+Run from the backend directory:
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Sizing (SECUREBANK_WORKERS / SECUREBANK_THREADS), measured with
+benchmarks/gunicorn_workers.py (16 clients, 10 s per run) on a 1-core,
+6 GB Linux machine:
+
+    workers  threads  msgs/s   RSS MB   PSS MB
+          1        8   178.2    291.2    181.6
+          2        8   155.5    416.6    201.1
+          4        8   181.0    643.1    194.6
+          1        1   186.9    288.9    177.9
+          1        2   202.9    288.2    177.5
+          1       16   186.6    294.9    185.5
+          2       16   163.6    417.1    201.3
+
+- Chat throughput is bound by CPU: intent classification is Python under
+  the GIL, so on one core 1, 2 or 4 workers all serve 150-200 msgs/s
+  (run-to-run noise is about 10%). Give at most one worker per core;
+  extra workers only add memory.
+- More threads do not add throughput either (1 to 16 threads per worker
+  land in the same band). Threads cover waiting: SSE replies and
+  dashboard streams hold one for as long as they are open, so size
+  threads for the expected open streams per worker plus a few spare.
+- Each extra worker costs 5-20 MB of PSS (RSS, which counts shared pages
+  in every process, suggests ~120 MB): the model, FAQ data and modules
+  stay shared after fork because ``gc.freeze`` keeps the collector from
+  writing to them.
+- With more than one worker, chat state must be shared, so the SQLite
+  store and context store become the default and metrics are merged
+  through a scratch directory. Explicit SECUREBANK_* settings win.
+
+Re-run the benchmark on the target machine before changing the defaults.
+"""
+
+import gc
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+
+bind = os.environ.get('SECUREBANK_BIND', '0.0.0.0:3000')
+workers = int(os.environ.get('SECUREBANK_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('SECUREBANK_THREADS', 8))
+worker_class = 'gthread'
+preload_app = True
+timeout = int(os.environ.get('SECUREBANK_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+# Worker recycling is off unless SECUREBANK_MAX_REQUESTS is set
+max_requests = int(os.environ.get('SECUREBANK_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+accesslog = os.environ.get('SECUREBANK_ACCESS_LOG') or None
+
+if workers > 1:
+    os.environ.setdefault('SECUREBANK_STORE', 'sqlite')
+    os.environ.setdefault('SECUREBANK_CONTEXT_STORE', 'sqlite')
+    os.environ.setdefault('SECUREBANK_METRICS_DIR', tempfile.mkdtemp(prefix='securebank-metrics-'))
+
+# No automatic collections in the master: they would touch the headers of
+# every preloaded object and unshare those pages in workers already forked
+gc.disable()
+
+
+def when_ready(server):
+    """The app is loaded; move everything it allocated out of the collector's reach"""
+    gc.collect()
+    gc.freeze()
+    server.log.info("SecureBank preloaded, %d objects frozen", gc.get_freeze_count())
+
+
+def close_master_connections():
+    """Close the SQLite connections the master opened while loading the app
+
+    A child must never use or close a connection inherited across fork (it
+    would checkpoint or drop WAL state the master and siblings still rely
+    on), so none may be open at fork time. The pools reopen lazily.
+    """
+    from app import STORE
+    pool = getattr(STORE, 'pool', None)
+    if pool is not None:
+        STORE.flush()
+        pool.close()
+    nlu = sys.modules.get('nlu_service_enhanced') or sys.modules.get('nlu_service')
+    context_store = getattr(getattr(nlu, 'enhanced_nlu', None), 'context_history', None)
+    if hasattr(context_store, 'close'):
+        context_store.close()
+
+
+def pre_fork(server, worker):
+    # Cheap after the first call: only objects created since are visited
+    gc.freeze()
+    close_master_connections()
+
+
+def post_fork(server, worker):
+    """Give the worker its own random state and per-process counters"""
+    gc.enable()
+    random.seed()
+    numpy = sys.modules.get('numpy')
+    if numpy is not None:
+        numpy.random.seed()
+
+    from app import reset_worker_state
+    reset_worker_state()
+    server.log.info("Worker %s ready", worker.pid)
+
+
+def worker_exit(server, worker):
+    """Write buffered chat turns before the worker goes away"""
+    from app import STORE
+    STORE.flush()
@@ -0,0 +1,189 @@
+"""
+HTTP Caching and Compression
+Version-keyed ETags and cached bodies for read-mostly JSON endpoints, a
+precomputed manifest for the built frontend, and gzip negotiation
+"""
+
+import json
+import mimetypes
+import os
+import re
+import threading
+import zlib
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from flask import Response
+
+MIN_COMPRESS_SIZE = 1024
+COMPRESS_LEVEL = 6
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+# Vite emits content-hashed names such as assets/index-COZ1FZ2-.js
+HASHED_ASSET = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9.]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+
+def accepts_gzip(request) -> bool:
+    return request.accept_encodings.quality('gzip') > 0
+
+
+def gzip_bytes(data: bytes, level: int = COMPRESS_LEVEL) -> bytes:
+    """gzip with mtime 0, so the same input always gives the same bytes"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def gzip_etag(etag: str) -> str:
+    """ETag of the gzip representation (strong ETags differ per encoding)"""
+    return etag[:-1] + '-gzip"'
+
+
+def not_modified(request, etag: str, cache_control: str) -> Optional[Response]:
+    """A 304 response when If-None-Match names either encoding of `etag`, else None"""
+    if not request.if_none_match:
+        return None
+    for candidate in (etag, gzip_etag(etag)):
+        if request.if_none_match.contains_weak(candidate.strip('"')):
+            response = Response(status=304)
+            response.headers['ETag'] = candidate
+            response.headers['Cache-Control'] = cache_control
+            response.headers['Vary'] = 'Accept-Encoding'
+            return response
+    return None
+
+
+def compress_response(request, response: Response, min_size: int = MIN_COMPRESS_SIZE) -> Response:
+    """gzip a large JSON body when the client accepts it (after_request hook)"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    if not accepts_gzip(request):
+        return response
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    response.set_data(gzip_bytes(data))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + '-gzip', weak)
+    return response
+
+
+class JSONCache:
+    """Serialized JSON bodies keyed by a data version
+
+    ``respond`` answers If-None-Match with 304 without touching the data.
+    Otherwise it reuses the cached bytes (and gzip variant) while the
+    version is unchanged, so a read-mostly list is serialized once per
+    change rather than once per request.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Hashable, str, bytes, Optional[bytes]]] = {}
+        self._lock = threading.Lock()
+
+    def respond(self, request, key: str, version: Hashable, build: Callable[[], object],
+                cache_control: str = 'private, no-cache') -> Response:
+        etag = '"' + f"{key}-{version}" + '"'
+        response = not_modified(request, etag, cache_control)
+        if response is not None:
+            return response
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            body = json.dumps(build(), separators=(',', ':')).encode('utf-8')
+            entry = (version, etag, body, None)
+            with self._lock:
+                self._entries[key] = entry
+
+        use_gzip = accepts_gzip(request) and len(entry[2]) >= MIN_COMPRESS_SIZE
+        if use_gzip and entry[3] is None:
+            entry = entry[:3] + (gzip_bytes(entry[2]),)
+            with self._lock:
+                if self._entries.get(key, (None,))[0] == version:
+                    self._entries[key] = entry
+
+        response = Response(entry[3] if use_gzip else entry[2], mimetype='application/json')
+        response.headers['ETag'] = gzip_etag(etag) if use_gzip else etag
+        response.headers['Cache-Control'] = cache_control
+        response.headers['Vary'] = 'Accept-Encoding'
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+
+class StaticManifest:
+    """Precomputed index of the built frontend (frontend/dist)
+
+    Built once at startup from a directory walk: request paths map straight
+    to file metadata, so serving an asset needs no abspath/exists calls.
+    Content-hashed assets get immutable cache headers; everything else
+    (index.html) is revalidated by ETag. File bytes and their gzip variant
+    (a prebuilt ``.gz`` next to the file, else compressed once) are loaded
+    on first use and kept. Rebuild the frontend, then restart to pick it up.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.assets: Dict[str, Dict] = {}
+        self._bodies: Dict[str, Tuple[bytes, Optional[bytes]]] = {}
+        self._lock = threading.Lock()
+        if os.path.isdir(root):
+            self._scan()
+
+    def _scan(self) -> None:
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith('.gz'):
+                    continue
+                full_path = os.path.join(directory, name)
+                path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                stat = os.stat(full_path)
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                self.assets[path] = {
+                    'file': full_path,
+                    'size': stat.st_size,
+                    'etag': f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+                    'mimetype': mimetype,
+                    'cache_control': IMMUTABLE if HASHED_ASSET.match(path) else REVALIDATE,
+                    'compressible': mimetype.startswith(COMPRESSIBLE_TYPES) or name.endswith('.map'),
+                    'gzip_file': full_path + '.gz' if os.path.exists(full_path + '.gz') else None,
+                }
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.assets
+
+    def _load(self, path: str) -> Tuple[bytes, Optional[bytes]]:
+        bodies = self._bodies.get(path)
+        if bodies is None:
+            asset = self.assets[path]
+            with open(asset['file'], 'rb') as handle:
+                data = handle.read()
+            compressed = None
+            if asset['gzip_file']:
+                with open(asset['gzip_file'], 'rb') as handle:
+                    compressed = handle.read()
+            elif asset['compressible'] and len(data) >= MIN_COMPRESS_SIZE:
+                compressed = gzip_bytes(data, 9)  # once per asset, so spend the time
+            bodies = (data, compressed)
+            with self._lock:
+                self._bodies[path] = bodies
+        return bodies
+
+    def respond(self, request, path: str) -> Response:
+        asset = self.assets[path]
+        response = not_modified(request, asset['etag'], asset['cache_control'])
+        if response is not None:
+            return response
+
+        data, compressed = self._load(path)
+        use_gzip = compressed is not None and accepts_gzip(request)
+        response = Response(compressed if use_gzip else data, mimetype=asset['mimetype'])
+        response.headers['ETag'] = gzip_etag(asset['etag']) if use_gzip else asset['etag']
+        response.headers['Cache-Control'] = asset['cache_control']
+        response.headers['Vary'] = 'Accept-Encoding'
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
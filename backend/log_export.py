@@ -0,0 +1,150 @@
+"""
+Chat Log Export
+Streams the admin chat log as CSV (optionally gzip-compressed) in
+constant memory, with helpers for ETag and byte-range resumption
+"""
+
+import csv
+import hashlib
+import io
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+CSV_HEADER = ['Timestamp', 'User', 'Message', 'Intent', 'Confidence', 'Method']
+CHUNK_SIZE = 64 * 1024
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def turn_time(turn: Dict) -> float:
+    """Epoch seconds of a turn (falls back to the user message timestamp)"""
+    if turn.get('ts') is not None:
+        return turn['ts']
+    try:
+        return datetime.fromisoformat(turn['user']['timestamp']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def iter_csv_chunks(turns: Iterable[Dict], start: Optional[float] = None, end: Optional[float] = None,
+                    intent: Optional[str] = None, until_seq: Optional[int] = None) -> Iterator[bytes]:
+    """Yield CSV bytes in ~64KB chunks for the turns matching the filters
+
+    ``until_seq`` pins the export to a snapshot of the log, so repeated
+    passes (sizing, resumed ranges) produce identical bytes.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+
+    for turn in turns:
+        if until_seq is not None and turn.get('seq', 0) > until_seq:
+            break
+        user_msg, bot_msg = turn['user'], turn['bot']
+        if intent and bot_msg.get('intent') != intent:
+            continue
+        if start is not None or end is not None:
+            ts = turn_time(turn)
+            if (start is not None and ts < start) or (end is not None and ts > end):
+                continue
+        writer.writerow([
+            user_msg.get('timestamp', ''),
+            user_msg.get('user_id', ''),
+            user_msg.get('text', ''),
+            bot_msg.get('intent', ''),
+            bot_msg.get('confidence', ''),
+            bot_msg.get('method', '')
+        ])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream incrementally (gzip framing, mtime 0 so output is repeatable)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def slice_chunks(chunks: Iterable[bytes], first: int, last: Optional[int] = None) -> Iterator[bytes]:
+    """Yield only bytes first..last (inclusive) of a chunk stream"""
+    position = 0
+    for chunk in chunks:
+        chunk_end = position + len(chunk)
+        if chunk_end > first and (last is None or position <= last):
+            lo = max(first - position, 0)
+            hi = len(chunk) if last is None else min(last - position + 1, len(chunk))
+            yield chunk[lo:hi]
+        position = chunk_end
+        if last is not None and position > last:
+            return
+
+
+def stream_length(chunks: Iterable[bytes]) -> int:
+    """Total size of a stream, computed without keeping it"""
+    return sum(len(chunk) for chunk in chunks)
+
+
+class ExportLengths:
+    """Byte lengths of recent exports keyed by ETag
+
+    A strong ETag pins the exact bytes, so the sizing pass a resumed
+    download needs runs once per export rather than once per range request.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lengths: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, measure: Callable[[], int]) -> int:
+        with self._lock:
+            length = self._lengths.get(etag)
+            if length is not None:
+                self._lengths.move_to_end(etag)
+                return length
+        length = measure()
+        with self._lock:
+            self._lengths[etag] = length
+            while len(self._lengths) > self.max_entries:
+                self._lengths.popitem(last=False)
+        return length
+
+
+def parse_range(header: Optional[str], total: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=' range into inclusive offsets
+
+    Returns None for a missing or malformed header (serve the whole body)
+    and raises ValueError for a range outside the body (416).
+    """
+    match = RANGE_PATTERN.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        first, last = max(total - length, 0), total - 1
+    else:
+        first = int(first)
+        last = min(int(last), total - 1) if last else total - 1
+    if first > last or first >= total:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return first, last
+
+
+def export_etag(turn_count: int, last_seq: Optional[int], params: Dict, encoding: str) -> str:
+    """Strong ETag for an export: changes whenever the log or the request changes"""
+    key = f"{turn_count}:{last_seq}:{sorted(params.items())}:{encoding}"
+    return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:20] + '"'
+
@@ -0,0 +1,136 @@
+"""
+Chat Log Index
+Time-ordered arrays plus per-field posting lists over chat turns, so
+filtered admin log pages cost O(page size + matches) instead of a full scan
+"""
+
+import bisect
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+INDEXED_FIELDS = ('user_id', 'session_id', 'intent', 'method', 'confidence_band')
+CONFIDENCE_BANDS = ('low', 'medium', 'high')
+
+
+def confidence_band(confidence: float) -> str:
+    """Bucket a confidence score; 'high' matches the >0.7 success threshold"""
+    if confidence > 0.7:
+        return 'high'
+    if confidence >= 0.4:
+        return 'medium'
+    return 'low'
+
+
+def turn_fields(record: Dict) -> Dict[str, str]:
+    """Indexed field values of one paired turn"""
+    user_message = record.get('user') or {}
+    bot_message = record.get('bot') or {}
+    return {
+        'user_id': user_message.get('user_id'),
+        'session_id': user_message.get('session_id'),
+        'intent': bot_message.get('intent'),
+        'method': bot_message.get('method'),
+        'confidence_band': confidence_band(float(bot_message.get('confidence') or 0)),
+    }
+
+
+class LogIndex:
+    """In-memory index over turns appended in sequence order
+
+    ``_seqs`` and ``_times`` are parallel arrays ordered by sequence number,
+    so a time range maps to a sequence range with two binary searches. Each
+    field value has an ascending array of sequence numbers; a query walks the
+    shortest matching posting list backwards from the cursor and checks the
+    others by binary search.
+    """
+
+    def __init__(self):
+        self._seqs = array('q')
+        self._times = array('d')
+        self._postings: Dict[str, Dict[str, array]] = {field: {} for field in INDEXED_FIELDS}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._seqs)
+
+    def add(self, record: Dict) -> None:
+        seq = record['seq']
+        with self._lock:
+            if self._seqs and seq <= self._seqs[-1]:
+                return  # already indexed (rebuild overlapping live appends)
+            self._seqs.append(seq)
+            self._times.append(record.get('ts', 0.0))
+            for field, value in turn_fields(record).items():
+                if value is None:
+                    continue
+                posting = self._postings[field].get(value)
+                if posting is None:
+                    posting = self._postings[field][value] = array('q')
+                posting.append(seq)
+
+    def count(self, field: str, value: str) -> int:
+        """Number of turns with ``field == value``"""
+        with self._lock:
+            posting = self._postings[field].get(value)
+            return len(posting) if posting is not None else 0
+
+    def seqs_for(self, field: str, value: str, start: int = 0, stop: Optional[int] = None) -> List[int]:
+        """Sequence numbers of the start..stop-th turns (oldest first) with ``field == value``"""
+        with self._lock:
+            posting = self._postings[field].get(value)
+            return posting[start:stop].tolist() if posting is not None else []
+
+    def query(self, limit: int = 50, cursor: Optional[int] = None, start: Optional[float] = None,
+              end: Optional[float] = None, **filters) -> Tuple[List[int], Optional[int]]:
+        """Sequence numbers of matching turns, newest first, and the next-page cursor
+
+        ``cursor`` is the last sequence number of the previous page; ``filters``
+        are exact matches on INDEXED_FIELDS (None means no filter).
+        """
+        with self._lock:
+            seqs, times = self._seqs, self._times
+            if not seqs:
+                return [], None
+
+            lo = bisect.bisect_left(times, start) if start is not None else 0
+            hi = bisect.bisect_right(times, end) if end is not None else len(seqs)
+            if lo >= hi:
+                return [], None
+            seq_min, seq_max = seqs[lo], seqs[hi - 1]
+            if cursor is not None:
+                seq_max = min(seq_max, cursor - 1)
+
+            postings = []
+            for field, value in filters.items():
+                if value is None:
+                    continue
+                posting = self._postings[field].get(value)
+                if posting is None:
+                    return [], None
+                postings.append(posting)
+
+            matches = []
+            if not postings:
+                position = bisect.bisect_right(seqs, seq_max) - 1
+                while position >= 0 and seqs[position] >= seq_min and len(matches) <= limit:
+                    matches.append(seqs[position])
+                    position -= 1
+            else:
+                postings.sort(key=len)
+                driver, others = postings[0], postings[1:]
+                position = bisect.bisect_right(driver, seq_max) - 1
+                while position >= 0 and driver[position] >= seq_min and len(matches) <= limit:
+                    seq = driver[position]
+                    if all(self._contains(other, seq) for other in others):
+                        matches.append(seq)
+                    position -= 1
+
+        if len(matches) > limit:
+            return matches[:limit], matches[limit - 1]
+        return matches, None
+
+    @staticmethod
+    def _contains(posting: array, seq: int) -> bool:
+        index = bisect.bisect_left(posting, seq)
+        return index < len(posting) and posting[index] == seq
@@ -0,0 +1,324 @@
+"""
+Runtime Metrics
+Per-route request counts, error counts and latency histograms plus
+scrape-time gauges and counters, exported in the Prometheus text format
+"""
+
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshots of exited processes are kept rather than folded
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Series value layout: [requests, errors, latency sum, per-bucket counts..., +Inf count]
+COUNT, ERRORS, LATENCY_SUM, FIRST_BUCKET = 0, 1, 2, 3
+SERIES_WIDTH = FIRST_BUCKET + len(LATENCY_BUCKETS) + 1
+
+SeriesKey = Tuple[str, str, str]  # (route, method, status)
+
+
+def _new_series() -> List[float]:
+    return [0] * SERIES_WIDTH
+
+
+def _merge_into(target: Dict[SeriesKey, List[float]], source: Dict[SeriesKey, List[float]]) -> None:
+    for key, values in source.items():
+        totals = target.get(key)
+        if totals is None:
+            target[key] = list(values)
+        else:
+            for i, value in enumerate(values):
+                totals[i] += value
+
+
+class MetricsRegistry:
+    """Request metrics recorded into per-thread shards
+
+    Each thread writes only to its own dict, so ``observe`` takes no lock.
+    A scrape sums the shards; shards of finished threads are folded into
+    ``_retired`` so per-request threads (the dev server) don't pile up.
+
+    With ``directory`` set, every process periodically writes its totals to
+    ``<directory>/metrics-<pid>-<start time>.json`` and a scrape merges all
+    files, so any gunicorn worker can answer for the whole server. The start
+    time keeps a recycled pid from overwriting an exited worker's file. A
+    scrape folds the counters of exited workers into ``retired.json`` and
+    deletes their files; their gauges and callback counters are dropped.
+    """
+
+    RETIRED_FILE = 'retired.json'
+    LOCK_FILE = '.retire.lock'
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._shards: List[Tuple[weakref.ref, Dict[SeriesKey, List[float]]]] = []
+        self._retired: Dict[SeriesKey, List[float]] = {}
+        self._lock = threading.Lock()
+        # name -> (kind, help, collect); kind is 'gauge' or 'counter'
+        self._gauges: Dict[str, Tuple[str, str, Callable[[], Iterable[Tuple[Dict[str, str], float]]]]] = {}
+        self._flusher_pid = None
+        self._snapshot_name: Tuple[Optional[int], str] = (None, '')
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # Recording
+    def observe(self, route: str, method: str, status: int, seconds: float) -> None:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._register_shard()
+        key = (route, method, str(status))
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = _new_series()
+        series[COUNT] += 1
+        if status >= 500:
+            series[ERRORS] += 1
+        series[LATENCY_SUM] += seconds
+        series[FIRST_BUCKET + bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def _register_shard(self) -> Dict[SeriesKey, List[float]]:
+        shard: Dict[SeriesKey, List[float]] = {}
+        self._local.shard = shard
+        with self._lock:
+            self._shards.append((weakref.ref(threading.current_thread()), shard))
+            if len(self._shards) % 64 == 0:
+                self._retire_dead_shards()
+        if self.directory and self._flusher_pid != os.getpid():
+            self._start_flusher()
+        return shard
+
+    def _retire_dead_shards(self) -> None:
+        """Fold shards of finished threads into the retired totals (call under _lock)"""
+        alive = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is None or not thread.is_alive():
+                _merge_into(self._retired, shard)
+            else:
+                alive.append((thread_ref, shard))
+        self._shards = alive
+
+    def reset(self) -> None:
+        """Drop recorded series (a forked worker must not re-report its parent's)"""
+        with self._lock:
+            self._local = threading.local()
+            self._shards = []
+            self._retired = {}
+        self._flusher_pid = None
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]) -> None:
+        """Register a gauge computed at scrape time as (labels, value) pairs"""
+        self._gauges[name] = ('gauge', help_text, collect)
+
+    def counter(self, name: str, help_text: str,
+                collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]) -> None:
+        """Register a counter kept elsewhere and read at scrape time (name it ``*_total``)"""
+        self._gauges[name] = ('counter', help_text, collect)
+
+    # Aggregation
+    def totals(self) -> Dict[SeriesKey, List[float]]:
+        """Summed request series of this process"""
+        with self._lock:
+            self._retire_dead_shards()
+            merged = {key: list(values) for key, values in self._retired.items()}
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            _merge_into(merged, dict(shard))
+        return merged
+
+    def collect_gauges(self) -> Dict[str, Tuple[str, str, List[Tuple[Dict[str, str], float]]]]:
+        """Current samples of every scrape-time gauge and counter as (kind, help, samples)"""
+        gauges = {}
+        for name, (kind, help_text, collect) in self._gauges.items():
+            try:
+                gauges[name] = (kind, help_text, list(collect()))
+            except Exception as e:
+                print(f"⚠️ Metrics gauge {name} failed: {e}")
+        return gauges
+
+    # Multi-process sharing
+    def _start_flusher(self) -> None:
+        self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._run_flusher, name='metrics-flusher', daemon=True)
+        thread.start()
+
+    def _run_flusher(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                print(f"⚠️ Metrics snapshot failed: {e}")
+
+    def write_snapshot(self) -> None:
+        """Atomically replace this process's file in the shared directory"""
+        pid = os.getpid()
+        if self._snapshot_name[0] != pid:
+            self._snapshot_name = (pid, f'metrics-{pid}-{_process_start(pid) or 0}.json')
+        payload = {
+            'pid': pid,
+            'started': _process_start(pid),
+            'series': [[*key, values] for key, values in self.totals().items()],
+            'gauges': {name: list(gauge) for name, gauge in self.collect_gauges().items()},
+        }
+        self._write_json(self._snapshot_name[1], payload)
+
+    def _write_json(self, name: str, payload: dict) -> None:
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.metrics-')
+        with os.fdopen(handle, 'w') as f:
+            json.dump(payload, f)
+        os.replace(temp_path, os.path.join(self.directory, name))
+
+    def _read_snapshots(self) -> List[Tuple[str, dict]]:
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith('metrics-') and name.endswith('.json')):
+                continue
+            payload = self._read_json(name)
+            if payload is not None:
+                snapshots.append((name, payload))
+        return snapshots
+
+    def _read_json(self, name: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _retire_dead_snapshots(self, snapshots: List[Tuple[str, dict]]) -> None:
+        """Fold the files of exited processes into the retired totals and delete them
+
+        Runs under an exclusive lock and re-reads each file, so two workers
+        scraping at once can't both count the same exited worker.
+        """
+        dead = [name for name, payload in snapshots
+                if not _process_alive(payload['pid'], payload.get('started'))]
+        if fcntl is None or not dead:
+            return
+        with open(os.path.join(self.directory, self.LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            retired = self._read_json(self.RETIRED_FILE) or {'series': []}
+            series = {tuple(entry[:3]): entry[3] for entry in retired['series']}
+            folded = []
+            for name in dead:
+                payload = self._read_json(name)
+                if payload is None:  # already retired by another process
+                    continue
+                _merge_into(series, {tuple(entry[:3]): entry[3] for entry in payload['series']})
+                folded.append(name)
+            if not folded:
+                return
+            self._write_json(self.RETIRED_FILE, {'series': [[*key, values] for key, values in series.items()]})
+            for name in folded:
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def merged(self) -> Tuple[Dict[SeriesKey, List[float]], Dict[str, Tuple[str, str, List]]]:
+        """Series and gauges across every process sharing the directory"""
+        if not self.directory:
+            return self.totals(), self.collect_gauges()
+
+        self.write_snapshot()
+        self._retire_dead_snapshots(self._read_snapshots())
+        series: Dict[SeriesKey, List[float]] = {}
+        gauges: Dict[str, Tuple[str, str, List]] = {}
+        retired = self._read_json(self.RETIRED_FILE)
+        if retired is not None:
+            _merge_into(series, {tuple(entry[:3]): entry[3] for entry in retired['series']})
+        for name, payload in self._read_snapshots():
+            _merge_into(series, {tuple(entry[:3]): entry[3] for entry in payload['series']})
+            if not _process_alive(payload['pid'], payload.get('started')):
+                continue
+            for gauge_name, (kind, help_text, samples) in payload['gauges'].items():
+                entry = gauges.setdefault(gauge_name, (kind, help_text, []))
+                entry[2].extend(({**labels, 'pid': str(payload['pid'])}, value) for labels, value in samples)
+        return series, gauges
+
+    # Exposition
+    def render(self, prefix: str = 'securebank') -> str:
+        series, gauges = self.merged()
+        lines = [
+            f'# HELP {prefix}_http_requests_total HTTP requests by route, method and status',
+            f'# TYPE {prefix}_http_requests_total counter',
+        ]
+        ordered = sorted(series.items())
+        for (route, method, status), values in ordered:
+            lines.append(f'{prefix}_http_requests_total{_labels(route, method, status)} {values[COUNT]}')
+
+        lines += [
+            f'# HELP {prefix}_http_request_errors_total HTTP requests that ended in a 5xx',
+            f'# TYPE {prefix}_http_request_errors_total counter',
+        ]
+        for (route, method, status), values in ordered:
+            if values[ERRORS]:
+                lines.append(f'{prefix}_http_request_errors_total{_labels(route, method, status)} {values[ERRORS]}')
+
+        name = f'{prefix}_http_request_duration_seconds'
+        lines += [f'# HELP {name} Time to produce the response', f'# TYPE {name} histogram']
+        for (route, method, status), values in ordered:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), values[FIRST_BUCKET:]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{_labels(route, method, status, le=le)} {cumulative}')
+            lines.append(f'{name}_sum{_labels(route, method, status)} {values[LATENCY_SUM]:.6f}')
+            lines.append(f'{name}_count{_labels(route, method, status)} {values[COUNT]}')
+
+        for gauge_name, (kind, help_text, samples) in sorted(gauges.items()):
+            full_name = f'{prefix}_{gauge_name}'
+            lines += [f'# HELP {full_name} {help_text}', f'# TYPE {full_name} {kind}']
+            for labels, value in samples:
+                lines.append(f'{full_name}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _process_start(pid: int) -> Optional[int]:
+    """Start time of ``pid`` in clock ticks since boot, or None off Linux"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # Field 22; the command name (field 2) may itself contain spaces
+            return int(f.read().rsplit(')', 1)[1].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _process_alive(pid: int, started: Optional[int] = None) -> bool:
+    """Whether ``pid`` still runs and, when ``started`` is known, is the same process"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    if started is None:
+        return True
+    current = _process_start(pid)
+    return current is None or current == started
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _labels(route: str, method: str, status: str, **extra) -> str:
+    return _format_labels({'route': route, 'method': method, 'status': status, **extra})
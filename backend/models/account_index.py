@@ -0,0 +1,215 @@
+"""
+Account Search Index
+Incrementally maintained trigram postings for customer names and emails,
+sorted prefix/suffix keys for account numbers and an exact-name hash
+"""
+
+import bisect
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Ranks, best first
+EXACT, PREFIX, WORD_PREFIX, NUMBER_SUFFIX, SUBSTRING = range(5)
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class AccountIndex:
+    """Search index over accounts, kept current by ``add`` and ``remove``
+
+    Every indexed account gets an increasing integer id, so trigram postings
+    are append-only ``array('I')`` lists that stay sorted and cost 4 bytes
+    per entry. Sorted keys of single adds (and renames) go to small pending
+    lists that lookups search alongside the main ones; the pending keys are
+    merged in once they outgrow 1/MERGE_FRACTION of the index, so an add
+    costs amortized O(1) list shifting instead of O(N). Removing an account
+    only clears its slot; stale ids and keys are skipped at lookup and
+    ``compact`` rebuilds once they make up a quarter of the index.
+
+    Exact, prefix, word-prefix and number-suffix matches come from sorted
+    keys: account numbers, reversed account numbers, and names, name words
+    and emails. Queries of three or more characters then intersect the
+    postings of their trigrams (smallest first) and verify the survivors
+    against the real fields to find plain substring matches; shorter
+    queries scan the accounts until the limit is filled.
+    """
+
+    COMPACT_RATIO = 4
+    MERGE_FRACTION = 256
+    MIN_MERGE = 1024
+
+    def __init__(self):
+        self._lock = threading.RLock()  # maintenance; lookups read without it
+        self._reset()
+
+    def _reset(self) -> None:
+        self._slots: List[Optional[Tuple[str, str, str, str]]] = []  # (number, name, email, original name)
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        # (account numbers, reversed account numbers, names/words/emails), each sorted (key, id) pairs
+        self._keys: Tuple[List[Tuple[str, int]], ...] = ([], [], [])
+        self._pending: Tuple[List[Tuple[str, int]], ...] = ([], [], [])
+        self._removed = 0
+
+    # Maintenance
+    def add(self, account_number: str, customer_name: str, email: str) -> None:
+        """Index an account (re-adding an account number replaces its entry)"""
+        with self._lock:
+            self._add(account_number, customer_name, email, self._pending, bisect.insort)
+            if len(self._pending[2]) > max(self.MIN_MERGE, len(self._keys[2]) // self.MERGE_FRACTION):
+                self._merge_pending()
+
+    def _add(self, account_number: str, customer_name: str, email: str, keys, insert) -> None:
+        if account_number in self._ids:
+            self.remove(account_number)
+        name, email = customer_name.lower(), email.lower()
+        account_id = len(self._slots)
+        self._slots.append((account_number, name, email, customer_name))
+        self._ids[account_number] = account_id
+        for gram in trigrams(name) | trigrams(email) | trigrams(account_number):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array('I')
+            postings.append(account_id)
+        self._by_name.setdefault(name, []).append(account_number)
+        numbers, reversed_numbers, words = keys
+        insert(numbers, (account_number, account_id))
+        insert(reversed_numbers, (account_number[::-1], account_id))
+        for word in set(name.split()) | {name, email}:
+            insert(words, (word, account_id))
+
+    def _merge_pending(self) -> None:
+        """Fold the pending keys into the main lists (call under _lock)"""
+        # New lists rather than in-place merges, so a lookup in flight keeps a sorted one
+        self._keys = tuple(sorted(keys + pending) for keys, pending in zip(self._keys, self._pending))
+        self._pending = ([], [], [])
+
+    def remove(self, account_number: str) -> None:
+        with self._lock:
+            account_id = self._ids.pop(account_number, None)
+            if account_id is None:
+                return
+            number, name, _, _ = self._slots[account_id]
+            self._slots[account_id] = None
+            self._removed += 1
+            numbers = self._by_name.get(name, [])
+            if number in numbers:
+                numbers.remove(number)
+                if not numbers:
+                    del self._by_name[name]
+            if self._removed > 1024 and self._removed * self.COMPACT_RATIO > len(self._slots):
+                self.compact()
+
+    def compact(self) -> None:
+        """Rebuild without the slots and keys of removed accounts"""
+        with self._lock:
+            live = [slot for slot in self._slots if slot is not None]
+            self._reset()
+            self.extend((number, original, email) for number, _, email, original in live)
+
+    def extend(self, accounts: Iterable[Tuple[str, str, str]]) -> None:
+        """Bulk-index (account_number, customer_name, email) triples, sorting the keys once"""
+        with self._lock:
+            keys = tuple(list(keys) for keys in self._keys)
+            for account_number, customer_name, email in accounts:
+                self._add(account_number, customer_name, email, keys, list.append)
+            self._keys = tuple(sorted(new) for new in keys)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, account_number: str) -> bool:
+        return account_number in self._ids
+
+    # Lookups
+    def by_name(self, customer_name: str) -> List[str]:
+        """Account numbers whose customer name matches exactly (case-insensitive)"""
+        return list(self._by_name.get(customer_name.lower(), []))
+
+    def search(self, query: str, limit: Optional[int] = 50) -> List[str]:
+        """Account numbers matching ``query``, best match first"""
+        query = query.strip().lower()
+        if not query:
+            return []
+        # Exact, prefix, word-prefix and number-suffix matches all sit in one
+        # range of the sorted keys; trigram candidates only fill what is left
+        # of the limit with plain substring matches.
+        ranked = self._rank_candidates(query, self._prefix_candidates(query, limit), limit)
+        if limit is None or len(ranked) < limit:
+            seen = {number for _, _, number in ranked}
+            wanted = None if limit is None else limit - len(ranked)
+            # Too short for trigrams: verify accounts in id order until the limit is filled
+            candidates = self._trigram_candidates(query) if len(query) >= 3 else range(len(self._slots))
+            ranked += self._rank_candidates(query, candidates, wanted, seen)
+        ranked.sort()
+        return [number for _, _, number in ranked[:limit]]
+
+    def _rank_candidates(self, query: str, candidates: Iterable[int], limit: Optional[int],
+                         seen: Iterable[str] = ()) -> List[Tuple[int, str, str]]:
+        ranked, slots = [], self._slots
+        for account_id in candidates:
+            slot = slots[account_id]
+            if slot is None or slot[0] in seen:
+                continue
+            rank = _rank(query, slot)
+            if rank is not None:
+                ranked.append((rank, slot[1], slot[0]))
+                if limit is not None and len(ranked) >= limit and rank == SUBSTRING:
+                    break
+        return ranked
+
+    def _trigram_candidates(self, query: str) -> Iterable[int]:
+        postings = []
+        for gram in trigrams(query):
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = np.frombuffer(postings[0], dtype=np.uint32)
+        for posting in postings[1:]:
+            if len(candidates) <= 64:  # verification is cheaper than another intersection
+                break
+            candidates = np.intersect1d(candidates, np.frombuffer(posting, dtype=np.uint32), assume_unique=True)
+        return candidates.tolist()
+
+    def _prefix_candidates(self, query: str, limit: Optional[int]) -> Iterable[int]:
+        # A short prefix can match most of the bank; with a limit, only the
+        # first few live keys of each range are ranked
+        slots, ids = self._slots, set()
+        keys, pending = self._keys, self._pending
+        for lists, key in zip(zip(keys, pending), (query, query[::-1], query)):
+            for sorted_keys in lists:
+                taken = 0
+                for position in range(bisect.bisect_left(sorted_keys, (key,)), len(sorted_keys)):
+                    word, account_id = sorted_keys[position]
+                    if not word.startswith(key):
+                        break
+                    if account_id >= len(slots) or slots[account_id] is None:
+                        continue  # removed or renamed since
+                    ids.add(account_id)
+                    taken += 1
+                    if limit is not None and taken >= 4 * limit:
+                        break
+        return ids
+
+
+def _rank(query: str, slot: Tuple[str, str, str, str]) -> Optional[int]:
+    number, name, email, _ = slot
+    if query in (number, name, email):
+        return EXACT
+    if number.startswith(query) or name.startswith(query) or email.startswith(query):
+        return PREFIX
+    if any(word.startswith(query) for word in name.split()):
+        return WORD_PREFIX
+    if number.endswith(query):
+        return NUMBER_SUFFIX
+    if query in name or query in number or query in email:
+        return SUBSTRING
+    return None
@@ -0,0 +1,233 @@
+"""
+Compact Account Records
+Slotted card and loan records with interned codes, readable as the dicts
+they replace, and the code tables shared by every account
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+try:
+    from .ledger import InternTable
+except ImportError:
+    from ledger import InternTable
+
+
+def codebook(*values: str) -> InternTable:
+    """An intern table with its known values registered up front"""
+    table = InternTable()
+    for value in values:
+        table.code(value)
+    return table
+
+
+# Shared by every account; records keep the small integer codes
+ACCOUNT_STATUSES = codebook("Active", "Dormant", "Frozen", "Closed")
+ACCOUNT_TYPES = codebook("Savings", "Current", "Fixed Deposit")
+CARD_TYPES = codebook("Debit Card", "Credit Card")
+CARD_STATUSES = codebook("Active", "Blocked", "Expired")
+LOAN_TYPES = codebook("personal_loan", "home_loan", "car_loan", "business_loan")
+LOAN_STATUSES = codebook("Active", "Closed")
+BRANCHES = codebook("SB001")
+BRANCH_IFSC = ["SBIN0000123"]  # by branch code
+
+NO_LOANS: Tuple = ()  # shared by accounts that never took a loan
+
+
+def _ordinal(value: Union[str, date, None]) -> Optional[int]:
+    if value is None:
+        return None
+    return (datetime.fromisoformat(value) if isinstance(value, str) else value).toordinal()
+
+
+def _isoformat(ordinal: Optional[int]) -> Optional[str]:
+    return datetime.fromordinal(ordinal).isoformat() if ordinal is not None else None
+
+
+def _last4(card_number: Any) -> int:
+    digits = str(card_number)[-4:]
+    if len(digits) != 4 or not digits.isdigit():
+        raise ValueError(f"card_number must end in four digits, got {card_number!r}")
+    return int(digits)
+
+
+class Record(Mapping):
+    """Slotted record that reads like a dict with keys ``FIELDS``
+
+    ``record["key"]``, ``dict(record)``, ``.get`` and equality with a plain
+    dict all work. Assigning a known key updates the field; any other key is
+    kept in a small per-record dict (``None`` until first used), so callers
+    can still attach their own fields as they could to the dicts these
+    records replace.
+    """
+
+    __slots__ = ('_extra',)
+    FIELDS: Tuple[str, ...] = ()
+    REQUIRED: Tuple[str, ...] = ()
+
+    @classmethod
+    def _extras(cls, record: Dict) -> Optional[Dict]:
+        """Check ``record`` has the REQUIRED keys and return the ones outside FIELDS"""
+        missing = [key for key in cls.REQUIRED if record.get(key) is None]
+        if missing:
+            raise ValueError(f"{cls.__name__} is missing required field(s): {', '.join(missing)}")
+        extra = {key: value for key, value in record.items() if key not in cls.FIELDS}
+        return extra or None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self.FIELDS or self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.FIELDS
+        if self._extra is not None:
+            yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + (len(self._extra) if self._extra is not None else 0)
+
+    def to_dict(self) -> Dict:
+        record = {field: getattr(self, field) for field in self.FIELDS}
+        if self._extra is not None:
+            record.update(self._extra)
+        return record
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Card(Record):
+    """A debit or credit card: type and status codes, the last four digits,
+    an interned expiry string and the issue date as a day ordinal
+
+    Only the type and card number are required; missing limits and dates
+    are None.
+    """
+
+    __slots__ = ('_type', '_status', 'last4', 'expiry_date', 'daily_limit', 'monthly_limit', '_issued')
+    FIELDS = ("card_type", "card_number", "card_status", "expiry_date", "daily_limit", "monthly_limit",
+              "issued_date")
+    REQUIRED = ("card_type", "card_number")
+
+    def __init__(self, card_type: str, last4: int, expiry_date: Optional[str] = None,
+                 daily_limit: Optional[int] = None, monthly_limit: Optional[int] = None,
+                 issued_date: Union[str, date, None] = None, card_status: str = "Active",
+                 extra: Optional[Dict] = None):
+        self._type = CARD_TYPES.code(card_type)
+        self._status = CARD_STATUSES.code(card_status)
+        self.last4 = last4
+        self.expiry_date = sys.intern(expiry_date) if expiry_date is not None else None
+        self.daily_limit = daily_limit
+        self.monthly_limit = monthly_limit
+        self._issued = _ordinal(issued_date)
+        self._extra = extra
+
+    @classmethod
+    def from_dict(cls, card: Dict) -> "Card":
+        extra = cls._extras(card)
+        return cls(card["card_type"], _last4(card["card_number"]), card.get("expiry_date"), card.get("daily_limit"),
+                   card.get("monthly_limit"), card.get("issued_date"), card.get("card_status") or "Active", extra)
+
+    @property
+    def card_type(self) -> str:
+        return CARD_TYPES.values[self._type]
+
+    @card_type.setter
+    def card_type(self, value: str) -> None:
+        self._type = CARD_TYPES.code(value)
+
+    @property
+    def card_number(self) -> str:
+        return f"****-****-****-{self.last4:04d}"
+
+    @card_number.setter
+    def card_number(self, value: str) -> None:
+        self.last4 = _last4(value)
+
+    @property
+    def card_status(self) -> str:
+        return CARD_STATUSES.values[self._status]
+
+    @card_status.setter
+    def card_status(self, value: str) -> None:
+        self._status = CARD_STATUSES.code(value)
+
+    @property
+    def issued_date(self) -> Optional[str]:
+        return _isoformat(self._issued)
+
+    @issued_date.setter
+    def issued_date(self, value: Union[str, date, None]) -> None:
+        self._issued = _ordinal(value)
+
+
+class Loan(Record):
+    """A loan taken against an account, with the figures calculate_emi returns
+
+    Only the loan type is required; figures and the start date that were
+    not given are None.
+    """
+
+    __slots__ = ('_type', '_status', 'principal', 'interest_rate', 'tenure_months', 'emi', '_start')
+    FIELDS = ("loan_type", "principal", "interest_rate", "tenure_months", "emi", "status", "start_date")
+    REQUIRED = ("loan_type",)
+
+    def __init__(self, loan_type: str, principal: Optional[float] = None, interest_rate: Optional[float] = None,
+                 tenure_months: Optional[int] = None, emi: Optional[float] = None,
+                 start_date: Union[str, date, None] = None, status: str = "Active", extra: Optional[Dict] = None):
+        self._type = LOAN_TYPES.code(loan_type)
+        self._status = LOAN_STATUSES.code(status)
+        self.principal = principal
+        self.interest_rate = interest_rate
+        self.tenure_months = tenure_months
+        self.emi = emi
+        self._start = _ordinal(start_date)
+        self._extra = extra
+
+    @classmethod
+    def from_dict(cls, loan: Dict) -> "Loan":
+        extra = cls._extras(loan)
+        return cls(loan["loan_type"], loan.get("principal"), loan.get("interest_rate"), loan.get("tenure_months"),
+                   loan.get("emi"), loan.get("start_date"), loan.get("status") or "Active", extra)
+
+    @property
+    def loan_type(self) -> str:
+        return LOAN_TYPES.values[self._type]
+
+    @loan_type.setter
+    def loan_type(self, value: str) -> None:
+        self._type = LOAN_TYPES.code(value)
+
+    @property
+    def status(self) -> str:
+        return LOAN_STATUSES.values[self._status]
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self._status = LOAN_STATUSES.code(value)
+
+    @property
+    def start_date(self) -> Optional[str]:
+        return _isoformat(self._start)
+
+    @start_date.setter
+    def start_date(self, value: Union[str, date, None]) -> None:
+        self._start = _ordinal(value)
@@ -0,0 +1,443 @@
+"""
+Tiered Account Store
+Compact resident account headers, with transaction ledgers, cards and loans
+spilled to SQLite and hydrated on demand into a byte-budgeted LRU of hot
+accounts
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .account_index import AccountIndex
+    from .account_records import NO_LOANS, Card, Loan
+    from .banking_data import BankAccount, BankingDataService, BankStatistics
+    from .ledger import InternTable, TransactionLedger
+except ImportError:
+    from account_index import AccountIndex
+    from account_records import NO_LOANS, Card, Loan
+    from banking_data import BankAccount, BankingDataService, BankStatistics
+    from ledger import InternTable, TransactionLedger
+
+
+class AccountHeaders:
+    """Always-resident per-account fields as growable NumPy columns
+
+    Everything a summary or the bank-wide statistics need without the
+    history: balance, status, type, dates and counts. Status and type are
+    interned to small codes; names, numbers and phones stay plain strings.
+    """
+
+    COLUMNS = {
+        'balance': np.float64,
+        'status': np.int8,
+        'account_type': np.int8,
+        'created_date': 'datetime64[s]',
+        'transactions': np.int32,
+        'cards': np.int16,
+        'active_cards': np.int16,
+        'active_loans': np.int16,
+    }
+
+    def __init__(self, capacity: int = 1024):
+        self.numbers: List[str] = []
+        self.names: List[str] = []
+        self.phones: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.statuses = InternTable()
+        self.account_types = InternTable()
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def store(self, account: BankAccount) -> int:
+        """Copy an account's header fields into its row (added if new); returns the row"""
+        row = self.rows.get(account.account_number)
+        if row is None:
+            row = self.rows[account.account_number] = len(self.numbers)
+            if row == len(self.columns['balance']):
+                for name, column in self.columns.items():
+                    self.columns[name] = np.concatenate([column, np.zeros_like(column)])
+            self.numbers.append(account.account_number)
+            self.names.append(account.customer_name)
+            self.phones.append(account.phone)
+        else:
+            self.names[row] = account.customer_name
+            self.phones[row] = account.phone
+        columns = self.columns
+        columns['balance'][row] = account.balance
+        columns['status'][row] = self.statuses.code(account.status)
+        columns['account_type'][row] = self.account_types.code(account.account_type)
+        columns['created_date'][row] = account.created_date
+        columns['transactions'][row] = len(account.transactions)
+        columns['cards'][row] = len(account.cards)
+        columns['active_cards'][row] = sum(card["card_status"] == "Active" for card in account.cards)
+        columns['active_loans'][row] = sum(loan.get("status") == "Active" for loan in account.loans)
+        return row
+
+    def restore(self, row: int, account: BankAccount) -> None:
+        """Set the header fields of an account not yet attached to the statistics"""
+        columns = self.columns
+        account.balance = columns['balance'][row].item()
+        account.status = self.statuses.values[columns['status'][row]]
+        account.account_type = self.account_types.values[columns['account_type'][row]]
+        account.created_date = columns['created_date'][row].item()
+        account.phone = self.phones[row]
+
+    def summary(self, row: int) -> Dict:
+        """The get_account_summary dict, built from the header alone"""
+        columns = self.columns
+        name = self.names[row]
+        return {
+            "account_number": self.numbers[row],
+            "customer_name": name,
+            "account_type": self.account_types.values[columns['account_type'][row]],
+            "balance": columns['balance'][row].item(),
+            "status": self.statuses.values[columns['status'][row]],
+            "created_date": columns['created_date'][row].item().isoformat(),
+            "branch_code": "SB001",
+            "ifsc_code": "SBIN0000123",
+            "phone": self.phones[row],
+            "email": name.lower().replace(" ", "") + "@example.com",
+            "total_transactions": int(columns['transactions'][row]),
+            "active_cards": int(columns['active_cards'][row]),
+            "active_loans": int(columns['active_loans'][row])
+        }
+
+    def statistics(self) -> BankStatistics:
+        """Bank-wide aggregates over every row"""
+        size = len(self.numbers)
+        columns = {name: column[:size] for name, column in self.columns.items()}
+        statistics = BankStatistics()
+        statistics.total_accounts = size
+        statistics.total_balance = float(columns['balance'].sum())
+        statistics.total_transactions = int(columns['transactions'].sum())
+        statistics.total_cards = int(columns['cards'].sum())
+        active = self.statuses.lookup("Active")
+        statistics.active_accounts = int((columns['status'] == active).sum()) if active is not None else 0
+        counts = np.bincount(columns['account_type'], minlength=len(self.account_types))
+        statistics.account_types = {account_type: int(count)
+                                    for account_type, count in zip(self.account_types.values, counts) if count}
+        return statistics
+
+
+class AccountDetailStore:
+    """Ledgers, cards and loans of cold accounts, one SQLite row per account
+
+    A spill file rather than durable storage: headers live only in memory,
+    so the table is emptied on open.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS account_details (
+            account_number TEXT PRIMARY KEY,
+            ledger BLOB NOT NULL,
+            cards TEXT NOT NULL,
+            loans TEXT NOT NULL
+        ) WITHOUT ROWID;
+        DELETE FROM account_details;
+    """
+
+    SQL_GET = "SELECT ledger, cards, loans FROM account_details WHERE account_number = ?"
+    SQL_PUT = "INSERT OR REPLACE INTO account_details (account_number, ledger, cards, loans) VALUES (?, ?, ?, ?)"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.executescript(self.SCHEMA)
+
+    def get(self, account_number: str) -> Optional[Tuple[bytes, str, str]]:
+        return self.conn.execute(self.SQL_GET, (account_number,)).fetchone()
+
+    def put_many(self, rows: Iterable[Tuple[str, bytes, str, str]]) -> None:
+        with self.conn:
+            self.conn.executemany(self.SQL_PUT, rows)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class TieredAccounts:
+    """Account table with resident headers and a byte-budgeted LRU of hydrated accounts
+
+    Looks like the ``{account_number: BankAccount}`` dict it replaces:
+    ``get`` and ``[]`` return a full BankAccount, hydrating it from the
+    detail store on a miss (a hit just refreshes its LRU position). When
+    the hot set outgrows ``budget_bytes`` the least recently used
+    accounts are written back and dropped; accounts that are pinned or
+    whose lock is held are skipped. Write-backs are queued and stored in
+    batches; a miss on a queued account reads the queue first.
+
+    The service only mutates accounts it has pinned, so an eviction never
+    races a posting. Iterating ``values()`` hydrates every account.
+    """
+
+    ACCOUNT_OVERHEAD = 3072  # objects, dicts and intern tables around the ledger columns
+    WRITE_BATCH = 256
+    LATENCY_SAMPLES = 1024
+
+    def __init__(self, statistics: BankStatistics, path: Optional[str] = None,
+                 budget_bytes: int = 64 * 1024 * 1024, index: Optional[AccountIndex] = None):
+        if path is None:
+            self._scratch = tempfile.TemporaryDirectory(prefix='securebank-accounts-')
+            path = os.path.join(self._scratch.name, 'accounts.db')
+        self.statistics = statistics
+        self.index = index
+        self.headers = AccountHeaders()
+        self.details = AccountDetailStore(path)
+        self.budget_bytes = budget_bytes
+        self.lock = threading.RLock()  # taken before any account lock, never while holding one
+        self._hot: "OrderedDict[str, BankAccount]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._clean: Dict[str, Tuple[int, str, str]] = {}  # (transactions, cards, loans) as hydrated
+        self._hot_bytes = 0
+        self._pins: Dict[str, int] = {}
+        self._queued: Dict[str, Tuple[str, bytes, str, str]] = {}
+        self._hydration_ms = deque(maxlen=self.LATENCY_SAMPLES)
+        self.hits = self.misses = self.evictions = self.write_backs = 0
+
+    # Mapping interface
+    def get(self, account_number: str, default: Optional[BankAccount] = None) -> Optional[BankAccount]:
+        with self.lock:
+            account = self._hot.get(account_number)
+            if account is not None:
+                self.hits += 1
+                self._hot.move_to_end(account_number)
+                return account
+            row = self.headers.rows.get(account_number)
+            if row is None:
+                return default
+            self.misses += 1
+            account = self._hydrate(account_number, row)
+            self._admit(account)
+            return account
+
+    def __getitem__(self, account_number: str) -> BankAccount:
+        account = self.get(account_number)
+        if account is None:
+            raise KeyError(account_number)
+        return account
+
+    def __setitem__(self, account_number: str, account: BankAccount) -> None:
+        with self.lock:
+            if account_number in self._hot:
+                self._drop(account_number)
+            self.headers.store(account)
+            self._queued.pop(account_number, None)
+            self._admit(account, dirty=True)
+
+    def __contains__(self, account_number: str) -> bool:
+        return account_number in self.headers.rows
+
+    def __len__(self) -> int:
+        return len(self.headers)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.headers.numbers))
+
+    def keys(self) -> List[str]:
+        return list(self.headers.numbers)
+
+    def values(self) -> Iterator[BankAccount]:
+        for account_number in self.keys():
+            yield self[account_number]
+
+    def items(self) -> Iterator[Tuple[str, BankAccount]]:
+        for account_number in self.keys():
+            yield account_number, self[account_number]
+
+    # Tiering
+    def summary(self, account_number: str) -> Optional[Dict]:
+        """Summary of an account without hydrating it"""
+        with self.lock:
+            account = self._hot.get(account_number)
+            if account is not None:
+                return account.get_account_summary()
+            row = self.headers.rows.get(account_number)
+            return self.headers.summary(row) if row is not None else None
+
+    @contextmanager
+    def pinned(self, account_numbers: Iterable[str]) -> Iterator[None]:
+        """Keep these accounts hot (once hydrated) until the block exits"""
+        account_numbers = list(account_numbers)
+        with self.lock:
+            for account_number in account_numbers:
+                self._pins[account_number] = self._pins.get(account_number, 0) + 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                for account_number in account_numbers:
+                    count = self._pins[account_number] - 1
+                    if count:
+                        self._pins[account_number] = count
+                    else:
+                        del self._pins[account_number]
+                self._evict()
+
+    def recount(self) -> Tuple[BankStatistics, Dict]:
+        """Statistics recounted from the headers, and the running snapshot, taken together"""
+        with self.lock:
+            hot = list(self._hot.values())
+            with BankingDataService.lock_accounts(*hot):
+                for account in hot:
+                    self.headers.store(account)
+                return self.headers.statistics(), self.statistics.snapshot()
+
+    def flush(self) -> None:
+        """Store every queued write-back"""
+        with self.lock:
+            if self._queued:
+                self.details.put_many(self._queued.values())
+                self._queued.clear()
+
+    def close(self) -> None:
+        with self.lock:
+            self.details.close()
+            scratch = getattr(self, '_scratch', None)
+            if scratch is not None:
+                scratch.cleanup()
+
+    def cache_statistics(self) -> Dict:
+        """Hit rate, hydration latency and occupancy of the hot tier"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            latencies = np.array(self._hydration_ms) if self._hydration_ms else np.zeros(1)
+            return {
+                "accounts": len(self.headers),
+                "hot_accounts": len(self._hot),
+                "hot_bytes": self._hot_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "write_backs": self.write_backs,
+                "hydration_ms": {
+                    "mean": float(latencies.mean()),
+                    "p50": float(np.percentile(latencies, 50)),
+                    "p95": float(np.percentile(latencies, 95)),
+                    "max": float(latencies.max()),
+                },
+            }
+
+    def _hydrate(self, account_number: str, row: int) -> BankAccount:
+        started = time.perf_counter()
+        stored = self._queued.get(account_number)
+        if stored is None:
+            stored = (account_number,) + tuple(self.details.get(account_number))
+        _, ledger, cards, loans = stored
+        account = BankAccount(account_number, self.headers.names[row], sample_data=False)
+        self.headers.restore(row, account)
+        account.transactions = TransactionLedger.from_bytes(ledger)
+        account.cards = [Card.from_dict(card) for card in json.loads(cards)]
+        account.loans = [Loan.from_dict(loan) for loan in json.loads(loans)] or NO_LOANS
+        account.statistics = self.statistics
+        account.search_index = self.index
+        self._clean[account_number] = (len(account.transactions), cards, loans)
+        self._hydration_ms.append((time.perf_counter() - started) * 1000)
+        return account
+
+    def _admit(self, account: BankAccount, dirty: bool = False) -> None:
+        account_number = account.account_number
+        size = self.ACCOUNT_OVERHEAD + account.transactions.nbytes + 256 * (len(account.cards) + len(account.loans))
+        self._hot[account_number] = account
+        self._sizes[account_number] = size
+        self._hot_bytes += size
+        if dirty:
+            self._clean.pop(account_number, None)
+        self._evict()
+
+    def _evict(self) -> None:
+        excess = self._hot_bytes - self.budget_bytes
+        if excess <= 0:
+            return
+        # Oldest first; the newest entry is the account being handed out and always stays
+        newest = next(reversed(self._hot))
+        victims = []
+        for account_number, account in self._hot.items():
+            if excess <= 0 or account_number == newest:
+                break
+            if account_number not in self._pins:
+                victims.append(account)
+                excess -= self._sizes[account_number]
+        for account in victims:
+            if not account.lock.acquire(blocking=False):
+                continue  # in use outside a checkout; try again on a later eviction
+            try:
+                self._write_back(account)
+                self._drop(account.account_number)
+                # A stale reference must not move the totals or the index
+                account.statistics = account.search_index = None
+                self.evictions += 1
+            finally:
+                account.lock.release()
+        if len(self._queued) >= self.WRITE_BATCH:
+            self.flush()
+
+    def _write_back(self, account: BankAccount) -> None:
+        account_number = account.account_number
+        self.headers.store(account)
+        details = (len(account.transactions),
+                   json.dumps([card.to_dict() for card in account.cards], separators=(',', ':')),
+                   json.dumps([loan.to_dict() for loan in account.loans], separators=(',', ':')))
+        if details == self._clean.get(account_number):
+            return  # history, cards and loans unchanged since hydration
+        self._queued[account_number] = (account_number, account.transactions.to_bytes()) + details[1:]
+        self.write_backs += 1
+
+    def _drop(self, account_number: str) -> None:
+        self._hot.pop(account_number)
+        self._hot_bytes -= self._sizes.pop(account_number)
+        self._clean.pop(account_number, None)
+
+
+class TieredBankingDataService(BankingDataService):
+    """Banking service whose accounts live in a TieredAccounts table
+
+    Transfers pin the accounts they touch, summaries and searches read the
+    resident headers, and statistics are verified against the headers
+    instead of hydrating every account.
+    """
+
+    def __init__(self, path: Optional[str] = None, budget_bytes: int = 64 * 1024 * 1024):
+        self._path = path
+        self._budget_bytes = budget_bytes
+        super().__init__()
+
+    def _create_accounts(self) -> TieredAccounts:
+        return TieredAccounts(self.statistics, self._path, self._budget_bytes, self.index)
+
+    def add_accounts(self, accounts: Iterable[BankAccount]) -> int:
+        count = super().add_accounts(accounts)
+        self.accounts.flush()
+        return count
+
+    @contextmanager
+    def checkout(self, *account_numbers: str) -> Iterator[List[Optional[BankAccount]]]:
+        with self.accounts.pinned(account_numbers):
+            with super().checkout(*account_numbers) as accounts:
+                yield accounts
+
+    def account_summary(self, account_number: str) -> Optional[Dict]:
+        return self.accounts.summary(account_number)
+
+    def _recount_statistics(self) -> Tuple[Dict, Dict]:
+        expected, actual = self.accounts.recount()
+        return expected.snapshot(), actual
+
+    def get_cache_statistics(self) -> Dict:
+        """Hit rate and hydration latency of the hot account tier"""
+        return self.accounts.cache_statistics()
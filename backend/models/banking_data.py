@@ -3,34 +3,202 @@ Banking Data Models and Services
 Contains customer accounts, transactions, and banking operations
 """
 
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+import math
+import os
 import random
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Sequence, Tuple, Union
 import json
 
+import numpy as np
+
+try:
+    from .account_index import AccountIndex
+    from .account_records import ACCOUNT_STATUSES, ACCOUNT_TYPES, BRANCH_IFSC, BRANCHES, NO_LOANS, Card, Loan
+    from .ledger import REF_PREFIX, TXN_PREFIX, TransactionLedger
+except ImportError:
+    from account_index import AccountIndex
+    from account_records import ACCOUNT_STATUSES, ACCOUNT_TYPES, BRANCH_IFSC, BRANCHES, NO_LOANS, Card, Loan
+    from ledger import REF_PREFIX, TXN_PREFIX, TransactionLedger
+
+class BankStatistics:
+    """Bank-wide aggregates, kept current as accounts change
+
+    Registered accounts report their own balance, status, account type,
+    card and transaction changes, so reading the totals never touches the
+    accounts. The lock only covers the counters: postings on unrelated
+    accounts run in parallel and all report here.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total_accounts = 0
+        self.total_balance = 0.0
+        self.total_transactions = 0
+        self.total_cards = 0
+        self.active_accounts = 0
+        self.account_types: Dict[str, int] = {}
+
+    @classmethod
+    def from_accounts(cls, accounts) -> "BankStatistics":
+        """Recompute every aggregate from scratch"""
+        statistics = cls()
+        for account in accounts:
+            statistics._count(account, 1)
+        return statistics
+
+    def register(self, account: "BankAccount") -> None:
+        with self.lock:
+            self._count(account, 1)
+
+    def unregister(self, account: "BankAccount") -> None:
+        with self.lock:
+            self._count(account, -1)
+
+    def _count(self, account: "BankAccount", sign: int) -> None:
+        self.total_accounts += sign
+        self.total_balance += sign * account.balance
+        self.total_transactions += sign * len(account.transactions)
+        self.total_cards += sign * len(account.cards)
+        self.active_accounts += sign * (account.status == "Active")
+        self._count_type(account.account_type, sign)
+
+    def _count_type(self, account_type: str, sign: int) -> None:
+        count = self.account_types.get(account_type, 0) + sign
+        if count:
+            self.account_types[account_type] = count
+        else:
+            self.account_types.pop(account_type, None)
+
+    def balance_changed(self, delta: float) -> None:
+        with self.lock:
+            self.total_balance += delta
+
+    def transactions_posted(self, count: int) -> None:
+        with self.lock:
+            self.total_transactions += count
+
+    def cards_added(self, count: int) -> None:
+        with self.lock:
+            self.total_cards += count
+
+    def status_changed(self, old: str, new: str) -> None:
+        with self.lock:
+            self.active_accounts += (new == "Active") - (old == "Active")
+
+    def type_changed(self, old: str, new: str) -> None:
+        with self.lock:
+            self._count_type(old, -1)
+            self._count_type(new, 1)
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "total_accounts": self.total_accounts,
+                "total_balance": self.total_balance,
+                "average_balance": self.total_balance / self.total_accounts if self.total_accounts > 0 else 0,
+                "total_transactions": self.total_transactions,
+                "account_types": dict(self.account_types),
+                "active_accounts": self.active_accounts,
+                "total_cards": self.total_cards
+            }
+
 class BankAccount:
-    """Bank account model with comprehensive banking data"""
+    """Bank account model with comprehensive banking data
+
+    Slotted, with status, type and branch held as codes into the shared
+    tables in account_records; email and IFSC are derived on access and
+    cards and loans are slotted records that still read like dicts.
+    """
+
+    __slots__ = ('statistics', 'search_index', 'account_number', '_customer_name', '_account_type', '_balance',
+                 'created_date', '_status', 'phone', '_branch', 'transactions', 'cards', 'loans', 'lock')
     
-    def __init__(self, account_number: str, customer_name: str, account_type: str = "Savings"):
+    def __init__(self, account_number: str, customer_name: str, account_type: str = "Savings",
+                 sample_data: bool = True):
+        self.statistics: Optional[BankStatistics] = None  # set when a service registers the account
+        self.search_index: Optional[AccountIndex] = None  # likewise
         self.account_number = account_number
         self.customer_name = customer_name
-        self.account_type = account_type  # Savings, Current, Fixed Deposit
-        self.balance = random.randint(10000, 500000)
+        self._account_type = ACCOUNT_TYPES.code(account_type)  # Savings, Current, Fixed Deposit
+        self._balance = random.randint(10000, 500000)
         self.created_date = datetime.now() - timedelta(days=random.randint(30, 1825))
-        self.status = "Active"
-        self.phone = f"{random.randint(6000000000, 9999999999)}"
-        self.email = customer_name.lower().replace(" ", "") + "@example.com"
-        self.branch_code = "SB001"
-        self.ifsc_code = "SBIN0000123"
-        self.transactions = []
-        self.cards = []
-        self.loans = []
-        
-        # Generate sample transactions
-        self._generate_sample_transactions()
+        self._status = ACCOUNT_STATUSES.code("Active")
+        self.phone = str(random.randint(6000000000, 9999999999))
+        self._branch = BRANCHES.code("SB001")
+        self.transactions = TransactionLedger()
+        self.cards: List[Card] = []
+        self.loans: Sequence[Loan] = NO_LOANS
+        self.lock = threading.Lock()  # guards balance and transactions during postings
         
-        # Generate sample cards
-        self._generate_sample_cards()
+        # Generated populations fill in history and cards themselves
+        if sample_data:
+            # Generate sample transactions
+            self._generate_sample_transactions()
+            
+            # Generate sample cards
+            self._generate_sample_cards()
+
+    # Balance, status and type changes are reported to the bank-wide statistics
+    @property
+    def balance(self) -> float:
+        return self._balance
+
+    @balance.setter
+    def balance(self, value: float) -> None:
+        delta = value - self._balance
+        self._balance = value
+        if self.statistics is not None:
+            self.statistics.balance_changed(delta)
+
+    @property
+    def status(self) -> str:
+        return ACCOUNT_STATUSES.values[self._status]
+
+    @status.setter
+    def status(self, value: str) -> None:
+        old, self._status = self.status, ACCOUNT_STATUSES.code(value)
+        if self.statistics is not None:
+            self.statistics.status_changed(old, value)
+
+    @property
+    def account_type(self) -> str:
+        return ACCOUNT_TYPES.values[self._account_type]
+
+    @account_type.setter
+    def account_type(self, value: str) -> None:
+        old, self._account_type = self.account_type, ACCOUNT_TYPES.code(value)
+        if self.statistics is not None:
+            self.statistics.type_changed(old, value)
+
+    # Renames re-index the account (its email derives from the name too)
+    @property
+    def customer_name(self) -> str:
+        return self._customer_name
+
+    @customer_name.setter
+    def customer_name(self, value: str) -> None:
+        self._customer_name = value
+        if self.search_index is not None:
+            self.search_index.add(self.account_number, value, self.email)
+
+    @property
+    def email(self) -> str:
+        return self.customer_name.lower().replace(" ", "") + "@example.com"
+
+    @property
+    def branch_code(self) -> str:
+        return BRANCHES.values[self._branch]
+
+    @branch_code.setter
+    def branch_code(self, value: str) -> None:
+        self._branch = BRANCHES.code(value)
+
+    @property
+    def ifsc_code(self) -> str:
+        return BRANCH_IFSC[self._branch]
 
     def _generate_sample_transactions(self):
         """Generate sample transaction history"""
@@ -46,6 +214,7 @@ class BankAccount:
         
         # Generate 20-30 transactions over last 6 months
         num_transactions = random.randint(20, 30)
+        postings = []
         
         for i in range(num_transactions):
             transaction_type = random.choice(transaction_types)
@@ -54,21 +223,20 @@ class BankAccount:
             # Random date in last 6 months
             days_ago = random.randint(1, 180)
             transaction_date = datetime.now() - timedelta(days=days_ago)
-            
-            transaction = {
-                "transaction_id": f"TXN{random.randint(1000000000, 9999999999)}",
-                "date": transaction_date.isoformat(),
-                "type": transaction_type["type"],
-                "description": transaction_type["description"],
-                "amount": amount,
-                "balance_after": self.balance,  # Simplified balance calculation
-                "reference": f"REF{random.randint(100000, 999999)}"
-            }
-            
-            self.transactions.append(transaction)
+            postings.append((transaction_date, transaction_type, amount))
         
-        # Sort transactions by date (newest first)
-        self.transactions.sort(key=lambda x: x["date"], reverse=True)
+        # The ledger is append-only, so post oldest first
+        postings.sort(key=lambda posting: posting[0])
+        for transaction_date, transaction_type, amount in postings:
+            self.transactions.append(
+                transaction_date,
+                transaction_type["type"],
+                transaction_type["description"],
+                amount,
+                self.balance,  # Simplified balance calculation
+                random.randint(1000000000, 9999999999),
+                random.randint(100000, 999999)
+            )
 
     def _generate_sample_cards(self):
         """Generate sample card information"""
@@ -78,23 +246,74 @@ class BankAccount:
             if card_type == "Credit Card" and random.random() < 0.3:
                 continue  # Not all accounts have credit cards
             
-            card_number = f"****-****-****-{random.randint(1000, 9999)}"
-            
-            card = {
-                "card_type": card_type,
-                "card_number": card_number,
-                "card_status": "Active",
-                "expiry_date": (datetime.now() + timedelta(days=random.randint(365, 1825))).strftime("%m/%y"),
-                "daily_limit": 50000 if card_type == "Debit Card" else random.randint(100000, 500000),
-                "monthly_limit": 500000 if card_type == "Debit Card" else random.randint(1000000, 5000000),
-                "issued_date": (datetime.now() - timedelta(days=random.randint(30, 1095))).isoformat()
-            }
+            card = Card(
+                card_type,
+                random.randint(1000, 9999),
+                (datetime.now() + timedelta(days=random.randint(365, 1825))).strftime("%m/%y"),
+                50000 if card_type == "Debit Card" else random.randint(100000, 500000),
+                500000 if card_type == "Debit Card" else random.randint(1000000, 5000000),
+                datetime.now() - timedelta(days=random.randint(30, 1095))
+            )
             
-            self.cards.append(card)
+            self.add_card(card)
+
+    def add_card(self, card: Union[Card, Dict]) -> None:
+        """Issue a card to this account (a card dict is converted to a Card)"""
+        self.cards.append(card if isinstance(card, Card) else Card.from_dict(card))
+        if self.statistics is not None:
+            self.statistics.cards_added(1)
+
+    def add_loan(self, loan: Union[Loan, Dict]) -> None:
+        """Record a loan against this account (a loan dict is converted to a Loan)"""
+        if self.loans is NO_LOANS:
+            self.loans = []
+        self.loans.append(loan if isinstance(loan, Loan) else Loan.from_dict(loan))
 
     def get_recent_transactions(self, limit: int = 10) -> List[Dict]:
         """Get recent transactions"""
-        return self.transactions[:limit]
+        with self.lock:
+            return self.transactions.recent(limit)
+
+    def query_transactions(self, start: Any = None, end: Any = None, transaction_type: Optional[str] = None,
+                           description: Optional[str] = None, min_amount: Optional[float] = None,
+                           max_amount: Optional[float] = None, limit: int = 50) -> Dict:
+        """Transactions in [start, end) matching the filters, with count and total
+
+        Dates may be datetimes or ISO strings ('2025-03' means 1 March).
+        ``description`` matches case-insensitively anywhere in the text, so
+        "atm" finds "ATM Withdrawal".
+        """
+        with self.lock:
+            selection = self.transactions.select(
+                start=start,
+                end=end,
+                transaction_type=transaction_type,
+                description_contains=description,
+                min_amount=min_amount,
+                max_amount=max_amount
+            )
+            return {
+                "account_number": self.account_number,
+                "count": selection.count(),
+                "total_amount": selection.total(),
+                "transactions": selection.records(limit)
+            }
+
+    def get_spending_summary(self, start: Any = None, end: Any = None, group_by: str = "month") -> Dict:
+        """Debits in [start, end) grouped by 'month' or 'category'"""
+        if group_by not in ("month", "category"):
+            raise ValueError("group_by must be 'month' or 'category'")
+        with self.lock:
+            selection = self.transactions.select(start=start, end=end, transaction_type="debit")
+            groups = selection.by_month() if group_by == "month" else selection.by_description()
+            total_spent, transaction_count = selection.total(), selection.count()
+        return {
+            "account_number": self.account_number,
+            "total_spent": total_spent,
+            "transaction_count": transaction_count,
+            "group_by": group_by,
+            "groups": groups
+        }
 
     def get_account_summary(self) -> Dict:
         """Get comprehensive account summary"""
@@ -115,19 +334,25 @@ class BankAccount:
         }
 
     def add_transaction(self, transaction_type: str, amount: float, description: str) -> Dict:
-        """Add a new transaction"""
-        transaction = {
-            "transaction_id": f"TXN{random.randint(1000000000, 9999999999)}",
-            "date": datetime.now().isoformat(),
+        """Add a new transaction (callers posting concurrently must hold ``lock``)"""
+        # Never before the latest posting (clock stepped back, seeded future dates),
+        # so the ledger's time-order check cannot fail after a balance has moved
+        transaction_date = max(datetime.now(), self.transactions.last_date or datetime.min)
+        transaction_id = random.randint(1000000000, 9999999999)
+        reference = random.randint(100000, 999999)
+        self.transactions.append(transaction_date, transaction_type, description, amount,
+                                 self.balance, transaction_id, reference)
+        if self.statistics is not None:
+            self.statistics.transactions_posted(1)
+        return {
+            "transaction_id": f"{TXN_PREFIX}{transaction_id}",
+            "date": transaction_date.isoformat(),
             "type": transaction_type,
             "description": description,
             "amount": amount,
             "balance_after": self.balance,
-            "reference": f"REF{random.randint(100000, 999999)}"
+            "reference": f"{REF_PREFIX}{reference}"
         }
-        
-        self.transactions.insert(0, transaction)  # Add to beginning (most recent)
-        return transaction
 
 class LoanProduct:
     """Loan product information and eligibility"""
@@ -262,12 +487,18 @@ class BankingDataService:
     """Main banking data service"""
     
     def __init__(self):
-        self.accounts: Dict[str, BankAccount] = {}
+        self.statistics = BankStatistics()  # dashboard totals; kept in step by the accounts
+        self.index = AccountIndex()  # search index; kept in step by add_account and renames
+        self.accounts: Dict[str, BankAccount] = self._create_accounts()
         self.loan_service = LoanProduct()
         
         # Initialize sample accounts
         self._initialize_sample_accounts()
 
+    def _create_accounts(self) -> Dict[str, BankAccount]:
+        """Account table keyed by account number; every account stays resident"""
+        return {}
+
     def _initialize_sample_accounts(self):
         """Initialize with sample banking data"""
         sample_customers = [
@@ -287,54 +518,76 @@ class BankingDataService:
                 customer["name"],
                 customer["type"]
             )
-            self.accounts[customer["account"]] = account
+            self.add_account(account)
             
             print(f"✅ Created account: {customer['name']} - {customer['account']} ({customer['type']})")
 
+    def add_account(self, account: BankAccount) -> None:
+        """Register an account, index it for search and count it in the statistics"""
+        self._register(account)
+        self.index.add(account.account_number, account.customer_name, account.email)
+
+    def add_accounts(self, accounts: Iterable[BankAccount]) -> int:
+        """Register many accounts, sorting the search index keys once; returns how many"""
+        accounts = list(accounts)
+        for account in accounts:
+            self._register(account)
+        self.index.extend((account.account_number, account.customer_name, account.email) for account in accounts)
+        return len(accounts)
+
+    def _register(self, account: BankAccount) -> None:
+        replaced = self.accounts.get(account.account_number)
+        if replaced is not None:
+            self.statistics.unregister(replaced)
+            replaced.statistics = replaced.search_index = None
+        self.accounts[account.account_number] = account
+        self.statistics.register(account)
+        account.statistics = self.statistics
+        account.search_index = self.index
+
     def get_account(self, account_number: str) -> Optional[BankAccount]:
         """Get account by account number"""
         return self.accounts.get(account_number)
 
     def get_account_by_customer_name(self, customer_name: str) -> Optional[BankAccount]:
         """Get account by customer name"""
-        for account in self.accounts.values():
-            if account.customer_name.lower() == customer_name.lower():
-                return account
-        return None
+        numbers = self.index.by_name(customer_name)
+        return self.accounts.get(numbers[0]) if numbers else None
 
     def transfer_money(self, from_account: str, to_account: str, amount: float, description: str = "") -> Dict:
         """Transfer money between accounts"""
-        from_acc = self.get_account(from_account)
-        to_acc = self.get_account(to_account)
-        
-        if not from_acc:
-            return {"success": False, "message": "Source account not found"}
-        
-        if not to_acc:
-            return {"success": False, "message": "Destination account not found"}
-        
-        if from_acc.balance < amount:
-            return {"success": False, "message": "Insufficient balance"}
-        
-        if amount <= 0:
-            return {"success": False, "message": "Invalid amount"}
-        
-        # Process transfer
-        from_acc.balance -= amount
-        to_acc.balance += amount
-        
-        # Add transactions
-        debit_txn = from_acc.add_transaction(
-            "debit",
-            amount,
-            f"Transfer to {to_acc.customer_name} - {description}".strip()
-        )
-        
-        credit_txn = to_acc.add_transaction(
-            "credit",
-            amount,
-            f"Transfer from {from_acc.customer_name} - {description}".strip()
-        )
+        # Check and post while holding both accounts, so a concurrent
+        # transfer can neither overdraw the source nor lose an update
+        with self.checkout(from_account, to_account) as (from_acc, to_acc):
+            if not from_acc:
+                return {"success": False, "message": "Source account not found"}
+            
+            if not to_acc:
+                return {"success": False, "message": "Destination account not found"}
+            
+            if amount <= 0:
+                return {"success": False, "message": "Invalid amount"}
+            
+            if from_acc.balance < amount:
+                return {"success": False, "message": "Insufficient balance"}
+            
+            # Process transfer
+            from_acc.balance -= amount
+            to_acc.balance += amount
+            
+            # Add transactions
+            debit_txn = from_acc.add_transaction(
+                "debit",
+                amount,
+                f"Transfer to {to_acc.customer_name} - {description}".strip()
+            )
+            
+            to_acc.add_transaction(
+                "credit",
+                amount,
+                f"Transfer from {from_acc.customer_name} - {description}".strip()
+            )
+            new_balance = from_acc.balance
         
         return {
             "success": True,
@@ -343,49 +596,229 @@ class BankingDataService:
             "from_account": from_account,
             "to_account": to_account,
             "amount": amount,
-            "new_balance": from_acc.balance,
+            "new_balance": new_balance,
             "timestamp": datetime.now().isoformat()
         }
 
+    # Reasons a batch leg is rejected, in the order transfer_money checks them
+    BATCH_LEG_ERRORS = {
+        1: "Source account not found",
+        2: "Destination account not found",
+        3: "Invalid amount",
+        4: "Insufficient balance",
+    }
+
+    def transfer_batch(self, from_accounts: Sequence[str], to_accounts: Sequence[str],
+                       amounts: Sequence[float], description: str = "") -> Dict:
+        """Post many transfers at once, all or nothing
+
+        Legs are given as three parallel sequences. Every leg is validated
+        before anything is applied: accounts must exist, amounts must be
+        positive, and each source's balance must cover the sum of all its
+        debits in the batch (credits arriving in the same batch don't
+        count). If any leg fails, no balance or ledger changes and the
+        result lists why each failing leg was rejected. Otherwise every
+        involved account is locked, balances move by their net amount and
+        each ledger receives its postings in one bulk write.
+        """
+        legs = len(amounts)
+        if len(from_accounts) != legs or len(to_accounts) != legs:
+            raise ValueError("from_accounts, to_accounts and amounts must have the same length")
+        if not legs:
+            return {"success": True, "message": "Empty batch", "legs": 0, "total_amount": 0, "results": []}
+
+        amounts = np.asarray(amounts, dtype=np.float64)
+        numbers, inverse = np.unique(
+            np.concatenate([np.asarray(from_accounts, dtype=str), np.asarray(to_accounts, dtype=str)]),
+            return_inverse=True
+        )
+        sources, targets = inverse[:legs], inverse[legs:]
+
+        with self.checkout(*numbers.tolist()) as accounts:
+            known = np.array([account is not None for account in accounts])
+            errors = np.zeros(legs, dtype=np.int8)
+            for code, failed in ((1, ~known[sources]), (2, ~known[targets]),
+                                 (3, ~(amounts > 0) | ~np.isfinite(amounts))):
+                errors[(errors == 0) & failed] = code
+
+            balances = np.array([account.balance if account is not None else 0 for account in accounts],
+                                dtype=np.float64)
+            valid = errors == 0
+            debits = np.bincount(sources[valid], weights=amounts[valid], minlength=len(numbers))
+            errors[valid & (debits > balances)[sources]] = 4
+
+            if errors.any():
+                failed = np.flatnonzero(errors)
+                return {
+                    "success": False,
+                    "message": f"{len(failed)} of {legs} transfers failed validation; nothing was posted",
+                    "legs": legs,
+                    "total_amount": 0,
+                    "results": [
+                        {"leg": leg, "success": False,
+                         "message": self.BATCH_LEG_ERRORS.get(code, "Not posted: batch rejected")}
+                        for leg, code in enumerate(errors.tolist())
+                    ]
+                }
+
+            transaction_ids = self._post_batch(accounts, balances, sources, targets, amounts, description)
+
+        return {
+            "success": True,
+            "message": "Batch posted successfully",
+            "legs": legs,
+            "total_amount": float(amounts.sum()),
+            "timestamp": datetime.now().isoformat(),
+            "results": [
+                {"leg": leg, "success": True, "transaction_id": f"{TXN_PREFIX}{transaction_id}"}
+                for leg, transaction_id in enumerate(transaction_ids.tolist())
+            ]
+        }
+
+    @staticmethod
+    def _post_batch(accounts: List[BankAccount], balances: np.ndarray, sources: np.ndarray,
+                    targets: np.ndarray, amounts: np.ndarray, description: str) -> np.ndarray:
+        """Apply validated legs (caller holds every account lock); returns each leg's debit id"""
+        legs = len(amounts)
+        # Two postings per leg, debit then credit, kept in leg order
+        owner = np.empty(2 * legs, dtype=np.int64)
+        owner[0::2], owner[1::2] = sources, targets
+        counterparty = np.empty_like(owner)
+        counterparty[0::2], counterparty[1::2] = targets, sources
+        signed = np.empty(2 * legs, dtype=np.float64)
+        signed[0::2], signed[1::2] = -amounts, amounts
+        side = np.tile(np.array([0, 1], dtype=np.int64), legs)  # 0 debit, 1 credit
+        transaction_ids = np.random.randint(1000000000, 9999999999, size=2 * legs, dtype=np.int64)
+        references = np.random.randint(100000, 999999, size=2 * legs, dtype=np.int32)
+
+        # Group postings by account; a stable sort keeps each account's leg order
+        order = np.argsort(owner, kind='stable')
+        owner, counterparty, signed, side = owner[order], counterparty[order], signed[order], side[order]
+        starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+        ends = np.r_[starts[1:], len(owner)]
+
+        # Running balance per account: global running sum minus the sum before the account's first posting
+        running = np.cumsum(signed)
+        before = np.r_[0.0, running][starts]
+        balance_after = balances[owner] + running - np.repeat(before, ends - starts)
+
+        # One description per (counterparty, direction), built once
+        keys, key_index = np.unique(counterparty * 2 + side, return_inverse=True)
+        labels = [
+            f"Transfer {'from' if key % 2 else 'to'} {accounts[key // 2].customer_name} - {description}".strip()
+            for key in keys.tolist()
+        ]
+
+        posted_at = datetime.now()
+        net = np.bincount(owner, weights=signed, minlength=len(accounts))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            account = accounts[owner[start]]
+            rows = order[start:end]
+            account.transactions.extend(
+                max(posted_at, account.transactions.last_date or posted_at),
+                ("debit", "credit"), side[start:end],
+                labels, key_index[start:end],
+                np.abs(signed[start:end]), balance_after[start:end],
+                transaction_ids[rows], references[rows]
+            )
+            if account.statistics is not None:
+                account.statistics.transactions_posted(end - start)
+            account.balance += net[owner[start]].item()
+        return transaction_ids[0::2]
+
+    @contextmanager
+    def checkout(self, *account_numbers: str) -> Iterator[List[Optional[BankAccount]]]:
+        """Fetch accounts and hold their locks; yields them in order, None where unknown"""
+        accounts = [self.get_account(number) for number in account_numbers]
+        with self.lock_accounts(*(account for account in accounts if account is not None)):
+            yield accounts
+
+    @staticmethod
+    @contextmanager
+    def lock_accounts(*accounts: BankAccount) -> Iterator[None]:
+        """Hold the locks of all given accounts
+
+        Locks are always taken in account-number order, so two transfers
+        between the same pair (in either direction) cannot deadlock, and
+        unrelated transfers never wait on each other.
+        """
+        ordered = sorted({account.account_number: account for account in accounts}.items())
+        acquired = []
+        try:
+            for _, account in ordered:
+                account.lock.acquire()
+                acquired.append(account.lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
     def get_all_accounts_summary(self) -> List[Dict]:
         """Get summary of all accounts (for admin)"""
-        return [account.get_account_summary() for account in self.accounts.values()]
+        return [self.account_summary(number) for number in list(self.accounts)]
 
-    def search_accounts(self, query: str) -> List[Dict]:
-        """Search accounts by name or account number"""
-        query = query.lower()
-        results = []
-        
-        for account in self.accounts.values():
-            if (query in account.customer_name.lower() or 
-                query in account.account_number or
-                query in account.email.lower()):
-                results.append(account.get_account_summary())
-        
-        return results
+    def account_summary(self, account_number: str) -> Optional[Dict]:
+        """Summary dict of one account, as get_account_summary returns it"""
+        account = self.get_account(account_number)
+        return account.get_account_summary() if account else None
+
+    def search_accounts(self, query: str, limit: Optional[int] = 50) -> List[Dict]:
+        """Search accounts by name, account number or email, best match first
+
+        Exact matches rank first, then prefixes, name-word prefixes,
+        account-number suffixes and other substrings.
+        """
+        return [self.account_summary(number) for number in self.index.search(query, limit) if number in self.accounts]
+
+    def _recount_statistics(self) -> Tuple[Dict, Dict]:
+        """Snapshots recounted from the accounts and of the running totals, taken together"""
+        with self.lock_accounts(*self.accounts.values()):
+            return BankStatistics.from_accounts(self.accounts.values()).snapshot(), self.statistics.snapshot()
 
     def get_banking_statistics(self) -> Dict:
         """Get banking statistics for admin dashboard"""
-        total_accounts = len(self.accounts)
-        total_balance = sum(acc.balance for acc in self.accounts.values())
-        total_transactions = sum(len(acc.transactions) for acc in self.accounts.values())
-        
-        account_types = {}
-        for account in self.accounts.values():
-            account_types[account.account_type] = account_types.get(account.account_type, 0) + 1
-        
-        return {
-            "total_accounts": total_accounts,
-            "total_balance": total_balance,
-            "average_balance": total_balance / total_accounts if total_accounts > 0 else 0,
-            "total_transactions": total_transactions,
-            "account_types": account_types,
-            "active_accounts": len([acc for acc in self.accounts.values() if acc.status == "Active"]),
-            "total_cards": sum(len(acc.cards) for acc in self.accounts.values())
-        }
+        return self.statistics.snapshot()
+
+    def verify_statistics(self) -> Dict:
+        """Recompute the statistics from every account and compare with the running totals
+
+        Returns the fields that disagree as {field: {"expected", "actual"}};
+        empty when consistent. Balances are compared with a relative
+        tolerance since the running total sums in a different order.
+        """
+        expected, actual = self._recount_statistics()
+        mismatches = {}
+        for field, value in expected.items():
+            if isinstance(value, float):
+                consistent = math.isclose(value, actual[field], rel_tol=1e-9, abs_tol=1e-6)
+            else:
+                consistent = value == actual[field]
+            if not consistent:
+                mismatches[field] = {"expected": value, "actual": actual[field]}
+        return mismatches
+
+# Global banking service instance; SECUREBANK_ACCOUNT_STORE=tiered keeps only
+# account headers resident and hydrates histories from a spill file on demand
+if os.environ.get('SECUREBANK_ACCOUNT_STORE', 'memory') == 'tiered':
+    try:
+        from .account_store import TieredBankingDataService
+    except ImportError:
+        from account_store import TieredBankingDataService
+    banking_service = TieredBankingDataService(
+        os.environ.get('SECUREBANK_ACCOUNT_DB_PATH') or None,
+        budget_bytes=int(os.environ.get('SECUREBANK_ACCOUNT_CACHE_MB', 64)) * 1024 * 1024
+    )
+else:
+    banking_service = BankingDataService()
 
-# Global banking service instance
-banking_service = BankingDataService()
+# SECUREBANK_SYNTHETIC_ACCOUNTS=N adds N generated accounts for capacity testing
+if os.environ.get('SECUREBANK_SYNTHETIC_ACCOUNTS'):
+    try:
+        from .population import populate
+    except ImportError:
+        from population import populate
+    populate(banking_service, int(os.environ['SECUREBANK_SYNTHETIC_ACCOUNTS']),
+             seed=int(os.environ.get('SECUREBANK_SYNTHETIC_SEED', 0)))
 
 def get_banking_service() -> BankingDataService:
     """Get the global banking service instance"""
@@ -0,0 +1,394 @@
+"""
+Columnar Transaction Ledger
+Append-only per-account transaction history stored as growable NumPy
+columns instead of a list of dicts
+"""
+
+import json
+import struct
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+TXN_PREFIX = "TXN"
+REF_PREFIX = "REF"
+
+
+class InternTable:
+    """Maps repeated strings to small integer codes and back"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class TransactionLedger:
+    """Transaction history of one account, oldest first in memory
+
+    Each posting is one row across fixed-width columns: date (datetime64[us]),
+    amount and balance_after (float64), a type code, a description code into
+    an intern table and the numeric parts of the transaction id and
+    reference. A posting costs 41 bytes instead of a dict of seven strings.
+    ``append`` only queues a tuple; queued rows are copied into the columns
+    in one vectorized step per column when a read needs them or the queue
+    fills. Columns double in capacity when full, so posting is O(1)
+    amortized.
+
+    Postings must arrive in time order; that keeps ``dates`` sorted for
+    range lookups. Index 0, iteration and slicing are newest first, as the
+    old list was, and ``newest_first`` gives reversed column views without
+    copying.
+    """
+
+    COLUMNS = {
+        'date': 'datetime64[us]',
+        'amount': np.float64,
+        'type': np.int8,
+        'balance_after': np.float64,
+        'description': np.int32,
+        'transaction_id': np.int64,
+        'reference': np.int32,
+    }
+
+    FLUSH_ROWS = 256
+
+    def __init__(self, capacity: int = 32):
+        self._size = 0
+        self._pending: List[tuple] = []
+        self._last_date: Optional[datetime] = None
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self.types = InternTable()
+        self.descriptions = InternTable()
+
+    # Writing
+    def append(self, date: datetime, transaction_type: str, description: str, amount: float,
+               balance_after: float, transaction_id: int, reference: int) -> int:
+        """Post one transaction; returns its row (0 is the oldest)"""
+        if self._last_date is not None and date < self._last_date:
+            raise ValueError("Ledger postings must be appended in time order")
+        self._last_date = date
+        self._pending.append((date, amount, self.types.code(transaction_type), balance_after,
+                              self.descriptions.code(description), transaction_id, reference))
+        if len(self._pending) >= self.FLUSH_ROWS:
+            self._flush()
+        return self._size + len(self._pending) - 1
+
+    def extend(self, date: Union[datetime, np.ndarray], types: Sequence[str], type_index: np.ndarray,
+               descriptions: Sequence[str], description_index: np.ndarray, amounts: np.ndarray,
+               balance_after: np.ndarray, transaction_ids: np.ndarray, references: np.ndarray) -> int:
+        """Post many transactions at once; returns the first row
+
+        ``date`` is either one timestamp shared by every row or an ascending
+        datetime64 array with one per row. Types and descriptions are given
+        as label lists plus a per-row index into them; only the labels
+        actually used are interned.
+        """
+        first = last = date
+        if isinstance(date, np.ndarray):
+            if not len(date):
+                return self._size + len(self._pending)
+            date = date.astype('datetime64[us]', copy=False)
+            first, last = date[0].item(), date[-1].item()
+        if self._last_date is not None and first < self._last_date:
+            raise ValueError("Ledger postings must be appended in time order")
+        self._flush()
+        self._last_date = last
+        start, count = self._size, len(amounts)
+        if start + count > len(self._columns['date']):
+            self._grow(start + count)
+        rows = slice(start, start + count)
+        columns = self._columns
+        columns['date'][rows] = date if isinstance(date, np.ndarray) else np.datetime64(date, 'us')
+        columns['amount'][rows] = amounts
+        columns['type'][rows] = _intern_index(self.types, types, type_index)
+        columns['balance_after'][rows] = balance_after
+        columns['description'][rows] = _intern_index(self.descriptions, descriptions, description_index)
+        columns['transaction_id'][rows] = transaction_ids
+        columns['reference'][rows] = references
+        self._size += count
+        return start
+
+    def _flush(self) -> None:
+        """Copy queued postings into the columns"""
+        if not self._pending:
+            return
+        start, count = self._size, len(self._pending)
+        if start + count > len(self._columns['date']):
+            self._grow(start + count)
+        for column, values in zip(self._columns.values(), zip(*self._pending)):
+            column[start:start + count] = np.array(values, dtype=column.dtype)
+        self._size += count
+        self._pending = []
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(2 * len(self._columns['date']), needed, 32)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    # Serialization
+    def to_bytes(self) -> bytes:
+        """Pack the postings into one blob: a JSON header, then each column's raw bytes"""
+        self._flush()
+        header = json.dumps({
+            "size": self._size,
+            "types": self.types.values,
+            "descriptions": self.descriptions.values,
+            "last_date": self._last_date.isoformat() if self._last_date else None,
+        }, separators=(',', ':')).encode('utf-8')
+        return b''.join([struct.pack('<I', len(header)), header] +
+                        [column[:self._size].tobytes() for column in self._columns.values()])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TransactionLedger":
+        """Rebuild a ledger packed by ``to_bytes``"""
+        (length,) = struct.unpack_from('<I', data)
+        header = json.loads(data[4:4 + length])
+        size = header["size"]
+        ledger = cls(capacity=max(size, 1))
+        offset = 4 + length
+        for name, column in ledger._columns.items():
+            column[:size] = np.frombuffer(data, dtype=column.dtype, count=size, offset=offset)
+            offset += size * column.itemsize
+        for value in header["types"]:
+            ledger.types.code(value)
+        for value in header["descriptions"]:
+            ledger.descriptions.code(value)
+        ledger._size = size
+        ledger._last_date = datetime.fromisoformat(header["last_date"]) if header["last_date"] else None
+        return ledger
+
+    # Column access
+    def column(self, name: str) -> np.ndarray:
+        """Oldest-first view of a column (no copy; stale after later appends)"""
+        self._flush()
+        return self._columns[name][:self._size]
+
+    def newest_first(self, name: str) -> np.ndarray:
+        """Newest-first view of a column (no copy)"""
+        return self.column(name)[::-1]
+
+    @property
+    def last_date(self) -> Optional[datetime]:
+        """Date of the newest posting; later postings may not be older"""
+        return self._last_date
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self.column('date')
+
+    @property
+    def amounts(self) -> np.ndarray:
+        return self.column('amount')
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the columns, including spare capacity"""
+        self._flush()
+        return sum(column.nbytes for column in self._columns.values())
+
+    # Records
+    def record(self, row: int) -> Dict:
+        """The transaction at ``row`` (oldest-first numbering) as the familiar dict"""
+        if row >= self._size:
+            self._flush()
+        columns = self._columns
+        return {
+            "transaction_id": f"{TXN_PREFIX}{int(columns['transaction_id'][row])}",
+            "date": columns['date'][row].item().isoformat(),
+            "type": self.types.values[columns['type'][row]],
+            "description": self.descriptions.values[columns['description'][row]],
+            "amount": float(columns['amount'][row]),
+            "balance_after": float(columns['balance_after'][row]),
+            "reference": f"{REF_PREFIX}{int(columns['reference'][row])}",
+        }
+
+    def recent(self, limit: int = 10) -> List[Dict]:
+        """Up to ``limit`` transactions, newest first"""
+        self._flush()
+        stop = self._size - min(max(limit, 0), self._size)
+        return [self.record(row) for row in range(self._size - 1, stop - 1, -1)]
+
+    def __len__(self) -> int:
+        return self._size + len(self._pending)
+
+    def __iter__(self) -> Iterator[Dict]:
+        self._flush()
+        for row in range(self._size - 1, -1, -1):
+            yield self.record(row)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        """Newest-first indexing, like the list this replaces"""
+        self._flush()
+        if isinstance(index, slice):
+            return [self.record(self._size - 1 - i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ledger index out of range")
+        return self.record(self._size - 1 - index)
+
+    # Queries
+    def select(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               transaction_type: Union[str, Iterable[str], None] = None,
+               description: Union[str, Iterable[str], None] = None,
+               description_contains: Optional[str] = None,
+               min_amount: Optional[float] = None, max_amount: Optional[float] = None) -> 'LedgerSelection':
+        """Postings in [start, end) that match every given filter
+
+        The date range is two binary searches over the sorted dates; the
+        other filters compare integer codes or amounts inside that range
+        only. String filters are resolved against the intern tables first,
+        so a filter matching nothing costs nothing per row.
+        """
+        dates = self.dates
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'us'), 'left'))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, 'us'), 'left'))
+        hi = max(lo, hi)
+        mask = None
+
+        def narrow(condition):
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        if transaction_type is not None:
+            narrow(self._code_filter('type', self.types, _as_list(transaction_type), lo, hi))
+        if description is not None or description_contains is not None:
+            wanted = _as_list(description) if description is not None else list(self.descriptions.values)
+            if description_contains is not None:
+                needle = description_contains.lower()
+                wanted = [value for value in wanted if needle in value.lower()]
+            narrow(self._code_filter('description', self.descriptions, wanted, lo, hi))
+        if min_amount is not None:
+            narrow(self.column('amount')[lo:hi] >= min_amount)
+        if max_amount is not None:
+            narrow(self.column('amount')[lo:hi] <= max_amount)
+        return LedgerSelection(self, lo, hi, mask)
+
+    def _code_filter(self, name: str, table: InternTable, values: List[str], lo: int, hi: int) -> np.ndarray:
+        codes = [code for code in (table.lookup(value) for value in values) if code is not None]
+        if not codes:
+            return np.zeros(hi - lo, dtype=bool)
+        column = self.column(name)[lo:hi]
+        if len(codes) == 1:
+            return column == codes[0]
+        return np.isin(column, codes)
+
+
+class LedgerSelection:
+    """Rows picked by ``TransactionLedger.select`` with vectorized aggregates
+
+    Holds the date-range bounds plus an optional mask over that range, so an
+    unfiltered range reads the columns as views without copying.
+    """
+
+    def __init__(self, ledger: TransactionLedger, lo: int, hi: int, mask: Optional[np.ndarray] = None):
+        self.ledger = ledger
+        self.lo = lo
+        self.hi = hi
+        self.mask = mask
+
+    def column(self, name: str) -> np.ndarray:
+        values = self.ledger.column(name)[self.lo:self.hi]
+        return values if self.mask is None else values[self.mask]
+
+    def rows(self) -> np.ndarray:
+        """Selected row numbers, oldest first"""
+        rows = np.arange(self.lo, self.hi)
+        return rows if self.mask is None else rows[self.mask]
+
+    def count(self) -> int:
+        return self.hi - self.lo if self.mask is None else int(np.count_nonzero(self.mask))
+
+    def total(self) -> float:
+        amounts = self.ledger.column('amount')[self.lo:self.hi]
+        return float(amounts.sum() if self.mask is None else np.dot(amounts, self.mask))
+
+    def _weights(self) -> np.ndarray:
+        """Amounts over the whole date range, zeroed where the mask excludes a row"""
+        amounts = self.ledger.column('amount')[self.lo:self.hi]
+        return amounts if self.mask is None else amounts * self.mask
+
+    def by_type(self) -> Dict[str, Dict]:
+        """Count and total per transaction type"""
+        return self._group_by_code('type', self.ledger.types)
+
+    def by_description(self) -> Dict[str, Dict]:
+        """Count and total per description (the transaction category)"""
+        return self._group_by_code('description', self.ledger.descriptions)
+
+    def by_month(self) -> Dict[str, Dict]:
+        """Count and total per calendar month ('YYYY-MM'), oldest first"""
+        dates = self.ledger.column('date')[self.lo:self.hi]
+        if not len(dates):
+            return {}
+        # Dates are sorted, so each month is a contiguous run found by binary search
+        months = np.arange(dates[0].astype('datetime64[M]'), dates[-1].astype('datetime64[M]') + 2)
+        edges = np.searchsorted(dates, months.astype('datetime64[us]'), 'left')
+        occupied = edges[:-1] < edges[1:]
+        months, starts = months[:-1][occupied], edges[:-1][occupied]
+        if self.mask is None:
+            counts = np.diff(np.append(starts, len(dates)))
+        else:
+            counts = np.add.reduceat(self.mask, starts, dtype=np.int64)
+        totals = np.add.reduceat(self._weights(), starts)
+        return {str(month): {'count': int(count), 'total': float(total)}
+                for month, count, total in zip(months, counts, totals) if count}
+
+    def _group_by_code(self, name: str, table: InternTable) -> Dict[str, Dict]:
+        codes = self.ledger.column(name)[self.lo:self.hi]
+        if self.mask is not None:
+            # Excluded rows go to an overflow bucket past the last real code
+            codes = np.where(self.mask, codes, len(table))
+        counts = np.bincount(codes, minlength=len(table))[:len(table)]
+        totals = np.bincount(codes, weights=self.ledger.column('amount')[self.lo:self.hi], minlength=len(table))
+        return {table.values[code]: {'count': int(counts[code]), 'total': float(totals[code])}
+                for code in np.flatnonzero(counts)}
+
+    def records(self, limit: Optional[int] = None) -> List[Dict]:
+        """Selected transactions as dicts, newest first"""
+        if self.mask is None:
+            stop = self.lo if limit is None else max(self.lo, self.hi - limit)
+            rows = range(self.hi - 1, stop - 1, -1)
+        elif limit is None:
+            rows = self.rows()[::-1]
+        else:
+            # Scan backwards in growing chunks so a short page of recent
+            # matches doesn't touch the whole range
+            rows, end, chunk = [], self.hi - self.lo, max(4 * limit, 64)
+            while end > 0 and len(rows) < limit:
+                begin = max(0, end - chunk)
+                rows.extend((np.flatnonzero(self.mask[begin:end])[::-1] + self.lo + begin)[:limit - len(rows)])
+                end, chunk = begin, chunk * 2
+        return [self.ledger.record(int(row)) for row in rows]
+
+    def __len__(self) -> int:
+        return self.count()
+
+
+def _as_list(value: Union[str, Iterable[str]]) -> List[str]:
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _intern_index(table: InternTable, labels: Sequence[str], index: np.ndarray) -> np.ndarray:
+    """Intern codes for ``labels[index]``, interning each distinct label once"""
+    if len(index) <= 64:  # np.unique costs more than it saves on a few rows
+        return np.array([table.code(labels[label]) for label in index.tolist()], dtype=np.int32)
+    used, inverse = np.unique(index, return_inverse=True)
+    codes = np.array([table.code(labels[label]) for label in used], dtype=np.int32)
+    return codes[inverse]
@@ -0,0 +1,268 @@
+"""
+Synthetic Bank Population
+Seeded, vectorized generation of customer accounts, cards and transaction
+histories at production scale, for capacity and load testing
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    from .account_records import Card
+    from .banking_data import BankAccount
+    from .ledger import TransactionLedger
+except ImportError:
+    from account_records import Card
+    from banking_data import BankAccount
+    from ledger import TransactionLedger
+
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Amit", "Ananya", "Anita", "Arjun", "Deepak", "Divya", "Gaurav", "Isha",
+    "Karan", "Kavya", "Lakshmi", "Manish", "Meera", "Neha", "Nikhil", "Pooja", "Priya", "Rahul",
+    "Rajesh", "Ravi", "Rohan", "Sanjay", "Shreya", "Sneha", "Sunita", "Suresh", "Tanvi", "Vikram",
+]
+LAST_NAMES = [
+    "Agarwal", "Bose", "Chopra", "Das", "Desai", "Gupta", "Iyer", "Joshi", "Kapoor", "Krishnan",
+    "Kumar", "Malhotra", "Mehta", "Menon", "Mishra", "Nair", "Patel", "Pillai", "Rao", "Reddy",
+    "Saxena", "Shah", "Sharma", "Singh", "Sinha", "Trivedi", "Verma", "Yadav",
+]
+
+ACCOUNT_TYPES = ["Savings", "Current", "Fixed Deposit"]
+ACCOUNT_TYPE_WEIGHTS = [0.72, 0.23, 0.05]
+# Log-normal balance (median, sigma) and mean postings over the history window, per account type
+BALANCE_MEDIANS = np.array([60000.0, 250000.0, 500000.0])
+BALANCE_SIGMAS = np.array([1.0, 1.3, 0.8])
+POSTING_MEANS = np.array([25.0, 80.0, 3.0])
+POSTING_DISPERSION = 2.0  # negative binomial shape; smaller is more skewed
+
+STATUSES = ["Active", "Dormant", "Frozen"]
+STATUS_WEIGHTS = [0.95, 0.04, 0.01]
+
+TRANSACTION_TYPES = ("credit", "debit")
+POSTINGS = [
+    # (type, description, amount range, share of postings)
+    ("credit", "Salary Credit", (25000, 75000), 0.08),
+    ("debit", "ATM Withdrawal", (1000, 10000), 0.22),
+    ("debit", "Online Purchase", (500, 15000), 0.30),
+    ("debit", "Utility Bill Payment", (500, 5000), 0.12),
+    ("credit", "Interest Credit", (100, 2000), 0.05),
+    ("debit", "Fund Transfer", (1000, 50000), 0.13),
+    ("credit", "Refund Credit", (200, 5000), 0.10),
+]
+DESCRIPTIONS = [description for _, description, _, _ in POSTINGS]
+POSTING_TYPE = np.array([TRANSACTION_TYPES.index(kind) for kind, _, _, _ in POSTINGS], dtype=np.int8)
+POSTING_LOW = np.array([low for _, _, (low, _), _ in POSTINGS])
+POSTING_HIGH = np.array([high for _, _, (_, high), _ in POSTINGS])
+POSTING_WEIGHTS = np.array([weight for _, _, _, weight in POSTINGS])
+
+HISTORY_DAYS = 180
+FIRST_ACCOUNT_NUMBER = 1000000000
+
+
+class PopulationBatch:
+    """A block of generated accounts held as NumPy columns
+
+    Per-account columns have one row per account. Postings are stored
+    flat, grouped by account and oldest first, with ``offsets[i]`` to
+    ``offsets[i + 1]`` the rows of account ``i``. ``accounts`` builds
+    BankAccount objects for the data service; ``save`` and ``load``
+    round-trip a batch through an ``.npz`` file.
+    """
+
+    ACCOUNT_COLUMNS = ('account_number', 'first_name', 'last_name', 'account_type', 'status', 'balance',
+                       'created_date', 'phone', 'debit_card', 'credit_card', 'credit_limit', 'card_digits',
+                       'card_expiry_days', 'card_issued_days')
+    POSTING_COLUMNS = ('offsets', 'date', 'kind', 'amount', 'balance_after', 'transaction_id', 'reference')
+
+    def __init__(self, columns: Dict[str, np.ndarray], generated_at: datetime):
+        self.columns = columns
+        self.generated_at = generated_at
+
+    def __len__(self) -> int:
+        return len(self.columns['account_number'])
+
+    @property
+    def postings(self) -> int:
+        return int(self.columns['offsets'][-1])
+
+    @property
+    def cards(self) -> int:
+        return int(self.columns['debit_card'].sum() + self.columns['credit_card'].sum())
+
+    def accounts(self) -> List[BankAccount]:
+        """Materialize the batch as BankAccount objects"""
+        c = self.columns
+        offsets = c['offsets'].tolist()
+        created = c['created_date'].astype('datetime64[us]').tolist()
+        type_index = POSTING_TYPE[c['kind']]
+        generated_at = self.generated_at
+        cards = list(zip(c['debit_card'].tolist(), c['credit_card'].tolist(), c['credit_limit'].tolist(),
+                         c['card_digits'].tolist(), c['card_expiry_days'].tolist(), c['card_issued_days'].tolist()))
+        accounts = []
+        for i, (number, first, last, account_type, status, balance, phone) in enumerate(zip(
+                c['account_number'].tolist(), c['first_name'].tolist(), c['last_name'].tolist(),
+                c['account_type'].tolist(), c['status'].tolist(), c['balance'].tolist(), c['phone'].tolist())):
+            account = BankAccount(str(number), f"{FIRST_NAMES[first]} {LAST_NAMES[last]}",
+                                  ACCOUNT_TYPES[account_type], sample_data=False)
+            account.balance = balance
+            account.status = STATUSES[status]
+            account.created_date = created[i]
+            account.phone = str(phone)
+
+            start, end = offsets[i], offsets[i + 1]
+            if end > start:
+                ledger = TransactionLedger(capacity=end - start)
+                ledger.extend(c['date'][start:end], TRANSACTION_TYPES, type_index[start:end],
+                              DESCRIPTIONS, c['kind'][start:end], c['amount'][start:end],
+                              c['balance_after'][start:end], c['transaction_id'][start:end],
+                              c['reference'][start:end])
+                account.transactions = ledger
+
+            debit, credit, limit, digits, expiry_days, issued_days = cards[i]
+            for slot, (card_type, issued) in enumerate((("Debit Card", debit), ("Credit Card", credit))):
+                if not issued:
+                    continue
+                account.add_card(Card(
+                    card_type,
+                    digits[slot],
+                    (generated_at + timedelta(days=expiry_days[slot])).strftime("%m/%y"),
+                    50000 if slot == 0 else limit // 10,
+                    500000 if slot == 0 else limit,
+                    generated_at - timedelta(days=issued_days[slot])
+                ))
+            accounts.append(account)
+        return accounts
+
+    def save(self, path: str) -> None:
+        np.savez(path, generated_at=np.datetime64(self.generated_at, 'us'), **self.columns)
+
+    @classmethod
+    def load(cls, path: str) -> "PopulationBatch":
+        with np.load(path) as data:
+            columns = {name: data[name] for name in cls.ACCOUNT_COLUMNS + cls.POSTING_COLUMNS}
+            return cls(columns, data['generated_at'].item())
+
+
+def generate_population(count: int, seed: int = 0, batch_size: int = 10000,
+                        now: Optional[datetime] = None) -> Iterator[PopulationBatch]:
+    """Yield ``count`` synthetic accounts in batches of ``batch_size``
+
+    Each batch draws from its own generator seeded by (seed, batch number),
+    so the same seed and batch size always give the same population;
+    dates are relative to ``now``, which defaults to the current time.
+    """
+    now = now or datetime.now().replace(microsecond=0)
+    for batch_number, first in enumerate(range(0, count, batch_size)):
+        rng = np.random.default_rng([seed, batch_number])
+        yield _generate_batch(rng, FIRST_ACCOUNT_NUMBER + first, min(batch_size, count - first), now)
+
+
+def _generate_batch(rng: np.random.Generator, first_number: int, size: int, now: datetime) -> PopulationBatch:
+    account_type = rng.choice(len(ACCOUNT_TYPES), size, p=ACCOUNT_TYPE_WEIGHTS).astype(np.int8)
+    balance = np.round(rng.lognormal(np.log(BALANCE_MEDIANS[account_type]), BALANCE_SIGMAS[account_type]), 2)
+    age_days = rng.integers(30, 3650, size)
+    mean = POSTING_MEANS[account_type]
+    counts = rng.negative_binomial(POSTING_DISPERSION, POSTING_DISPERSION / (POSTING_DISPERSION + mean))
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    total = int(offsets[-1])
+
+    # Postings land uniformly over the history window (or the account's life
+    # if shorter), sorted oldest first within each account
+    owner = np.repeat(np.arange(size), counts)
+    window = np.minimum(age_days, HISTORY_DAYS)[owner] * 86400.0
+    seconds_ago = rng.random(total) * window
+    seconds_ago = seconds_ago[np.lexsort((-seconds_ago, owner))]
+    date = np.datetime64(now, 'us') - (seconds_ago * 1e6).astype('timedelta64[us]')
+    kind = rng.choice(len(POSTINGS), total, p=POSTING_WEIGHTS).astype(np.int8)
+    amount = rng.integers(POSTING_LOW[kind], POSTING_HIGH[kind] + 1).astype(np.float64)
+    signed = np.where(POSTING_TYPE[kind] == 0, amount, -amount)
+
+    # Replay history backwards from the closing balance; accounts whose
+    # history would dip below zero get their balance raised by the shortfall
+    running = np.cumsum(signed)
+    closing = running[np.maximum(offsets[1:] - 1, 0)] if total else np.zeros(size)
+    opening_sum = np.r_[0.0, running][offsets[:-1]]
+    balance_after = balance[owner] - (closing[owner] - running)
+    opening = balance - (np.where(counts > 0, closing, opening_sum) - opening_sum)
+    lowest = opening.copy()
+    active = counts > 0
+    if total:
+        lowest[active] = np.minimum(lowest[active], np.minimum.reduceat(balance_after, offsets[:-1][active]))
+    shortfall = np.maximum(-lowest, 0.0)
+    balance += shortfall
+    balance_after += shortfall[owner]
+
+    # Debit cards for transacting accounts; credit cards more likely with higher balances
+    debit_card = rng.random(size) < np.where(account_type == 2, 0.1, 0.95)
+    credit_odds = 0.8 / (1.0 + np.exp(-(np.log(balance + 1.0) - np.log(150000.0))))
+    credit_card = rng.random(size) < credit_odds
+    credit_limit = np.round(np.clip(balance * rng.uniform(2.0, 6.0, size), 100000, 5000000), -4).astype(np.int64)
+
+    columns = {
+        'account_number': np.arange(first_number, first_number + size, dtype=np.int64),
+        'first_name': rng.integers(0, len(FIRST_NAMES), size, dtype=np.int16),
+        'last_name': rng.integers(0, len(LAST_NAMES), size, dtype=np.int16),
+        'account_type': account_type,
+        'status': rng.choice(len(STATUSES), size, p=STATUS_WEIGHTS).astype(np.int8),
+        'balance': balance,
+        'created_date': np.datetime64(now, 's') - (age_days * 86400).astype('timedelta64[s]'),
+        'phone': rng.integers(6000000000, 10000000000, size, dtype=np.int64),
+        'debit_card': debit_card,
+        'credit_card': credit_card,
+        'credit_limit': credit_limit,
+        'card_digits': rng.integers(1000, 10000, (size, 2), dtype=np.int16),
+        'card_expiry_days': rng.integers(365, 1826, (size, 2), dtype=np.int16),
+        'card_issued_days': rng.integers(30, 1096, (size, 2), dtype=np.int16),
+        'offsets': offsets,
+        'date': date,
+        'kind': kind,
+        'amount': amount,
+        'balance_after': balance_after,
+        'transaction_id': rng.integers(1000000000, 10000000000, total, dtype=np.int64),
+        'reference': rng.integers(100000, 1000000, total, dtype=np.int32),
+    }
+    return PopulationBatch(columns, now)
+
+
+def _report(accounts: int, postings: int, cards: int, started: float) -> Dict:
+    seconds = time.perf_counter() - started
+    return {
+        "accounts": accounts,
+        "postings": postings,
+        "cards": cards,
+        "seconds": seconds,
+        "accounts_per_second": accounts / seconds if seconds > 0 else 0.0,
+        "postings_per_second": postings / seconds if seconds > 0 else 0.0,
+    }
+
+
+def populate(service, count: int, seed: int = 0, batch_size: int = 10000, now: Optional[datetime] = None,
+             progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Stream ``count`` generated accounts into a BankingDataService; returns the generation rate"""
+    started = time.perf_counter()
+    accounts = postings = cards = 0
+    for batch in generate_population(count, seed, batch_size, now):
+        service.add_accounts(batch.accounts())
+        accounts, postings, cards = accounts + len(batch), postings + batch.postings, cards + batch.cards
+        if progress:
+            progress(_report(accounts, postings, cards, started))
+    return _report(accounts, postings, cards, started)
+
+
+def write_population(directory: str, count: int, seed: int = 0, batch_size: int = 10000,
+                     now: Optional[datetime] = None, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Write ``count`` generated accounts to ``directory`` as numbered .npz batches"""
+    os.makedirs(directory, exist_ok=True)
+    started = time.perf_counter()
+    accounts = postings = cards = 0
+    for number, batch in enumerate(generate_population(count, seed, batch_size, now)):
+        batch.save(os.path.join(directory, f"batch-{number:06d}.npz"))
+        accounts, postings, cards = accounts + len(batch), postings + batch.postings, cards + batch.cards
+        if progress:
+            progress(_report(accounts, postings, cards, started))
+    return _report(accounts, postings, cards, started)
@@ -1,4 +1,6 @@
+import hashlib
 import json
+import os
 import re
 from pathlib import Path
 from datetime import datetime
@@ -7,12 +9,14 @@ import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
+from context_store import MemoryContextStore, create_context_store
 
 class EnhancedNLU:
-    def __init__(self):
+    def __init__(self, context_store=None):
         self.model = None
+        self.model_version = None
         self.chitchat_model = None
-        self.context_history = {}  # Store conversation context
+        self.context_history = context_store if context_store is not None else MemoryContextStore()  # Store conversation context
         self.slot_templates = {}
         self.load_models()
         self.initialize_slot_templates()
@@ -22,7 +26,9 @@ class EnhancedNLU:
         try:
             # Load main intent model
             with open('models/intent_model.pkl', 'rb') as f:
-                self.model = pickle.load(f)
+                model_bytes = f.read()
+            self.model = pickle.loads(model_bytes)
+            self.model_version = hashlib.sha1(model_bytes).hexdigest()[:12]
             print("✅ ML Intent model loaded successfully")
         except FileNotFoundError:
             print("⚠️ ML model not found, training new model...")
@@ -89,10 +95,12 @@ class EnhancedNLU:
             
             # Save model
             Path('models').mkdir(exist_ok=True)
+            model_bytes = pickle.dumps(pipeline)
             with open('models/intent_model.pkl', 'wb') as f:
-                pickle.dump(pipeline, f)
+                f.write(model_bytes)
             
             self.model = pipeline
+            self.model_version = hashlib.sha1(model_bytes).hexdigest()[:12]
             print("✅ Model trained and saved successfully")
             
         except Exception as e:
@@ -170,22 +178,22 @@ class EnhancedNLU:
 
     def get_conversation_context(self, session_id):
         """Get conversation context for session"""
-        return self.context_history.get(session_id, {
+        return self.context_history.get(session_id) or {
             'last_intent': None,
             'pending_slots': {},
             'filled_slots': {},
             'conversation_stage': 'initial'
-        })
+        }
 
-    def update_conversation_context(self, session_id, intent, entities, pending_slots=None):
+    def update_conversation_context(self, session_id, intent, entities, pending_slots=None, filled_slots=None):
         """Update conversation context"""
-        if session_id not in self.context_history:
-            self.context_history[session_id] = {}
-        
-        context = self.context_history[session_id]
+        context = self.context_history.get(session_id) or {}
         context['last_intent'] = intent
         context['last_update'] = datetime.now().isoformat()
         
+        if filled_slots is not None:
+            context['filled_slots'] = filled_slots
+
         # Update filled slots from entities
         for entity in entities:
             if entity['label'] == 'AMOUNT':
@@ -197,9 +205,12 @@ class EnhancedNLU:
             elif entity['label'] == 'LOAN_TYPE':
                 context.setdefault('filled_slots', {})['loan_type'] = entity['value']
         
-        if pending_slots:
+        if pending_slots is not None:
             context['pending_slots'] = pending_slots
 
+        # Write back explicitly: shared stores hand out copies, not live dicts
+        self.context_history.put(session_id, context)
+
     def check_slot_filling(self, intent, filled_slots):
         """Check if all required slots are filled for an intent"""
         if intent not in self.slot_templates:
@@ -359,7 +370,7 @@ class EnhancedNLU:
         
         # Update context
         if session_id:
-            self.update_conversation_context(session_id, last_intent, entities, pending_slots)
+            self.update_conversation_context(session_id, last_intent, entities, pending_slots, filled_slots)
         
         return {
             'intent': last_intent,
@@ -464,8 +475,11 @@ class EnhancedNLU:
             'needs_slot_filling': False
         }
 
-# Global instance
-enhanced_nlu = EnhancedNLU()
+# Global instance; SECUREBANK_CONTEXT_STORE=sqlite shares slot filling state across workers
+enhanced_nlu = EnhancedNLU(create_context_store(
+    os.environ.get('SECUREBANK_CONTEXT_STORE', 'memory'),
+    path=os.environ.get('SECUREBANK_CONTEXT_DB_PATH', 'nlu_context.db')
+))
 
 def analyze_query(query, session_id=None):
     """Main analysis function with enhanced features"""
@@ -481,6 +495,27 @@ def analyze_query(query, session_id=None):
         'response': result.get('response', '')
     }
 
+def nlu_status():
+    """Size of the conversation context store and the loaded model's version"""
+    return {
+        'contexts': len(enhanced_nlu.context_history),
+        'model_version': enhanced_nlu.model_version,
+    }
+
+def forget_sessions(session_ids):
+    """Drop conversation context for sessions that were evicted"""
+    for session_id in session_ids:
+        enhanced_nlu.context_history.delete(session_id)
+
+def prune_contexts(max_age_seconds):
+    """Drop shared contexts idle for longer than max_age_seconds; returns how many
+
+    A process-local store loses its contexts with the process, so only the
+    SQLite store needs this.
+    """
+    prune = getattr(enhanced_nlu.context_history, 'prune', None)
+    return prune(max_age_seconds) if prune is not None else 0
+
 if __name__ == "__main__":
     import sys
     
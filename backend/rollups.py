@@ -0,0 +1,153 @@
+"""
+Analytics Rollups
+Per-minute and per-hour series of chat volume, intents, methods,
+confidence and response latency, kept in fixed-size NumPy ring buffers
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+METHODS = ('ml', 'chitchat', 'slot_filling', 'rule', 'fallback', 'other')
+CONFIDENCE_EDGES = np.linspace(0.0, 1.0, 11)
+LATENCY_EDGES_MS = np.array([0, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, np.inf])
+MAX_INTENTS = 64
+OTHER_INTENT = 'other'
+
+
+class RollupSeries:
+    """Ring buffer of fixed-width time buckets for one resolution
+
+    Row ``bucket % capacity`` holds bucket ``bucket``; ``bucket_ids`` records
+    which bucket a row currently belongs to so stale rows read as zero.
+    """
+
+    def __init__(self, resolution: int, capacity: int, intent_slots: int = MAX_INTENTS):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.bucket_ids = np.full(capacity, -1, dtype=np.int64)
+        self.queries = np.zeros(capacity, dtype=np.int64)
+        self.intents = np.zeros((capacity, intent_slots), dtype=np.int32)
+        self.methods = np.zeros((capacity, len(METHODS)), dtype=np.int32)
+        self.confidence = np.zeros((capacity, len(CONFIDENCE_EDGES) - 1), dtype=np.int32)
+        self.latency = np.zeros((capacity, len(LATENCY_EDGES_MS) - 1), dtype=np.int32)
+        self.latency_sum_ms = np.zeros(capacity, dtype=np.float64)
+
+    def _row(self, ts: float) -> int:
+        bucket = int(ts // self.resolution)
+        row = bucket % self.capacity
+        if self.bucket_ids[row] != bucket:
+            self.bucket_ids[row] = bucket
+            self.queries[row] = 0
+            self.intents[row] = 0
+            self.methods[row] = 0
+            self.confidence[row] = 0
+            self.latency[row] = 0
+            self.latency_sum_ms[row] = 0.0
+        return row
+
+    def add(self, ts: float, intent_slot: int, method_slot: int, confidence_bin: int,
+            latency_ms: Optional[float], latency_bin: int) -> None:
+        row = self._row(ts)
+        self.queries[row] += 1
+        self.intents[row, intent_slot] += 1
+        self.methods[row, method_slot] += 1
+        self.confidence[row, confidence_bin] += 1
+        if latency_ms is not None:
+            self.latency[row, latency_bin] += 1
+            self.latency_sum_ms[row] += latency_ms
+
+    def window(self, start: float, end: float, step: int = 1) -> Dict[str, np.ndarray]:
+        """Vectorized copy of buckets start..end, summed into groups of `step` buckets"""
+        first = int(start // self.resolution)
+        last = int(end // self.resolution)
+        first = max(first, last - self.capacity + 1)
+        ids = np.arange(first, last + 1, dtype=np.int64)
+        rows = ids % self.capacity
+        valid = self.bucket_ids[rows] == ids
+
+        def take(column):
+            values = column[rows]
+            mask = valid if values.ndim == 1 else valid[:, None]
+            return np.where(mask, values, 0)
+
+        data = {
+            'queries': take(self.queries),
+            'intents': take(self.intents),
+            'methods': take(self.methods),
+            'confidence': take(self.confidence),
+            'latency': take(self.latency),
+            'latency_sum_ms': take(self.latency_sum_ms),
+        }
+        starts = np.arange(0, len(ids), step)
+        data = {name: np.add.reduceat(values, starts, axis=0) for name, values in data.items()}
+        data['buckets'] = ids[starts] * self.resolution
+        return data
+
+
+class RollupEngine:
+    """Feeds every chat turn into the minute and hour series"""
+
+    RESOLUTIONS = {'minute': (60, 24 * 60), 'hour': (3600, 30 * 24)}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.series = {name: RollupSeries(resolution, capacity)
+                       for name, (resolution, capacity) in self.RESOLUTIONS.items()}
+        self.intent_names: List[str] = [OTHER_INTENT]
+        self._intent_slots: Dict[str, int] = {OTHER_INTENT: 0}
+
+    def _intent_slot(self, intent: str) -> int:
+        slot = self._intent_slots.get(intent)
+        if slot is None:
+            if len(self.intent_names) >= MAX_INTENTS:
+                return 0
+            slot = self._intent_slots[intent] = len(self.intent_names)
+            self.intent_names.append(intent)
+        return slot
+
+    def record(self, bot_message: Dict, latency_ms: Optional[float] = None, ts: Optional[float] = None) -> None:
+        ts = time.time() if ts is None else ts
+        method = bot_message.get('method')
+        method_slot = METHODS.index(method) if method in METHODS else len(METHODS) - 1
+        confidence = min(max(float(bot_message.get('confidence') or 0), 0.0), 1.0)
+        confidence_bin = min(int(np.searchsorted(CONFIDENCE_EDGES, confidence, side='right')) - 1,
+                             len(CONFIDENCE_EDGES) - 2)
+        latency_bin = 0
+        if latency_ms is not None:
+            latency_bin = int(np.searchsorted(LATENCY_EDGES_MS, latency_ms, side='right')) - 1
+        with self._lock:
+            intent_slot = self._intent_slot(bot_message.get('intent') or OTHER_INTENT)
+            for series in self.series.values():
+                series.add(ts, intent_slot, method_slot, confidence_bin, latency_ms, latency_bin)
+
+    def timeseries(self, resolution: str, start: float, end: float, step: int = 1) -> Dict:
+        """JSON-ready series for the admin dashboard"""
+        with self._lock:
+            data = self.series[resolution].window(start, end, step)
+            intent_names = list(self.intent_names)
+
+        intent_totals = data['intents'].sum(axis=0)
+        latency_counts = data['latency'].sum(axis=1)
+        mean_latency = np.divide(data['latency_sum_ms'], latency_counts,
+                                 out=np.zeros_like(data['latency_sum_ms']), where=latency_counts > 0)
+        return {
+            'resolution': resolution,
+            'bucket_seconds': self.series[resolution].resolution * step,
+            'buckets': data['buckets'].tolist(),
+            'queries': data['queries'].tolist(),
+            'intents': {name: data['intents'][:, slot].tolist()
+                        for slot, name in enumerate(intent_names) if intent_totals[slot]},
+            'methods': {name: data['methods'][:, slot].tolist() for slot, name in enumerate(METHODS)},
+            'confidence_histogram': {
+                'edges': CONFIDENCE_EDGES.round(2).tolist(),
+                'counts': data['confidence'].tolist(),
+            },
+            'latency': {
+                'mean_ms': mean_latency.round(3).tolist(),
+                'edges_ms': [edge if np.isfinite(edge) else None for edge in LATENCY_EDGES_MS.tolist()],
+                'counts': data['latency'].tolist(),
+            },
+        }
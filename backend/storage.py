@@ -0,0 +1,782 @@
+"""
+Storage Backends for SecureBank API
+Pluggable persistence for users, chat sessions, chat turns and FAQs
+"""
+
+import atexit
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from analytics import TurnStats, build_snapshot
+from chat_log import ChatLog
+from log_index import INDEXED_FIELDS, LogIndex, turn_fields
+
+
+class StorageBackend:
+    """Interface shared by all API storage backends"""
+
+    # Users
+    def get_user(self, email: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_user_by_account(self, account_number: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def add_user(self, user: Dict) -> None:
+        raise NotImplementedError
+
+    def count_users(self) -> int:
+        raise NotImplementedError
+
+    # Chat sessions
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def has_session(self, session_id: str) -> bool:
+        return self.get_session(session_id) is not None
+
+    def create_session(self, session: Dict) -> None:
+        raise NotImplementedError
+
+    def append_session_message(self, session_id: str, message: Dict) -> None:
+        raise NotImplementedError
+
+    def session_messages(self, session_id: str, limit: Optional[int] = None,
+                         cursor: Optional[int] = None) -> Tuple[List[Dict], Optional[int]]:
+        """Messages before ``cursor`` (oldest first, at most ``limit``) and the cursor for the page before"""
+        raise NotImplementedError
+
+    def evict_idle_sessions(self, max_idle: float) -> List[str]:
+        """Drop sessions idle for more than ``max_idle`` seconds from the hot set; returns their ids"""
+        raise NotImplementedError
+
+    def count_sessions(self) -> int:
+        raise NotImplementedError
+
+    # Chat turns (paired user/bot messages for admin logs)
+    def append_turn(self, user_message: Dict, bot_message: Dict) -> int:
+        raise NotImplementedError
+
+    def recent_turns(self, limit: int = 100) -> List[Dict]:
+        turns = list(self.iter_turns())
+        return turns[-limit:] if limit else []
+
+    def iter_turns(self) -> Iterator[Dict]:
+        raise NotImplementedError
+
+    def count_turns(self) -> int:
+        raise NotImplementedError
+
+    def query_turns(self, limit: int = 50, cursor: Optional[int] = None, start: Optional[float] = None,
+                    end: Optional[float] = None, **filters) -> Tuple[List[Dict], Optional[int]]:
+        """Filtered turns newest first plus the cursor for the next page"""
+        raise NotImplementedError
+
+    def turn_stats(self) -> Dict:
+        """Running analytics totals over all turns (see analytics.build_snapshot)"""
+        raise NotImplementedError
+
+    # FAQs
+    def list_faqs(self) -> List[Dict]:
+        raise NotImplementedError
+
+    def add_faq(self, faq: Dict) -> None:
+        raise NotImplementedError
+
+    def delete_faq(self, faq_id: str) -> None:
+        raise NotImplementedError
+
+    def count_faqs(self) -> int:
+        return len(self.list_faqs())
+
+    def flush(self) -> None:
+        """Persist any buffered writes"""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class MemoryStorage(StorageBackend):
+    """Process-local storage backed by plain dicts and lists (default)
+
+    Chat turns go to an append-only ChatLog instead of an ever-growing list,
+    with a LogIndex and TurnStats kept up to date for admin queries and
+    analytics.
+
+    Sessions keep at most ``max_session_messages`` messages in memory. The
+    opening messages (the greeting) stay pinned; older messages are dropped
+    from the list and read back from the chat log, where every answered turn
+    is already recorded. ``append_turn`` notes the log sequence number of
+    each turn's messages, so compaction archives whole turns by sequence
+    number and keeps unanswered messages (a stream the client left, a reply
+    that failed) verbatim instead of assuming strict user/bot alternation.
+    Message cursors are positions in the full history, so they stay valid
+    across compaction. With ``archive_sessions`` an evicted session is
+    restored from the chat log on its next use (answered turns only).
+    """
+
+    def __init__(self, users: Dict = None, sessions: Dict = None, faqs: List = None,
+                 chat_log: ChatLog = None, max_session_messages: int = 200, archive_sessions: bool = True):
+        self.users = users if users is not None else {}
+        self.sessions = sessions if sessions is not None else {}
+        self.faqs = faqs if faqs is not None else []
+        self.max_session_messages = max(max_session_messages, 4)
+        self.archive_sessions = archive_sessions
+        self._session_lock = threading.Lock()
+        # Random epoch so version numbers from before a restart never match
+        self._faq_epoch = os.urandom(4).hex()
+        self._faq_versions = itertools.count(1)
+        self._faq_version = 0
+        self.chat_log = chat_log if chat_log is not None else ChatLog()
+        self.log_index = LogIndex()
+        self.stats = TurnStats()
+        for record in self.chat_log.iter_records():
+            self.log_index.add(record)
+            self.stats.add(record)
+        self.chat_log.add_listener(self.log_index.add)
+        self.chat_log.add_listener(self.stats.add)
+
+    def get_user(self, email: str) -> Optional[Dict]:
+        return self.users.get(email)
+
+    def get_user_by_account(self, account_number: str) -> Optional[Dict]:
+        for user in self.users.values():
+            if user.get('account_number') == account_number:
+                return user
+        return None
+
+    def add_user(self, user: Dict) -> None:
+        self.users[user['email']] = user
+
+    def count_users(self) -> int:
+        return len(self.users)
+
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        session = self.sessions.get(session_id)
+        if session is None and self.archive_sessions:
+            session = self._restore_session(session_id)
+        return session
+
+    def has_session(self, session_id: str) -> bool:
+        if session_id in self.sessions:
+            return True
+        return self.archive_sessions and self.log_index.count('session_id', session_id) > 0
+
+    def _restore_session(self, session_id: str) -> Optional[Dict]:
+        """Rebuild an evicted session whose whole history now lives in the chat log"""
+        seqs = self.log_index.seqs_for('session_id', session_id)
+        first_turn = self.chat_log.get_many(seqs[:1])
+        if not first_turn:
+            return None
+        user_message = first_turn[0]['user']
+        return self.sessions.setdefault(session_id, {
+            'id': session_id,
+            'user_id': user_message.get('user_id'),
+            'messages': [],
+            'created_at': user_message.get('timestamp'),
+            'pinned': 0,
+            'archived': seqs,
+            'compacted': 2 * len(seqs),
+            'last_active': time.time()
+        })
+
+    def create_session(self, session: Dict) -> None:
+        session.setdefault('pinned', len(session['messages']))
+        session.setdefault('archived', [])
+        session.setdefault('compacted', 0)
+        session.setdefault('last_active', time.time())
+        self.sessions[session['id']] = session
+
+    def append_session_message(self, session_id: str, message: Dict) -> None:
+        session = self.get_session(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        with self._session_lock:
+            session['messages'].append(message)
+            session['last_active'] = time.time()
+            self._compact(session)
+
+    def _compact(self, session: Dict) -> None:
+        """Move the oldest unpinned messages out of memory (caller holds the session lock)
+
+        ``session['archived']`` lists what was dropped, oldest first: a
+        sequence number stands for a whole logged turn (user and bot message),
+        ``~seq`` for the bot half of a turn whose user message was archived
+        before it was answered, and a dict for a message that is in no turn.
+        ``session['compacted']`` is the number of messages they expand to.
+        """
+        messages = session['messages']
+        pinned = session.get('pinned', 0)
+        excess = len(messages) - self.max_session_messages
+        if excess <= 0:
+            return
+        turn_seqs = session.setdefault('turn_seqs', {})
+        entries, open_turns, size = [], set(), 0
+        cut = pinned
+        # Never the newest message: its turn may be about to be logged
+        while cut < len(messages) - 1 and (cut - pinned < excess or open_turns):
+            message = messages[cut]
+            seq, partner = turn_seqs.get(id(message), (None, None))
+            if seq is None:
+                entries.append(message)
+                size += 1
+            elif partner is None:
+                entries.append(~seq)
+                size += 1
+            elif seq in open_turns:
+                open_turns.discard(seq)
+            else:
+                entries.append(seq)
+                open_turns.add(seq)
+                size += 2
+            cut += 1
+        if open_turns:
+            return  # a turn's bot reply is still in the window; try again later
+        for message in messages[pinned:cut]:
+            turn_seqs.pop(id(message), None)
+        del messages[pinned:cut]
+        session.setdefault('archived', []).extend(entries)
+        session['compacted'] = session.get('compacted', 0) + size
+
+    def session_messages(self, session_id: str, limit: Optional[int] = None,
+                         cursor: Optional[int] = None) -> Tuple[List[Dict], Optional[int]]:
+        session = self.get_session(session_id)
+        if session is None:
+            return [], None
+        with self._session_lock:
+            messages = list(session['messages'])
+            pinned = session.get('pinned', 0)
+            compacted = session.get('compacted', 0)
+            # Entries are only ever appended, so the list needs no copy
+            archived = session.get('archived', [])
+            whole_turns = compacted == 2 * len(archived)
+
+        # Full history is messages[:pinned] + archived messages + messages[pinned:]
+        total = compacted + len(messages)
+        hi = total if cursor is None else min(cursor, total)
+        lo = 0 if limit is None else max(hi - limit, 0)
+        items = messages[lo:min(hi, pinned)]
+        if max(lo, pinned) < min(hi, pinned + compacted):
+            items += self._compacted_messages(archived, whole_turns, max(lo, pinned) - pinned,
+                                              min(hi, pinned + compacted) - pinned)
+        if max(lo, pinned + compacted) < hi:
+            items += messages[max(lo, pinned + compacted) - compacted:hi - compacted]
+        return items, (lo if lo > 0 else None)
+
+    def _compacted_messages(self, archived: List, whole_turns: bool, first: int, last: int) -> List[Dict]:
+        """Archived messages first..last-1 of a session, turns read back from the chat log"""
+        if whole_turns:  # positions map straight to entries
+            chosen, offset = archived[first // 2:(last - 1) // 2 + 1], first % 2
+        else:
+            chosen, position, offset = [], 0, 0
+            for entry in archived:
+                width = 2 if isinstance(entry, int) and entry >= 0 else 1
+                if position + width > first:
+                    if not chosen:
+                        offset = first - position
+                    chosen.append(entry)
+                position += width
+                if position >= last:
+                    break
+        seqs = [entry if entry >= 0 else ~entry for entry in chosen if isinstance(entry, int)]
+        turns = {turn['seq']: turn for turn in self.chat_log.get_many(seqs)}
+        flat = []
+        for entry in chosen:
+            if isinstance(entry, dict):
+                flat.append(entry)
+            elif entry >= 0 and entry in turns:
+                flat += (turns[entry]['user'], turns[entry]['bot'])
+            elif entry < 0 and ~entry in turns:
+                flat.append(turns[~entry]['bot'])
+        return flat[offset:offset + last - first]
+
+    def evict_idle_sessions(self, max_idle: float) -> List[str]:
+        cutoff = time.time() - max_idle
+        evicted = [session_id for session_id, session in list(self.sessions.items())
+                   if session.get('last_active', 0) < cutoff]
+        for session_id in evicted:
+            self.sessions.pop(session_id, None)
+        return evicted
+
+    def count_sessions(self) -> int:
+        return len(self.sessions)
+
+    def append_turn(self, user_message: Dict, bot_message: Dict) -> int:
+        seq = self.chat_log.append(user_message, bot_message)
+        session = self.sessions.get(user_message.get('session_id'))
+        if session is not None:
+            with self._session_lock:
+                # Only messages still in the window are noted; compaction drops the notes
+                window = session['messages']
+                if any(message is bot_message for message in reversed(window)):
+                    has_user = any(message is user_message for message in reversed(window))
+                    turn_seqs = session.setdefault('turn_seqs', {})
+                    turn_seqs[id(bot_message)] = (seq, id(user_message) if has_user else None)
+                    if has_user:
+                        turn_seqs[id(user_message)] = (seq, id(bot_message))
+        return seq
+
+    def recent_turns(self, limit: int = 100) -> List[Dict]:
+        return self.chat_log.recent(limit)
+
+    def iter_turns(self) -> Iterator[Dict]:
+        return self.chat_log.iter_records()
+
+    def count_turns(self) -> int:
+        return len(self.chat_log)
+
+    def query_turns(self, limit: int = 50, cursor: Optional[int] = None, start: Optional[float] = None,
+                    end: Optional[float] = None, **filters) -> Tuple[List[Dict], Optional[int]]:
+        seqs, next_cursor = self.log_index.query(limit, cursor, start, end, **filters)
+        return self.chat_log.get_many(seqs), next_cursor
+
+    def turn_stats(self) -> Dict:
+        return self.stats.snapshot()
+
+    def list_faqs(self) -> List[Dict]:
+        return list(self.faqs)
+
+    def add_faq(self, faq: Dict) -> None:
+        self.faqs.append(faq)
+        self._faq_version = next(self._faq_versions)
+
+    def delete_faq(self, faq_id: str) -> None:
+        # Mutate in place so callers holding the list see the change
+        self.faqs[:] = [faq for faq in self.faqs if faq['_id'] != faq_id]
+        self._faq_version = next(self._faq_versions)
+
+    def count_faqs(self) -> int:
+        return len(self.faqs)
+
+    def faq_version(self) -> str:
+        return f"{self._faq_epoch}.{self._faq_version}"
+
+    def flush(self) -> None:
+        self.chat_log.flush()
+
+    def close(self) -> None:
+        self.chat_log.close()
+
+
+class ConnectionPool:
+    """Small per-process pool of SQLite connections
+
+    Connections are never shared across a fork: the pool notices the pid
+    change and starts over, so every gunicorn worker opens its own. Any
+    inherited connections are parked, never used or closed, in the child;
+    the gunicorn master closes its pools before forking so there are none.
+    """
+
+    def __init__(self, path: str, size: int = 8):
+        self.path = path
+        self.size = size
+        self._pid = os.getpid()
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        self._inherited: List[sqlite3.Connection] = []
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, cached_statements=128)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            # Kept referenced so garbage collection doesn't close them either
+            while not self._idle.empty():
+                self._inherited.append(self._idle.get_nowait())
+            self._idle = queue.LifoQueue(maxsize=self.size)
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite storage in WAL mode, shareable between gunicorn workers
+
+    Users, sessions and FAQs are written through so every worker sees them
+    immediately. Chat turns only feed the admin logs, so they are buffered
+    and written in batches with ``executemany``; the analytics totals in
+    chat_stats are bumped in the same transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            email TEXT PRIMARY KEY,
+            account_number TEXT,
+            password BLOB,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_users_account ON users(account_number);
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            last_active REAL
+        );
+        CREATE TABLE IF NOT EXISTS session_messages (
+            session_id TEXT NOT NULL,
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_session_messages ON session_messages(session_id, seq);
+        CREATE TABLE IF NOT EXISTS chat_turns (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            user_id TEXT,
+            session_id TEXT,
+            intent TEXT,
+            method TEXT,
+            confidence_band TEXT,
+            user_message TEXT NOT NULL,
+            bot_message TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_turns_ts ON chat_turns(ts);
+        CREATE INDEX IF NOT EXISTS idx_turns_user ON chat_turns(user_id, seq);
+        CREATE INDEX IF NOT EXISTS idx_turns_session ON chat_turns(session_id, seq);
+        CREATE INDEX IF NOT EXISTS idx_turns_intent ON chat_turns(intent, seq);
+        CREATE INDEX IF NOT EXISTS idx_turns_method ON chat_turns(method, seq);
+        CREATE INDEX IF NOT EXISTS idx_turns_band ON chat_turns(confidence_band, seq);
+        CREATE TABLE IF NOT EXISTS chat_stats (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO chat_stats (name, value) VALUES ('queries', 0), ('successes', 0), ('entities', 0);
+        CREATE TABLE IF NOT EXISTS chat_intent_counts (
+            intent TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS versions (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO versions (name, value) VALUES ('faqs', 0), ('epoch', abs(random()) % 4294967296);
+        CREATE TABLE IF NOT EXISTS faqs (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+    """
+
+    # Statements are constant strings so sqlite3's statement cache reuses them
+    SQL_GET_USER = "SELECT password, data FROM users WHERE email = ?"
+    SQL_GET_USER_BY_ACCOUNT = "SELECT password, data FROM users WHERE account_number = ? LIMIT 1"
+    SQL_ADD_USER = "INSERT OR REPLACE INTO users (email, account_number, password, data) VALUES (?, ?, ?, ?)"
+    SQL_SEED_USER = "INSERT OR IGNORE INTO users (email, account_number, password, data) VALUES (?, ?, ?, ?)"
+    SQL_COUNT_USERS = "SELECT COUNT(*) FROM users"
+    SQL_GET_SESSION = "SELECT user_id, created_at FROM sessions WHERE id = ?"
+    SQL_HAS_SESSION = "SELECT 1 FROM sessions WHERE id = ?"
+    SQL_ADD_SESSION = "INSERT INTO sessions (id, user_id, created_at, last_active) VALUES (?, ?, ?, ?)"
+    SQL_TOUCH_SESSION = "UPDATE sessions SET last_active = ? WHERE id = ?"
+    SQL_IDLE_SESSIONS = "SELECT id FROM sessions WHERE last_active < ?"
+    SQL_ARCHIVE_SESSION = "UPDATE sessions SET last_active = NULL WHERE id = ?"
+    SQL_DELETE_SESSION = "DELETE FROM sessions WHERE id = ?"
+    SQL_DELETE_SESSION_MESSAGES = "DELETE FROM session_messages WHERE session_id = ?"
+    SQL_COUNT_SESSIONS = "SELECT COUNT(*) FROM sessions"
+    SQL_ALL_SESSION_MESSAGES = "SELECT seq, data FROM session_messages WHERE session_id = ? ORDER BY seq"
+    SQL_SESSION_MESSAGES_BEFORE = ("SELECT seq, data FROM session_messages WHERE session_id = ? AND seq < ? "
+                                   "ORDER BY seq DESC LIMIT ?")
+    SQL_ADD_SESSION_MESSAGE = "INSERT INTO session_messages (session_id, data) VALUES (?, ?)"
+    SQL_ADD_TURN = ("INSERT INTO chat_turns (ts, user_id, session_id, intent, method, confidence_band, "
+                    "user_message, bot_message) VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+    SQL_ITER_TURNS = "SELECT seq, ts, user_message, bot_message FROM chat_turns WHERE seq > ? ORDER BY seq LIMIT ?"
+    SQL_RECENT_TURNS = "SELECT seq, ts, user_message, bot_message FROM chat_turns ORDER BY seq DESC LIMIT ?"
+    SQL_COUNT_TURNS = "SELECT COUNT(*) FROM chat_turns"
+    SQL_ADD_STAT = "UPDATE chat_stats SET value = value + ? WHERE name = ?"
+    SQL_ADD_INTENT_COUNT = ("INSERT INTO chat_intent_counts (intent, count) VALUES (?, ?) "
+                            "ON CONFLICT(intent) DO UPDATE SET count = count + excluded.count")
+    SQL_GET_STATS = "SELECT name, value FROM chat_stats"
+    SQL_GET_INTENT_COUNTS = "SELECT intent, count FROM chat_intent_counts"
+    SQL_LIST_FAQS = "SELECT id, question, answer, created_at FROM faqs ORDER BY seq"
+    SQL_ADD_FAQ = "INSERT INTO faqs (id, question, answer, created_at) VALUES (?, ?, ?, ?)"
+    SQL_DELETE_FAQ = "DELETE FROM faqs WHERE id = ?"
+    SQL_COUNT_FAQS = "SELECT COUNT(*) FROM faqs"
+    SQL_BUMP_FAQ_VERSION = "UPDATE versions SET value = value + 1 WHERE name = 'faqs'"
+    SQL_GET_VERSIONS = "SELECT name, value FROM versions WHERE name IN ('epoch', 'faqs')"
+
+    def __init__(self, path: str, pool_size: int = 8, batch_size: int = 64,
+                 flush_interval: float = 0.25, seed_users: Dict = None, seed_faqs: List = None,
+                 max_session_messages: int = 200, archive_sessions: bool = True):
+        self.path = path
+        self.max_session_messages = max_session_messages
+        self.archive_sessions = archive_sessions
+        self.pool = ConnectionPool(path, pool_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending_turns: List[tuple] = []
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+        with self.pool.connection() as conn:
+            conn.executescript(self.SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+            if 'last_active' not in columns:  # databases created before idle eviction
+                conn.execute("ALTER TABLE sessions ADD COLUMN last_active REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_active ON sessions(last_active)")
+            conn.commit()
+        self._seed(seed_users or {}, seed_faqs or [])
+        atexit.register(self.flush)
+
+    def _seed(self, users: Dict, faqs: List) -> None:
+        """Insert demo users and FAQs without overwriting existing rows"""
+        with self.pool.connection() as conn, conn:
+            conn.executemany(self.SQL_SEED_USER, [self._user_row(user) for user in users.values()])
+            if conn.execute(self.SQL_COUNT_FAQS).fetchone()[0] == 0:
+                conn.executemany(self.SQL_ADD_FAQ, [self._faq_row(faq) for faq in faqs])
+
+    @staticmethod
+    def _user_row(user: Dict) -> tuple:
+        data = {key: value for key, value in user.items() if key != 'password'}
+        return (user['email'], user.get('account_number'), user.get('password'), json.dumps(data))
+
+    @staticmethod
+    def _load_user(row) -> Optional[Dict]:
+        if row is None:
+            return None
+        user = json.loads(row[1])
+        user['password'] = row[0]
+        return user
+
+    @staticmethod
+    def _faq_row(faq: Dict) -> tuple:
+        return (faq['_id'], faq['question'], faq['answer'], faq['created_at'])
+
+    def get_user(self, email: str) -> Optional[Dict]:
+        with self.pool.connection() as conn:
+            return self._load_user(conn.execute(self.SQL_GET_USER, (email,)).fetchone())
+
+    def get_user_by_account(self, account_number: str) -> Optional[Dict]:
+        with self.pool.connection() as conn:
+            return self._load_user(conn.execute(self.SQL_GET_USER_BY_ACCOUNT, (account_number,)).fetchone())
+
+    def add_user(self, user: Dict) -> None:
+        with self.pool.connection() as conn, conn:
+            conn.execute(self.SQL_ADD_USER, self._user_row(user))
+
+    def count_users(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute(self.SQL_COUNT_USERS).fetchone()[0]
+
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        with self.pool.connection() as conn:
+            row = conn.execute(self.SQL_GET_SESSION, (session_id,)).fetchone()
+            if row is None:
+                return None
+        # Like MemoryStorage, 'messages' holds only the most recent window
+        messages, _ = self.session_messages(session_id, limit=self.max_session_messages)
+        return {'id': session_id, 'user_id': row[0], 'messages': messages, 'created_at': row[1]}
+
+    def has_session(self, session_id: str) -> bool:
+        with self.pool.connection() as conn:
+            return conn.execute(self.SQL_HAS_SESSION, (session_id,)).fetchone() is not None
+
+    def create_session(self, session: Dict) -> None:
+        with self.pool.connection() as conn, conn:
+            conn.execute(self.SQL_ADD_SESSION, (session['id'], session['user_id'], session['created_at'], time.time()))
+            conn.executemany(self.SQL_ADD_SESSION_MESSAGE,
+                             [(session['id'], json.dumps(message)) for message in session.get('messages', [])])
+
+    def append_session_message(self, session_id: str, message: Dict) -> None:
+        with self.pool.connection() as conn, conn:
+            conn.execute(self.SQL_ADD_SESSION_MESSAGE, (session_id, json.dumps(message)))
+            conn.execute(self.SQL_TOUCH_SESSION, (time.time(), session_id))
+
+    def session_messages(self, session_id: str, limit: Optional[int] = None,
+                         cursor: Optional[int] = None) -> Tuple[List[Dict], Optional[int]]:
+        # Cursors are session_messages.seq values
+        with self.pool.connection() as conn:
+            if limit is None:
+                rows = conn.execute(self.SQL_ALL_SESSION_MESSAGES, (session_id,)).fetchall()
+                return [json.loads(data) for _, data in rows], None
+            before = cursor if cursor is not None else 2 ** 63 - 1
+            rows = conn.execute(self.SQL_SESSION_MESSAGES_BEFORE, (session_id, before, limit + 1)).fetchall()
+        page = rows[:limit]
+        next_cursor = page[-1][0] if len(rows) > limit else None
+        return [json.loads(data) for _, data in reversed(page)], next_cursor
+
+    def evict_idle_sessions(self, max_idle: float) -> List[str]:
+        # The database already is the archive: archived sessions keep their rows
+        # and only lose last_active (NULL is never idle again until the next
+        # message touches it), so each id is reported once and the caller can
+        # drop the session's NLU context. Unarchived sessions are deleted.
+        with self.pool.connection() as conn, conn:
+            idle = [session_id for (session_id,) in conn.execute(self.SQL_IDLE_SESSIONS, (time.time() - max_idle,))]
+            rows = [(session_id,) for session_id in idle]
+            if self.archive_sessions:
+                conn.executemany(self.SQL_ARCHIVE_SESSION, rows)
+            else:
+                conn.executemany(self.SQL_DELETE_SESSION_MESSAGES, rows)
+                conn.executemany(self.SQL_DELETE_SESSION, rows)
+        return idle
+
+    def count_sessions(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute(self.SQL_COUNT_SESSIONS).fetchone()[0]
+
+    @staticmethod
+    def _load_turn(row) -> Dict:
+        seq, ts, user_message, bot_message = row
+        return {'seq': seq, 'ts': ts, 'user': json.loads(user_message), 'bot': json.loads(bot_message)}
+
+    def append_turn(self, user_message: Dict, bot_message: Dict) -> int:
+        fields = turn_fields({'user': user_message, 'bot': bot_message})
+        row = (time.time(), fields['user_id'], fields['session_id'], fields['intent'], fields['method'],
+               fields['confidence_band'], json.dumps(user_message), json.dumps(bot_message),
+               TurnStats.deltas(bot_message))
+        with self._pending_lock:
+            self._pending_turns.append(row)
+            due = (len(self._pending_turns) >= self.batch_size or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+        return -1  # sequence numbers are assigned by SQLite on flush
+
+    def flush(self) -> None:
+        """Write buffered chat turns in a single transaction"""
+        with self._pending_lock:
+            rows, self._pending_turns = self._pending_turns, []
+            self._last_flush = time.monotonic()
+        if rows:
+            successes = entities = 0
+            intent_counts: Dict[str, int] = {}
+            for *_, (success, entity_count, intent) in rows:
+                successes += success
+                entities += entity_count
+                intent_counts[intent] = intent_counts.get(intent, 0) + 1
+            with self.pool.connection() as conn, conn:
+                conn.executemany(self.SQL_ADD_TURN, [row[:-1] for row in rows])
+                conn.executemany(self.SQL_ADD_STAT, [(len(rows), 'queries'), (successes, 'successes'),
+                                                     (entities, 'entities')])
+                conn.executemany(self.SQL_ADD_INTENT_COUNT, list(intent_counts.items()))
+
+    def iter_turns(self, chunk_size: int = 1000) -> Iterator[Dict]:
+        self.flush()
+        last_seq = 0
+        while True:
+            with self.pool.connection() as conn:
+                rows = conn.execute(self.SQL_ITER_TURNS, (last_seq, chunk_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._load_turn(row)
+            last_seq = rows[-1][0]
+
+    def recent_turns(self, limit: int = 100) -> List[Dict]:
+        self.flush()
+        with self.pool.connection() as conn:
+            rows = conn.execute(self.SQL_RECENT_TURNS, (limit,)).fetchall()
+        return [self._load_turn(row) for row in reversed(rows)]
+
+    def count_turns(self) -> int:
+        self.flush()
+        with self.pool.connection() as conn:
+            return conn.execute(self.SQL_COUNT_TURNS).fetchone()[0]
+
+    def turn_stats(self) -> Dict:
+        self.flush()
+        with self.pool.connection() as conn:
+            # One read transaction so the totals and intent counts agree
+            conn.execute("BEGIN")
+            try:
+                stats = dict(conn.execute(self.SQL_GET_STATS).fetchall())
+                intent_counts = dict(conn.execute(self.SQL_GET_INTENT_COUNTS).fetchall())
+            finally:
+                conn.execute("COMMIT")
+        return build_snapshot(stats['queries'], stats['successes'], stats['entities'], intent_counts)
+
+    def query_turns(self, limit: int = 50, cursor: Optional[int] = None, start: Optional[float] = None,
+                    end: Optional[float] = None, **filters) -> Tuple[List[Dict], Optional[int]]:
+        # Column names come from the fixed INDEXED_FIELDS, values are bound
+        clauses, params = [], []
+        if cursor is not None:
+            clauses.append("seq < ?")
+            params.append(cursor)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(end)
+        for field, value in filters.items():
+            if value is not None and field in INDEXED_FIELDS:
+                clauses.append(f"{field} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        sql = f"SELECT seq, ts, user_message, bot_message FROM chat_turns {where}ORDER BY seq DESC LIMIT ?"
+        params.append(limit + 1)
+
+        self.flush()
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        turns = [self._load_turn(row) for row in rows[:limit]]
+        next_cursor = turns[-1]['seq'] if len(rows) > limit else None
+        return turns, next_cursor
+
+    def list_faqs(self) -> List[Dict]:
+        with self.pool.connection() as conn:
+            rows = conn.execute(self.SQL_LIST_FAQS).fetchall()
+        return [{'_id': row[0], 'question': row[1], 'answer': row[2], 'created_at': row[3]} for row in rows]
+
+    def add_faq(self, faq: Dict) -> None:
+        with self.pool.connection() as conn, conn:
+            conn.execute(self.SQL_ADD_FAQ, self._faq_row(faq))
+            conn.execute(self.SQL_BUMP_FAQ_VERSION)
+
+    def delete_faq(self, faq_id: str) -> None:
+        with self.pool.connection() as conn, conn:
+            conn.execute(self.SQL_DELETE_FAQ, (faq_id,))
+            conn.execute(self.SQL_BUMP_FAQ_VERSION)
+
+    def count_faqs(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute(self.SQL_COUNT_FAQS).fetchone()[0]
+
+    def faq_version(self) -> str:
+        # Kept in the database so every worker agrees on it
+        with self.pool.connection() as conn:
+            versions = dict(conn.execute(self.SQL_GET_VERSIONS).fetchall())
+        return f"{versions['epoch']:x}.{versions['faqs']}"
+
+    def close(self) -> None:
+        self.flush()
+        self.pool.close()
+
+
+def create_store(backend: str = 'memory', users: Dict = None, sessions: Dict = None,
+                 faqs: List = None, path: str = 'securebank.db', log_dir: str = None,
+                 max_session_messages: int = 200, archive_sessions: bool = True) -> StorageBackend:
+    """Build the storage backend selected by name ('memory' or 'sqlite')"""
+    if backend == 'memory':
+        return MemoryStorage(users, sessions, faqs, ChatLog(log_dir),
+                             max_session_messages=max_session_messages, archive_sessions=archive_sessions)
+    if backend == 'sqlite':
+        return SQLiteStorage(path, seed_users=users, seed_faqs=faqs,
+                             max_session_messages=max_session_messages, archive_sessions=archive_sessions)
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,36 @@
+"""
+Shared fixtures for the backend tests
+Run from the backend directory:
+    python -m pytest tests
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.banking_data import BankAccount, BankingDataService  # noqa: E402
+
+
+@pytest.fixture
+def service():
+    """The demo bank (eight sample accounts with history) plus 24 more accounts"""
+    random.seed(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        bank = BankingDataService()
+        for i in range(24):
+            bank.add_account(BankAccount(f"{9000000000 + i}", f"Test Customer {i}"))
+    return bank
+
+
+def total_balance(bank):
+    return sum(account.balance for account in bank.accounts.values())
+
+
+def total_postings(bank):
+    return sum(len(account.transactions) for account in bank.accounts.values())
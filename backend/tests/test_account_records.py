@@ -0,0 +1,56 @@
+"""
+Slotted account, card and loan records keep behaving like the dicts and
+free-form fields they replaced
+"""
+
+import pytest
+
+from models.account_records import Card, Loan
+from models.banking_data import BankAccount
+
+
+@pytest.mark.parametrize("phone", ["0123456789", "+91 9876543210", "98765-43210"])
+def test_phone_is_kept_verbatim(service, phone):
+    account = next(iter(service.accounts.values()))
+    account.phone = phone
+    assert account.get_account_summary()["phone"] == phone
+    assert service.account_summary(account.account_number)["phone"] == phone
+
+
+def test_free_form_loan(service):
+    account = BankAccount("9200000000", "Loan Customer", sample_data=False)
+    account.add_loan({"loan_type": "home_loan", "status": "Active", "note": "top-up pending"})
+    loan = account.loans[0]
+    assert loan["loan_type"] == "home_loan"
+    assert loan["principal"] is None and loan["start_date"] is None
+    assert loan["note"] == "top-up pending"
+    assert Loan.from_dict(loan.to_dict()) == loan
+
+
+def test_record_missing_required_field():
+    with pytest.raises(ValueError, match="loan_type"):
+        Loan.from_dict({"principal": 100000})
+    with pytest.raises(ValueError, match="card_number"):
+        Card.from_dict({"card_type": "Debit Card"})
+
+
+def test_card_reads_and_writes_like_a_dict():
+    card = Card.from_dict({"card_type": "Credit Card", "card_number": "****-****-****-0042",
+                           "card_status": "Active", "expiry_date": "01/30", "daily_limit": 10000,
+                           "monthly_limit": 100000, "issued_date": "2026-01-02T00:00:00"})
+    assert card["card_number"] == "****-****-****-0042"
+    card["card_status"] = "Blocked"
+    card["nickname"] = "travel"
+    assert card["nickname"] == "travel" and len(card) == len(Card.FIELDS) + 1
+    assert dict(card) == card.to_dict()
+    assert Card.from_dict(card.to_dict()) == card
+    del card["nickname"]
+    assert "nickname" not in card
+    with pytest.raises(KeyError):
+        card["missing"]
+
+
+def test_accounts_are_slotted():
+    account = BankAccount("9200000001", "Slotted Customer", sample_data=False)
+    with pytest.raises(AttributeError):
+        account.nickname = "x"
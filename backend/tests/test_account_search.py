@@ -0,0 +1,74 @@
+"""
+Account search stays in step with customer renames, in memory and in the
+tiered store where renamed accounts are evicted and hydrated again
+"""
+
+import contextlib
+import io
+
+from models.account_store import TieredBankingDataService
+from models.banking_data import BankAccount
+
+
+def test_rename_reindexes_account(service):
+    account = service.get_account("9000000003")
+    account.customer_name = "Zubin Mehta"
+
+    assert service.search_accounts("test customer 3") == []
+    assert [a["account_number"] for a in service.search_accounts("zubin")] == ["9000000003"]
+    assert service.get_account_by_customer_name("Zubin Mehta") is account
+    assert service.get_account_by_customer_name("Test Customer 3") is None
+    assert [a["account_number"] for a in service.search_accounts("zubinmehta@example")] == ["9000000003"]
+
+
+def test_replaced_account_no_longer_touches_index(service):
+    old = service.get_account("9000000004")
+    service.add_account(BankAccount("9000000004", "Test Customer 4", sample_data=False))
+    old.customer_name = "Stale Name"
+
+    assert service.search_accounts("stale name") == []
+    assert [a["account_number"] for a in service.search_accounts("test customer 4")] == ["9000000004"]
+
+
+def test_rename_survives_eviction_in_tiered_store(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        bank = TieredBankingDataService(str(tmp_path / "accounts.db"), budget_bytes=1)
+    bank.get_account("2345678901").customer_name = "Priya Nair"
+    for number in list(bank.accounts)[:4]:  # push the renamed account out of the hot tier
+        bank.get_account(number)
+
+    assert [a["account_number"] for a in bank.search_accounts("priya nair")] == ["2345678901"]
+    assert bank.account_summary("2345678901")["customer_name"] == "Priya Nair"
+    renamed = bank.get_account("2345678901")
+    assert renamed.customer_name == "Priya Nair"
+
+    renamed.customer_name = "Priya Iyer"
+    assert bank.search_accounts("priya nair") == []
+    assert [a["account_number"] for a in bank.search_accounts("priya iyer")] == ["2345678901"]
+
+
+def linear_search(bank, query):
+    """The pre-index search: a substring of the name, number or email"""
+    query = query.lower()
+    return {number for number, account in bank.accounts.items()
+            if query in account.customer_name.lower() or query in number or query in account.email}
+
+
+def test_short_queries_match_substrings(service):
+    for query in ("ar", "a", "9", "78", "y"):
+        found = {a["account_number"] for a in service.search_accounts(query, limit=None)}
+        assert found == linear_search(service, query), query
+    assert "Priya Sharma" in {a["customer_name"] for a in service.search_accounts("ar")}
+    assert len(service.search_accounts("e", limit=5)) == 5
+
+
+def test_index_agrees_with_scan_through_renames_and_compaction(service):
+    index = service.index
+    for round_ in range(1100):  # enough removals to trigger a compaction
+        account = service.get_account(f"{9000000000 + round_ % 24}")
+        account.customer_name = f"Renamed {round_} Customer"
+    assert index._removed < 1100
+
+    for query in ("renamed 10", "Renamed 1099 Customer", "ren", "9000000012", "er", "0012", "test customer"):
+        found = {a["account_number"] for a in service.search_accounts(query, limit=None)}
+        assert found == linear_search(service, query), query
@@ -0,0 +1,96 @@
+"""
+Tiered account store under a tiny memory budget
+Every account but the one just handed out is evicted, so transfers,
+write-backs, queued hydration and the unchanged-account shortcut all run
+on each access; balances, ledgers and statistics must survive them.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from models.account_store import TieredBankingDataService
+from models.banking_data import BankAccount
+
+
+@pytest.fixture
+def tiered(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        bank = TieredBankingDataService(str(tmp_path / "accounts.db"), budget_bytes=1)
+        bank.add_accounts(BankAccount(f"{9000000000 + i}", f"Test Customer {i}") for i in range(24))
+    yield bank
+    bank.accounts.close()
+
+
+def evict_all(bank, keep="1234567890"):
+    """Touch another account so only it stays hot"""
+    bank.get_account(keep)
+    assert list(bank.accounts._hot) == [keep]
+
+
+def snapshot(bank, number):
+    account = bank.get_account(number)
+    return account.balance, len(account.transactions), account.transactions.to_bytes()
+
+
+def test_transfers_between_evicted_accounts_survive_rehydration(tiered):
+    numbers = [number for number in tiered.accounts if number != "1234567890"]
+    expected = {number: tiered.account_summary(number)["balance"] for number in numbers}
+    postings = {number: tiered.account_summary(number)["total_transactions"] for number in numbers}
+    evictions_before = tiered.accounts.evictions
+
+    for i in range(40):
+        source, target = numbers[i % len(numbers)], numbers[(i * 7 + 3) % len(numbers)]
+        if source == target:
+            continue
+        result = tiered.transfer_money(source, target, 100.0, "tiered")
+        assert result["success"], result
+        expected[source] -= 100.0
+        expected[target] += 100.0
+        postings[source] += 1
+        postings[target] += 1
+        evict_all(tiered)
+
+    assert tiered.accounts.evictions > evictions_before
+    tiered.accounts.flush()
+    for number in numbers:
+        balance, length, _ = snapshot(tiered, number)
+        assert balance == pytest.approx(expected[number])
+        assert length == postings[number]
+        evict_all(tiered)
+    assert tiered.verify_statistics() == {}
+
+
+def test_hydrating_a_queued_account_reads_the_queue(tiered):
+    number = "9000000005"
+    assert tiered.transfer_money(number, "9000000006", 250.0, "queued")["success"]
+    before = snapshot(tiered, number)
+    evict_all(tiered)
+    assert number in tiered.accounts._queued  # written back, not yet stored
+
+    assert snapshot(tiered, number) == before
+    evict_all(tiered)
+
+    tiered.accounts.flush()
+    assert not tiered.accounts._queued
+    assert snapshot(tiered, number) == before
+    assert tiered.verify_statistics() == {}
+
+
+def test_evicting_an_unchanged_account_skips_the_write_back(tiered):
+    number = "9000000007"
+    tiered.accounts.flush()
+    before = snapshot(tiered, number)
+    write_backs = tiered.accounts.write_backs
+
+    evict_all(tiered)
+    assert tiered.accounts.write_backs == write_backs
+    assert number not in tiered.accounts._queued
+    assert snapshot(tiered, number) == before
+
+    # A changed account is written back on its next eviction
+    assert tiered.transfer_money(number, "9000000008", 10.0, "changed")["success"]
+    evict_all(tiered)
+    assert number in tiered.accounts._queued
+    assert tiered.verify_statistics() == {}
@@ -0,0 +1,115 @@
+"""
+Chat log: the single-writer directory lock, segment rotation and expiry,
+recovery after reopening, and the tail-only mode without a directory
+"""
+
+import os
+
+import pytest
+
+import chat_log
+from chat_log import ChatLog
+from storage import create_store
+
+
+def turn(i):
+    return {'text': f'question {i}', 'user_id': 'user_001'}, {'text': f'answer {i}', 'intent': 'greeting'}
+
+
+def fill(log, start, count):
+    for i in range(start, start + count):
+        log.append(*turn(i))
+    log.flush()
+
+
+def segment_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith(ChatLog.SEGMENT_PREFIX))
+
+
+@pytest.mark.skipif(chat_log.fcntl is None, reason="needs advisory locks")
+def test_second_writer_is_refused(tmp_path):
+    writer = ChatLog(str(tmp_path))
+    writer.append(*turn(0))  # the first append takes the directory for good
+    try:
+        with pytest.raises(RuntimeError, match="SECUREBANK_CHAT_LOG_DIR"):
+            ChatLog(str(tmp_path))
+    finally:
+        writer.close()
+    # Released on close
+    ChatLog(str(tmp_path)).close()
+
+
+def test_rotation_spreads_turns_across_segments(tmp_path):
+    log = ChatLog(str(tmp_path), tail_size=5, max_segment_bytes=300, flush_interval=0.01)
+    for i in range(30):
+        log.append(*turn(i))
+        log.flush()  # one batch per turn, so every full segment rotates
+    try:
+        assert len(segment_files(str(tmp_path))) > 3
+        assert [record['seq'] for record in log.iter_records()] == list(range(30))
+        # Turns long gone from the five-turn tail are read back from their segments
+        assert [record['user']['text'] for record in log.get_many([0, 7, 29])] == \
+            ['question 0', 'question 7', 'question 29']
+        assert len(log) == 30
+    finally:
+        log.close()
+
+
+def test_expired_segments_are_deleted(tmp_path):
+    log = ChatLog(str(tmp_path), max_segment_bytes=300, max_segments=2, flush_interval=0.01)
+    for i in range(30):
+        log.append(*turn(i))
+        log.flush()
+    try:
+        assert len(segment_files(str(tmp_path))) <= 2
+        seqs = [record['seq'] for record in log.iter_records()]
+        assert seqs == list(range(seqs[0], 30)) and seqs[0] > 0
+        assert len(log) == len(seqs)
+    finally:
+        log.close()
+
+
+def test_reopen_recovers_turns_and_numbering(tmp_path):
+    log = ChatLog(str(tmp_path), max_segment_bytes=300, flush_interval=0.01)
+    fill(log, 0, 12)
+    log.close()
+
+    store = create_store('memory', log_dir=str(tmp_path))
+    try:
+        assert [turn['seq'] for turn in store.iter_turns()] == list(range(12))
+        assert store.count_turns() == 12
+        seq = store.chat_log.append(*turn(12))
+        assert seq == 12
+        store.chat_log.flush()
+        assert [turn['user']['text'] for turn in store.iter_turns()][-2:] == ['question 11', 'question 12']
+    finally:
+        store.chat_log.close()
+
+
+def test_reopen_skips_a_torn_last_line(tmp_path):
+    log = ChatLog(str(tmp_path))
+    fill(log, 0, 3)
+    log.close()
+    with open(os.path.join(str(tmp_path), segment_files(str(tmp_path))[-1]), 'ab') as f:
+        f.write(b'{"seq": 3, "us')
+
+    reopened = ChatLog(str(tmp_path))
+    try:
+        assert [record['seq'] for record in reopened.iter_records()] == [0, 1, 2]
+    finally:
+        reopened.close()
+
+
+def test_without_directory_only_the_tail_is_kept(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log = ChatLog(None, tail_size=4)
+    for i in range(10):
+        log.append(*turn(i))
+    log.flush()
+
+    assert [record['seq'] for record in log.iter_records()] == [6, 7, 8, 9]
+    assert len(log) == 4
+    assert [record['seq'] for record in log.recent(2)] == [8, 9]
+    assert [record['seq'] for record in log.get_many([0, 9])] == [9]
+    assert os.listdir(str(tmp_path)) == []
+    log.close()
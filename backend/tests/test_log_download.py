@@ -0,0 +1,90 @@
+"""
+/api/admin/logs/download: byte ranges, If-Range, If-None-Match and the
+per-encoding ETags that make resumed downloads safe
+"""
+
+import contextlib
+import gzip
+import io
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def download():
+    """GET the export as admin with extra headers; the app keeps no chat log on disk"""
+    if 'app' not in sys.modules:
+        os.environ['SECUREBANK_CHAT_LOG_DIR'] = ''
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    for i in range(200):
+        app.STORE.append_turn({'text': f'question {i}', 'user_id': 'user_001', 'timestamp': '2026-01-01T00:00:00'},
+                              {'text': f'answer {i}', 'intent': 'greeting', 'confidence': 0.9, 'method': 'ml'})
+    client = app.app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'admin@securebank.com', 'password': 'admin123'}).json['token']
+
+    def get(query='', **headers):
+        headers = {'Accept-Encoding': 'identity',
+                   **{name.replace('_', '-'): value for name, value in headers.items()}}
+        return client.get(f'/api/admin/logs/download{query}', headers={'Authorization': f'Bearer {token}', **headers})
+    return get
+
+
+def test_partial_range(download):
+    full = download()
+    assert full.status_code == 200
+    body = full.data
+
+    response = download(Range='bytes=10-99')
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 10-99/{len(body)}'
+    assert response.data == body[10:100]
+
+    suffix = download(Range='bytes=-50')
+    assert suffix.status_code == 206
+    assert suffix.data == body[-50:]
+
+
+def test_range_past_the_end_is_unsatisfiable(download):
+    total = len(download().data)
+    response = download(Range=f'bytes={total}-')
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{total}'
+
+
+def test_if_range_with_a_stale_etag_sends_the_whole_body(download):
+    full = download()
+    stale = download(Range='bytes=10-99', If_Range='"0123456789abcdef0123"')
+    assert stale.status_code == 200
+    assert stale.data == full.data
+
+    current = download(Range='bytes=10-99', If_Range=full.headers['ETag'])
+    assert current.status_code == 206
+    assert current.data == full.data[10:100]
+
+
+def test_gzip_and_identity_have_distinct_etags(download):
+    identity = download()
+    encoded = download(Accept_Encoding='gzip')
+    assert encoded.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in identity.headers
+    assert encoded.headers['ETag'] != identity.headers['ETag']
+    assert gzip.decompress(encoded.data) == identity.data
+
+    # A range of the gzip body is a slice of the compressed bytes
+    ranged = download(Accept_Encoding='gzip', Range='bytes=5-')
+    assert ranged.status_code == 206
+    assert ranged.data == encoded.data[5:]
+    # and the identity ETag does not validate it
+    assert download(Accept_Encoding='gzip', Range='bytes=5-', If_Range=identity.headers['ETag']).status_code == 200
+
+
+def test_if_none_match_compares_whole_tags(download):
+    etag = download().headers['ETag']
+    assert download(If_None_Match=etag).status_code == 304
+    assert download(If_None_Match=f'"other", {etag}').status_code == 304
+    assert download(If_None_Match='*').status_code == 304
+    assert download(If_None_Match=etag[:-3] + '"').status_code == 200
+    assert download(If_None_Match=etag, Accept_Encoding='gzip').status_code == 200
@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+import metrics
+from metrics import MetricsRegistry
+
+
+def write_snapshot(directory, pid, started, requests):
+    series = [0] * metrics.SERIES_WIDTH
+    series[metrics.COUNT] = requests
+    payload = {'pid': pid, 'started': started, 'series': [['/api/x', 'GET', '200', series]],
+               'gauges': {'chat_sessions': ['gauge', 'Chat sessions', [[{}, 1]]]}}
+    name = f'metrics-{pid}-{started}.json'
+    with open(os.path.join(directory, name), 'w') as f:
+        json.dump(payload, f)
+    return name
+
+
+def requests_for(series):
+    return series[('/api/x', 'GET', '200')][metrics.COUNT]
+
+
+@pytest.mark.skipif(metrics.fcntl is None, reason="needs advisory locks")
+def test_exited_workers_are_folded_into_retired_totals(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    dead = write_snapshot(str(tmp_path), 2 ** 22 + 1, 1, requests=3)
+    # A live pid with another start time is a recycled pid: the file belongs to the exited worker
+    recycled = write_snapshot(str(tmp_path), os.getpid(), (metrics._process_start(os.getpid()) or 0) + 1, requests=4)
+
+    series, gauges = registry.merged()
+    assert requests_for(series) == 7
+    assert 'chat_sessions' not in gauges
+    assert not os.path.exists(tmp_path / dead)
+    assert not os.path.exists(tmp_path / recycled)
+
+    series, _ = registry.merged()
+    assert requests_for(series) == 7
+
+
+def test_live_worker_gauges_carry_its_pid(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    write_snapshot(str(tmp_path), os.getppid(), metrics._process_start(os.getppid()), requests=2)
+
+    series, gauges = registry.merged()
+    assert requests_for(series) == 2
+    assert gauges['chat_sessions'][2] == [({'pid': str(os.getppid())}, 1)]
+
+
+def test_callback_counters_render_as_counters(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    registry.gauge('in_flight', 'Requests running', lambda: [({}, 2)])
+    registry.counter('shed_total', 'Requests shed', lambda: [({}, 5)])
+
+    text = registry.render()
+    assert '# TYPE securebank_in_flight gauge' in text
+    assert '# TYPE securebank_shed_total counter' in text
+    assert f'securebank_shed_total{{pid="{os.getpid()}"}} 5' in text
@@ -0,0 +1,86 @@
+"""
+Running bank-wide statistics against a full recount
+Every mutation path that moves a counter (transfers, direct postings,
+account creation and replacement, status, type and card changes) must
+leave verify_statistics() empty.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from models.banking_data import BankAccount
+
+
+def quietly(function, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+def test_fresh_service_is_consistent(service):
+    assert service.verify_statistics() == {}
+
+
+def test_transfer_money(service):
+    source, target = list(service.accounts)[:2]
+    assert service.transfer_money(source, target, 100, "rent")["success"]
+    assert service.verify_statistics() == {}
+
+
+def test_transfer_batch(service):
+    numbers = list(service.accounts)
+    assert service.transfer_batch(numbers[:3], numbers[3:6], [10, 20, 30])["success"]
+    assert service.verify_statistics() == {}
+
+
+def test_add_transaction_and_balance_change(service):
+    account = next(iter(service.accounts.values()))
+    account.balance += 2500
+    account.add_transaction("credit", 2500, "Salary")
+    assert service.get_banking_statistics()["total_transactions"] > 0
+    assert service.verify_statistics() == {}
+
+
+def test_account_creation(service):
+    before = service.get_banking_statistics()["total_accounts"]
+    quietly(service.add_account, BankAccount("9100000000", "New Customer", "Current"))
+    quietly(service.add_accounts, [BankAccount(f"{9100000001 + i}", f"Bulk Customer {i}") for i in range(5)])
+    assert service.get_banking_statistics()["total_accounts"] == before + 6
+    assert service.verify_statistics() == {}
+
+
+def test_replacing_an_account_unregisters_the_old_one(service):
+    number = next(iter(service.accounts))
+    before = service.get_banking_statistics()["total_accounts"]
+    quietly(service.add_account, BankAccount(number, "Replacement Customer", "Fixed Deposit"))
+    assert service.get_banking_statistics()["total_accounts"] == before
+    assert service.verify_statistics() == {}
+
+
+@pytest.mark.parametrize("status", ["Frozen", "Dormant", "Closed", "Active"])
+def test_status_change(service, status):
+    account = next(iter(service.accounts.values()))
+    account.status = status
+    assert service.verify_statistics() == {}
+
+
+def test_account_type_change(service):
+    account = next(iter(service.accounts.values()))
+    account.account_type = "Fixed Deposit" if account.account_type != "Fixed Deposit" else "Savings"
+    assert service.verify_statistics() == {}
+
+
+def test_add_card(service):
+    account = next(iter(service.accounts.values()))
+    account.add_card({"card_type": "Debit Card", "card_number": "****-****-****-4321", "card_status": "Active",
+                      "expiry_date": "12/29", "daily_limit": 50000, "monthly_limit": 500000,
+                      "issued_date": "2026-01-01T00:00:00"})
+    assert service.verify_statistics() == {}
+
+
+def test_verifier_reports_drift(service):
+    # A balance changed behind the statistics' back must show up
+    account = next(iter(service.accounts.values()))
+    account._balance += 1
+    assert "total_balance" in service.verify_statistics()
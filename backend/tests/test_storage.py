@@ -0,0 +1,71 @@
+"""
+Storage backends: session history compaction and idle eviction
+"""
+
+import time
+
+from storage import MemoryStorage, SQLiteStorage
+
+
+def session(session_id):
+    return {'id': session_id, 'user_id': 'user_001', 'created_at': '2026-01-01T00:00:00',
+            'messages': [{'sender': 'bot', 'text': 'greeting'}]}
+
+
+def chat(store, session_id, turns, unanswered=()):
+    """Post user/bot turns; turn numbers in ``unanswered`` get no reply (a dropped stream)"""
+    texts = ['greeting']
+    for turn in range(turns):
+        user_message = {'sender': 'user', 'text': f'u{turn}', 'session_id': session_id}
+        store.append_session_message(session_id, user_message)
+        texts.append(user_message['text'])
+        if turn in unanswered:
+            continue
+        bot_message = {'sender': 'bot', 'text': f'b{turn}'}
+        store.append_session_message(session_id, bot_message)
+        store.append_turn(user_message, bot_message)
+        texts.append(bot_message['text'])
+    return texts
+
+
+def history(store, session_id, page=None):
+    if page is None:
+        return [message['text'] for message in store.session_messages(session_id)[0]]
+    texts, cursor = [], None
+    while True:
+        items, cursor = store.session_messages(session_id, limit=page, cursor=cursor)
+        texts = [message['text'] for message in items] + texts
+        if cursor is None:
+            return texts
+
+
+def test_compaction_survives_unanswered_messages():
+    store = MemoryStorage(max_session_messages=6)
+    store.create_session(session('s1'))
+    expected = chat(store, 's1', 12, unanswered={1, 6})
+    assert len(store.sessions['s1']['messages']) <= 6
+    assert history(store, 's1') == expected
+    assert history(store, 's1', page=3) == expected
+
+
+def test_sqlite_eviction_reports_archived_sessions_once(tmp_path):
+    store = SQLiteStorage(str(tmp_path / 'store.db'))
+    store.create_session(session('s1'))
+    time.sleep(0.01)
+    assert store.evict_idle_sessions(0) == ['s1']
+    assert store.evict_idle_sessions(0) == []
+    assert store.has_session('s1')  # archived, not deleted
+
+    store.append_session_message('s1', {'sender': 'user', 'text': 'back again'})
+    time.sleep(0.01)
+    assert store.evict_idle_sessions(0) == ['s1']
+    store.close()
+
+
+def test_sqlite_eviction_deletes_without_archive(tmp_path):
+    store = SQLiteStorage(str(tmp_path / 'store.db'), archive_sessions=False)
+    store.create_session(session('s1'))
+    time.sleep(0.01)
+    assert store.evict_idle_sessions(0) == ['s1']
+    assert not store.has_session('s1')
+    store.close()
@@ -0,0 +1,94 @@
+"""
+Concurrent transfer stress tests
+Threads hammer transfer_money and transfer_batch on a small, contended set
+of accounts; money must be conserved, no balance may go negative, every
+successful leg posts one debit and one credit, and the running statistics
+must match a full recount.
+"""
+
+import math
+import random
+import threading
+
+from conftest import total_balance, total_postings
+
+THREADS = 8
+TRANSFERS_PER_THREAD = 300
+
+
+def run_threads(target, threads=THREADS):
+    errors = []
+
+    def guarded(worker):
+        try:
+            target(worker)
+        except Exception as e:  # surfaced in the main thread below
+            errors.append(e)
+
+    pool = [threading.Thread(target=guarded, args=(worker,)) for worker in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    assert not errors, errors
+
+
+def assert_consistent(service, balance_before, postings_before, successful_legs):
+    assert math.isclose(total_balance(service), balance_before, rel_tol=1e-9)
+    assert all(account.balance >= 0 for account in service.accounts.values())
+    assert total_postings(service) == postings_before + 2 * successful_legs
+    assert service.verify_statistics() == {}
+
+
+def test_concurrent_transfer_money_conserves_money(service):
+    numbers = list(service.accounts)
+    hot = numbers[:4]  # most transfers touch these, in both directions
+    balance_before, postings_before = total_balance(service), total_postings(service)
+    successes = [0] * THREADS
+
+    def worker(index):
+        rng = random.Random(index)
+        for _ in range(TRANSFERS_PER_THREAD):
+            source, target = rng.sample(hot if rng.random() < 0.7 else numbers, 2)
+            # Large amounts so insufficient-balance rejections happen under contention too
+            result = service.transfer_money(source, target, rng.choice([1, 50, 5000, 200000]), "stress")
+            successes[index] += result["success"]
+
+    run_threads(worker)
+    assert sum(successes) > 0
+    assert_consistent(service, balance_before, postings_before, sum(successes))
+
+
+def test_concurrent_batches_and_single_transfers(service):
+    numbers = list(service.accounts)
+    balance_before, postings_before = total_balance(service), total_postings(service)
+    legs = [0] * THREADS
+
+    def worker(index):
+        rng = random.Random(100 + index)
+        for _ in range(TRANSFERS_PER_THREAD // 10):
+            if index % 2:
+                count = rng.randint(1, 8)
+                pairs = [rng.sample(numbers, 2) for _ in range(count)]
+                result = service.transfer_batch([source for source, _ in pairs], [target for _, target in pairs],
+                                                [rng.choice([10, 500, 100000]) for _ in range(count)], "batch")
+                legs[index] += count if result["success"] else 0
+            else:
+                source, target = rng.sample(numbers, 2)
+                legs[index] += service.transfer_money(source, target, rng.choice([10, 500, 100000]))["success"]
+
+    run_threads(worker)
+    assert_consistent(service, balance_before, postings_before, sum(legs))
+
+
+def test_rejected_batch_changes_nothing(service):
+    numbers = list(service.accounts)
+    balances = {number: account.balance for number, account in service.accounts.items()}
+    postings_before = total_postings(service)
+
+    result = service.transfer_batch([numbers[0], numbers[1]], [numbers[2], "0000000000"], [10, 10])
+
+    assert not result["success"]
+    assert {number: account.balance for number, account in service.accounts.items()} == balances
+    assert total_postings(service) == postings_before
+    assert service.verify_statistics() == {}
@@ -0,0 +1,11 @@
+"""
+WSGI Entry Point
+Production entry for gunicorn; settings and fork hooks live in gunicorn.conf.py
+
+Run from the backend directory:
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+from app import app as application
+
+app = application
@@ -1,16 +1,25 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { FiRefreshCw, FiDownload, FiLogOut } from "react-icons/fi";
 import { useNavigate } from "react-router-dom";
 import useAuthStore from "../store/authStore.jsx";
 import Faqs from "./Faqs.jsx";
-import { getAdminLogs, refreshAnalytics, downloadLogs } from "../utils/api.js";
+import { queryAdminLogs, refreshAnalytics, downloadLogs, subscribeAdminEvents } from "../utils/api.js";
+
+const PAGE_SIZE = 50;
+const LIVE_RECONNECT_MS = 5000;
+
+// Dashboard cards from the counters in an analytics snapshot
+const toAnalytics = (counters) => ({
+  totalQueries: counters.queries || 0,
+  successRate: counters.queries ? (counters.successes / counters.queries) * 100 : 0,
+  intentsCount: Object.keys(counters.intent_counts || {}).length,
+  entitiesCount: counters.entity || 0
+});
 
 const AdminDashboard = () => {
   const { name, clearAuth } = useAuthStore();
   const navigate = useNavigate();
   
-  const [userMessages, setUserMessages] = useState([]);
-  const [botMessages, setBotMessages] = useState([]);
   const [analytics, setAnalytics] = useState({
     totalQueries: 0,
     successRate: 0,
@@ -18,27 +27,33 @@ const AdminDashboard = () => {
     entitiesCount: 0
   });
   const [queries, setQueries] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [intentFilter, setIntentFilter] = useState("");
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState("dashboard");
+  const [live, setLive] = useState(false);
+  const countersRef = useRef(null);
+  const intentFilterRef = useRef(intentFilter);
 
   const fetchAllData = async () => {
     setLoading(true);
     try {
       const [logsData, analyticsData] = await Promise.all([
-        getAdminLogs(),
+        queryAdminLogs({ limit: PAGE_SIZE, intent: intentFilter || undefined }),
         refreshAnalytics()
       ]);
       
-      setUserMessages(logsData.UserMessages || []);
-      setBotMessages(logsData.BotMessages || []);
-      setQueries(logsData.UserMessages || []);
+      setQueries(logsData.items || []);
+      setNextCursor(logsData.next_cursor ?? null);
       
-      setAnalytics({
-        totalQueries: analyticsData.queries || 0,
-        successRate: (analyticsData.success || 0) * 100,
-        intentsCount: analyticsData.intents || 0,
-        entitiesCount: analyticsData.entity || 0
-      });
+      if (!countersRef.current) {
+        setAnalytics({
+          totalQueries: analyticsData.queries || 0,
+          successRate: (analyticsData.success || 0) * 100,
+          intentsCount: analyticsData.intents || 0,
+          entitiesCount: analyticsData.entity || 0
+        });
+      }
     } catch (error) {
       console.error('Error fetching admin data:', error);
     } finally {
@@ -46,11 +61,81 @@ const AdminDashboard = () => {
     }
   };
 
+  const loadMoreQueries = async () => {
+    if (nextCursor === null) return;
+    try {
+      const logsData = await queryAdminLogs({ limit: PAGE_SIZE, cursor: nextCursor, intent: intentFilter || undefined });
+      setQueries((prev) => [...prev, ...(logsData.items || [])]);
+      setNextCursor(logsData.next_cursor ?? null);
+    } catch (error) {
+      console.error('Error loading more queries:', error);
+    }
+  };
+
   useEffect(() => {
     if (activeTab === "dashboard" || activeTab === "userQueries") {
       fetchAllData();
     }
-  }, [activeTab]);
+  }, [activeTab, intentFilter]);
+
+  useEffect(() => {
+    intentFilterRef.current = intentFilter;
+  }, [intentFilter]);
+
+  // Live push channel: counters and new turns arrive as deltas instead of re-polling
+  useEffect(() => {
+    const controller = new AbortController();
+    let retryTimer = null;
+
+    const applyTurn = (event) => {
+      const counters = countersRef.current;
+      if (counters) {
+        const { delta } = event;
+        counters.queries += delta.queries;
+        counters.successes += delta.successes;
+        counters.entity += delta.entities;
+        counters.intent_counts[delta.intent] = (counters.intent_counts[delta.intent] || 0) + 1;
+        setAnalytics(toAnalytics(counters));
+      }
+
+      const filter = intentFilterRef.current;
+      if (filter && event.bot?.intent !== filter) return;
+      const turn = { seq: event.seq ?? `live-${event.user?.timestamp}`, user: event.user, bot: event.bot };
+      setQueries((prev) => (prev.slice(0, 5).some((item) => item.seq === turn.seq) ? prev : [turn, ...prev]));
+    };
+
+    const connect = async () => {
+      try {
+        await subscribeAdminEvents({
+          signal: controller.signal,
+          onSnapshot: (snapshot) => {
+            countersRef.current = {
+              queries: snapshot.queries || 0,
+              successes: snapshot.successes || 0,
+              entity: snapshot.entity || 0,
+              intent_counts: { ...(snapshot.intent_counts || {}) }
+            };
+            setAnalytics(toAnalytics(countersRef.current));
+            setLive(true);
+          },
+          onTurn: applyTurn
+        });
+      } catch (error) {
+        if (error.name === 'AbortError') return;
+        console.error('Live dashboard stream error:', error);
+      }
+      setLive(false);
+      if (!controller.signal.aborted) {
+        retryTimer = setTimeout(connect, LIVE_RECONNECT_MS);
+      }
+    };
+
+    connect();
+    return () => {
+      controller.abort();
+      clearTimeout(retryTimer);
+    };
+  }, []);
 
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleString();
@@ -114,7 +199,12 @@ const AdminDashboard = () => {
       {/* Analytics Dashboard */}
       {activeTab === 'dashboard' && (
         <div className="px-16 py-16">
-          <h3 style={{ marginBottom: "24px" }}>Analytics Overview</h3>
+          <h3 style={{ marginBottom: "24px" }}>
+            Analytics Overview
+            <span style={{ marginLeft: "12px", fontSize: "12px", color: live ? "var(--color-success)" : "var(--color-text-secondary)" }}>
+              {live ? "● Live" : "○ Offline"}
+            </span>
+          </h3>
           
           {/* Stats Grid */}
           <div style={{ display: "grid", gridTemplateColumns: "repeat(auto-fit, minmax(200px, 1fr))", gap: "16px", marginBottom: "32px" }}>
@@ -174,18 +264,18 @@ const AdminDashboard = () => {
                       </tr>
                     </thead>
                     <tbody>
-                      {queries.slice(0, 10).map((q, i) => (
-                        <tr key={i} style={{ borderBottom: "1px solid var(--color-border)" }}>
-                          <td style={{ padding: "12px" }}>{q.text || 'N/A'}</td>
-                          <td style={{ padding: "12px" }}>{botMessages[i]?.intent || 'unknown'}</td>
+                      {queries.slice(0, 10).map((turn) => (
+                        <tr key={turn.seq} style={{ borderBottom: "1px solid var(--color-border)" }}>
+                          <td style={{ padding: "12px" }}>{turn.user?.text || 'N/A'}</td>
+                          <td style={{ padding: "12px" }}>{turn.bot?.intent || 'unknown'}</td>
                           <td style={{ padding: "12px" }}>
-                            {botMessages[i]?.confidence 
-                              ? `${(botMessages[i].confidence * 100).toFixed(1)}%`
+                            {turn.bot?.confidence 
+                              ? `${(turn.bot.confidence * 100).toFixed(1)}%`
                               : 'N/A'
                             }
                           </td>
                           <td style={{ padding: "12px", color: "var(--color-text-secondary)" }}>
-                            {formatDate(q.timestamp)}
+                            {formatDate(turn.user?.timestamp)}
                           </td>
                         </tr>
                       ))}
@@ -205,7 +295,16 @@ const AdminDashboard = () => {
       {/* All User Queries */}
       {activeTab === 'userQueries' && (
         <div className="px-16 py-16">
-          <h3 style={{ marginBottom: "24px" }}>All User Queries</h3>
+          <div style={{ display: "flex", justifyContent: "space-between", alignItems: "center", marginBottom: "24px" }}>
+            <h3 style={{ margin: 0 }}>All User Queries</h3>
+            <input
+              className="form-control"
+              style={{ maxWidth: "240px" }}
+              placeholder="Filter by intent"
+              value={intentFilter}
+              onChange={(e) => setIntentFilter(e.target.value.trim())}
+            />
+          </div>
           <div className="card">
             <div className="px-16 py-16">
               {loading ? (
@@ -220,16 +319,23 @@ const AdminDashboard = () => {
                       </tr>
                     </thead>
                     <tbody>
-                      {queries.map((q, i) => (
-                        <tr key={i} style={{ borderBottom: "1px solid var(--color-border)" }}>
-                          <td style={{ padding: "12px" }}>{q.text}</td>
+                      {queries.map((turn) => (
+                        <tr key={turn.seq} style={{ borderBottom: "1px solid var(--color-border)" }}>
+                          <td style={{ padding: "12px" }}>{turn.user?.text}</td>
                           <td style={{ padding: "12px", color: "var(--color-text-secondary)" }}>
-                            {formatDate(q.timestamp)}
+                            {formatDate(turn.user?.timestamp)}
                           </td>
                         </tr>
                       ))}
                     </tbody>
                   </table>
+                  {nextCursor !== null && (
+                    <div style={{ textAlign: "center", marginTop: "16px" }}>
+                      <button className="btn btn--outline" onClick={loadMoreQueries}>
+                        Load more
+                      </button>
+                    </div>
+                  )}
                 </div>
               ) : (
                 <div style={{ textAlign: "center", color: "var(--color-text-secondary)" }}>
@@ -7,7 +7,9 @@ import {
 import { IoSend } from "react-icons/io5";
 import useAuthStore from "../store/authStore.jsx";
 import FaqList from "./FaqList.jsx";
-import { createSession, getSessionMessages, sendMessage } from "../utils/api.js";
+import { createSession, getSessionMessages, streamMessage } from "../utils/api.js";
+
+const MESSAGE_PAGE_SIZE = 50;
 
 const ChatWindow = () => {
   const { sessionId: urlSessionId } = useParams();
@@ -16,6 +18,8 @@ const ChatWindow = () => {
   const [theme, setTheme] = useState(localStorage.getItem('theme') || 'light');
   const { name, clearAuth } = useAuthStore();
   const [messages, setMessages] = useState([]);
+  const [olderCursor, setOlderCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const [messageText, setMessageText] = useState("");
   const [loadingBot, setLoadingBot] = useState(false);
   const [connectionError, setConnectionError] = useState(false);
@@ -23,6 +27,7 @@ const ChatWindow = () => {
   const [conversationFlow, setConversationFlow] = useState(null);
   const [slotFilling, setSlotFilling] = useState(null);
   const messagesEndRef = useRef(null);
+  const streamAbortRef = useRef(null);
   const navigate = useNavigate();
 
   // Theme management
@@ -35,9 +40,10 @@ const ChatWindow = () => {
     setTheme(theme === 'light' ? 'dark' : 'light');
   };
 
-  // Initialize chat session
+  // Initialize chat session; drop any in-flight reply stream on unmount
   useEffect(() => {
     initializeChat();
+    return () => streamAbortRef.current?.abort();
   }, []);
 
   const initializeChat = async () => {
@@ -58,8 +64,9 @@ const ChatWindow = () => {
 
   const fetchMessages = async (sid = sessionId) => {
     try {
-      const messages = await getSessionMessages(sid);
-      setMessages(messages);
+      const page = await getSessionMessages(sid, { limit: MESSAGE_PAGE_SIZE });
+      setMessages(page.items);
+      setOlderCursor(page.next_cursor);
       setConnectionError(false);
     } catch (error) {
       console.error('Error fetching messages:', error);
@@ -67,6 +74,20 @@ const ChatWindow = () => {
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (olderCursor === null || loadingOlder) return;
+    setLoadingOlder(true);
+    try {
+      const page = await getSessionMessages(sessionId, { limit: MESSAGE_PAGE_SIZE, cursor: olderCursor });
+      setMessages(prev => [...page.items, ...prev]);
+      setOlderCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error loading earlier messages:', error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const handleConnectionError = () => {
     setConnectionError(true);
     let count = 5;
@@ -100,49 +121,61 @@ const ChatWindow = () => {
 
     setMessages(prev => [...prev, userMsg]);
     setMessageText("");
+    setLoadingBot(true);
 
-    setTimeout(() => {
-      setLoadingBot(true);
-    }, 300);
+    const controller = new AbortController();
+    streamAbortRef.current = controller;
+    let streamingStarted = false;
 
     try {
-      const response = await sendMessage({
-        sessionId,
-        messageText,
-        userId: null
+      const response = await streamMessage({ sessionId, messageText }, {
+        signal: controller.signal,
+        // Intent, entities and pending slots arrive before the reply text
+        onAnalysis: (analysis) => {
+          if (analysis.needs_slot_filling) {
+            setSlotFilling({
+              intent: analysis.intent,
+              pending_slots: analysis.pending_slots,
+              filled_slots: analysis.filled_slots
+            });
+          } else {
+            setSlotFilling(null);
+          }
+
+          // Set conversation flow context if needed
+          if (analysis.intent && analysis.confidence > 0.8) {
+            setConversationFlow({
+              intent: analysis.intent,
+              confidence: analysis.confidence,
+              entities: analysis.entities
+            });
+          }
+        },
+        onDelta: (text) => {
+          if (!streamingStarted) {
+            streamingStarted = true;
+            setLoadingBot(false);
+            setMessages(prev => [...prev, { sender: "bot", text, streaming: true }]);
+          } else {
+            setMessages(prev => {
+              const last = prev[prev.length - 1];
+              return [...prev.slice(0, -1), { ...last, text: last.text + text }];
+            });
+          }
+        }
       });
 
-      // Handle slot filling
-      if (response.bot.needs_slot_filling) {
-        setSlotFilling({
-          intent: response.bot.intent,
-          pending_slots: response.bot.pending_slots,
-          filled_slots: response.bot.filled_slots
-        });
-      } else {
-        setSlotFilling(null);
-      }
-
-      // Set conversation flow context if needed
-      if (response.bot.intent && response.bot.confidence > 0.8) {
-        setConversationFlow({
-          intent: response.bot.intent,
-          confidence: response.bot.confidence,
-          entities: response.bot.entities
-        });
-      }
-
-      // Simulate realistic bot response delay
-      const delay = Math.floor(Math.random() * 2000) + 1000;
-      setTimeout(() => {
-        setMessages(prev => [...prev, response.bot]);
-        setLoadingBot(false);
-      }, delay);
+      // Replace the streamed draft with the stored message (adds method/confidence)
+      setMessages(prev => streamingStarted ? [...prev.slice(0, -1), response.bot] : [...prev, response.bot]);
+      setLoadingBot(false);
 
     } catch (error) {
+      if (error.name === 'AbortError') return;
       console.error('Error sending message:', error);
       setLoadingBot(false);
       handleConnectionError();
+    } finally {
+      if (streamAbortRef.current === controller) streamAbortRef.current = null;
     }
   };
 
@@ -469,6 +502,27 @@ const ChatWindow = () => {
           overflowY: 'auto',
           background: theme === 'light' ? '#f8fafc' : '#1a202c'
         }}>
+          {/* Earlier history */}
+          {olderCursor !== null && (
+            <div style={{ display: 'flex', justifyContent: 'center', marginBottom: '16px' }}>
+              <button
+                onClick={loadOlderMessages}
+                disabled={loadingOlder}
+                style={{
+                  padding: '6px 12px',
+                  background: 'none',
+                  border: `1px solid ${theme === 'light' ? '#e2e8f0' : '#4a5568'}`,
+                  borderRadius: '6px',
+                  fontSize: '12px',
+                  cursor: loadingOlder ? 'wait' : 'pointer',
+                  color: theme === 'light' ? '#64748b' : '#a0aec0'
+                }}
+              >
+                {loadingOlder ? 'Loading...' : 'Load earlier messages'}
+              </button>
+            </div>
+          )}
+
           {/* Conversation context */}
           {renderConversationContext()}
           
@@ -91,8 +91,10 @@ export const createSession = async (userId = null) => {
   return data;
 };
 
-export const getSessionMessages = async (sessionId) => {
-  const { data } = await apiClient.get(`/session/messages/${sessionId}`);
+export const getSessionMessages = async (sessionId, { limit = 50, cursor } = {}) => {
+  const params = { limit };
+  if (cursor !== undefined && cursor !== null) params.cursor = cursor;
+  const { data } = await apiClient.get(`/session/messages/${sessionId}`, { params });
   return data;
 };
 
@@ -102,6 +104,79 @@ export const sendMessage = async ({ sessionId, messageText, userId = null }) =>
   return data;
 };
 
+const readAuthToken = () => {
+  try {
+    const raw = localStorage.getItem('auth-storage');
+    return raw ? JSON.parse(raw)?.state?.token : null;
+  } catch (error) {
+    console.error('❌ Token parse error:', error);
+    return null;
+  }
+};
+
+// POST/GET a server-sent-events endpoint with the auth header (EventSource can't send one)
+const openEventStream = async (path, { method = 'GET', body, signal } = {}) => {
+  const token = readAuthToken();
+  const response = await fetch(`${API_BASE}${path}`, {
+    method,
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: body ? JSON.stringify(body) : undefined,
+    signal,
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Stream request failed with status ${response.status}`);
+  }
+  return response;
+};
+
+// Calls onEvent(name, payload) per event until the stream ends or onEvent returns true
+const readEventStream = async (response, onEvent) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const event = frame.match(/^event: (.*)$/m)?.[1];
+      const data = frame.match(/^data: (.*)$/m)?.[1];
+      if (!event || data === undefined) continue;
+      if (onEvent(event, JSON.parse(data))) {
+        reader.cancel();
+        return;
+      }
+    }
+  }
+};
+
+// Streams the reply as server-sent events: onAnalysis(intent, entities, slots),
+// onDelta(text chunk), then resolves with the stored bot message.
+// Aborting `signal` closes the connection and stops the work server-side.
+export const streamMessage = async ({ sessionId, messageText }, { onAnalysis, onDelta, signal } = {}) => {
+  const response = await openEventStream('/chat/message/stream', {
+    method: 'POST',
+    body: { sessionId, messageText },
+    signal,
+  });
+  let bot = null;
+  await readEventStream(response, (event, payload) => {
+    if (event === 'analysis') onAnalysis?.(payload);
+    else if (event === 'delta') onDelta?.(payload.text);
+    else if (event === 'done') bot = payload.bot;
+    return bot !== null;
+  });
+  if (!bot) throw new Error('Stream ended before the reply was complete');
+  return { bot };
+};
+
 export const analyzeQuery = async (query) => {
   const { data } = await apiClient.post('/chat/analyze', { query });
   return data;
@@ -113,11 +188,40 @@ export const getUserFaqs = async () => {
 };
 
 // Admin Functions
-export const getAdminLogs = async () => {
-  const { data } = await apiClient.get('/admin/logs');
+// One page of messages (oldest first within the page); pass next_cursor back as `cursor` for older ones.
+export const getAdminLogs = async ({ limit = 100, cursor } = {}) => {
+  const { data } = await apiClient.get('/admin/logs', { params: { limit, cursor } });
   return data;
 };
 
+// Paginated, filtered chat turns (newest first). Pass `cursor` from the previous page's next_cursor.
+export const queryAdminLogs = async ({ limit = 50, cursor, start, end, userId, sessionId, intent, method, confidence } = {}) => {
+  const params = {
+    limit,
+    cursor,
+    start,
+    end,
+    user_id: userId,
+    session_id: sessionId,
+    intent,
+    method,
+    confidence,
+  };
+  const { data } = await apiClient.get('/admin/logs/query', { params });
+  return data;
+};
+
+// Live dashboard feed: onSnapshot(counters) first and after any overflow,
+// then onTurn({ seq, user, bot, delta }) per chat turn. Abort `signal` to stop.
+export const subscribeAdminEvents = async ({ onSnapshot, onTurn, signal }) => {
+  const response = await openEventStream('/admin/events', { signal });
+  await readEventStream(response, (event, payload) => {
+    if (event === 'snapshot') onSnapshot?.(payload);
+    else if (event === 'turn') onTurn?.(payload);
+    return false;
+  });
+};
+
 export const refreshAnalytics = async () => {
   const { data } = await apiClient.get('/admin/logs/refresh');
   return data;
@@ -149,9 +253,12 @@ export default {
   createSession,
   getSessionMessages,
   sendMessage,
+  streamMessage,
+  subscribeAdminEvents,
   analyzeQuery,
   getUserFaqs,
   getAdminLogs,
+  queryAdminLogs,
   refreshAnalytics,
   downloadLogs,
   getAdminFaqs,